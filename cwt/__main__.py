@@ -0,0 +1,6 @@
+# __main__.py — `python -m cwt` runs the headless CLI
+
+import sys
+from cwt.cli import main
+
+sys.exit(main())
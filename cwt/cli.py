@@ -0,0 +1,452 @@
+# cli.py
+
+"""
+Module: cli.py
+Part of: Chrome Workspace Toolkit (CWT)
+
+Description:
+    Headless command-line entry point for scripts, schedulers and login hooks.
+    Every command prints one JSON document on stdout; log lines go to stderr
+    (with --verbose). Nothing here imports tkinter, and the Windows backend is
+    only imported by the commands that need it, so `cwt list` starts fast.
+
+    cwt capture [--name NAME] [--chrome-only | --apps-only]
+    cwt restore COLLECTION [--snapshot FILE] [--threshold N] [--matcher fuzzy|tfidf] [--no-return] [--lazy] [--relaunch]
+    cwt undo
+    cwt switch COLLECTION [--snapshot FILE] [--park minimize|desktop]
+    cwt list [COLLECTION]
+    cwt diff A [B | live]
+    cwt bench [COLLECTION]
+    cwt serve [--simulate DIR]
+    cwt upgrade [ROOT] [--dry-run] [--workers N]
+    cwt gc [ROOT] [--dry-run] [--budget SECONDS]
+    cwt search QUERY [--limit N] [--kind snapshot|workspace] [--no-refresh]
+    cwt store {stats | pack | prune | which TITLE} [--exe EXE] [--root DIR] [--dry-run]
+
+    With --daemon, capture / restore / undo / switch / list are forwarded to a running
+    `cwt serve` instance instead of loading the backend in this process.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from cwt.utils.paths import get_latest_snapshot, list_collections, list_snapshots
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+EXIT_BACKEND_UNAVAILABLE = 4
+EXIT_SERVICE_UNAVAILABLE = 5
+
+
+class CLIError(Exception):
+    def __init__(self, message, exit_code=EXIT_ERROR):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+def _emit(payload):
+    sys.stdout.write(json.dumps(payload, default=str) + "\n")
+
+
+def _make_logger(verbose):
+    if not verbose:
+        return lambda msg: None
+    return lambda msg: print(msg, file=sys.stderr)
+
+
+def _import_backend(module_name):
+    """Imports a Windows-backed core module, mapping missing pywin32/pyvda to a clean exit code."""
+    import importlib
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise CLIError(f"Windows backend unavailable: {e}", EXIT_BACKEND_UNAVAILABLE)
+
+
+def _resolve_snapshot(ref):
+    """Accepts a snapshot file path or a collection name (→ its newest snapshot)."""
+    path = Path(ref)
+    if path.is_file():
+        return path
+    latest = get_latest_snapshot(ref)
+    if latest is None:
+        raise CLIError(f"No snapshot file or collection named '{ref}'", EXIT_NOT_FOUND)
+    return latest
+
+
+def _load_snapshot(path):
+    from cwt.core.snapshot_model import load_snapshot
+    try:
+        return load_snapshot(path)
+    except (OSError, ValueError, KeyError) as e:
+        raise CLIError(f"Could not read snapshot {path}: {e}")
+
+
+def _via_daemon(args, cmd, **request_args):
+    from cwt.services.client import ServiceUnavailable, send_request
+    try:
+        response = send_request(cmd, port=args.port, **request_args)
+    except ServiceUnavailable as e:
+        raise CLIError(str(e), EXIT_SERVICE_UNAVAILABLE)
+    if not response.get("ok"):
+        error = response.get("error", "unknown error")
+        raise CLIError(error, EXIT_NOT_FOUND if error.startswith("FileNotFoundError") else EXIT_ERROR)
+    return dict(response["result"], service_ms=response.get("elapsed_ms"))
+
+
+def _absolute(path):
+    """The service resolves relative snapshot paths from its snapshots folder, not our cwd."""
+    return str(Path(path).resolve()) if path else None
+
+
+# ── Commands ──────────────────────────────────────────────────────────────────
+
+def cmd_capture(args, logger):
+    if args.daemon:
+        from cwt.utils.name_utils import generate_timestamped_name
+        return _via_daemon(args, "capture", collection_name=args.name or generate_timestamped_name("SS"),
+                           chrome_only=args.chrome_only, app_only=args.apps_only)
+
+    capture = _import_backend("cwt.core.snapshot_capture")
+    from cwt.utils.name_utils import generate_timestamped_name
+
+    name = args.name or generate_timestamped_name("SS")
+    meta = {}
+    path = capture.capture_snapshot(
+        collection_name=name,
+        logger=logger,
+        gui_callback=meta.update,
+        chrome_only=args.chrome_only,
+        app_only=args.apps_only
+    )
+    meta["snapshot_file"] = path
+    return meta
+
+
+def cmd_restore(args, logger):
+    if args.daemon:
+        return _via_daemon(args, "restore", collection=args.collection, snapshot=_absolute(args.snapshot),
+                           threshold=args.threshold, return_to_origin=not args.no_return, matcher=args.matcher,
+                           lazy=args.lazy, relaunch=args.relaunch)
+    if args.lazy:
+        raise CLIError("--lazy needs --daemon: other desktops are restored by the running service when visited",
+                       EXIT_USAGE)
+
+    snapshot_path = Path(args.snapshot) if args.snapshot else get_latest_snapshot(args.collection)
+    if snapshot_path is None or not snapshot_path.is_file():
+        raise CLIError(f"No snapshot found for '{args.snapshot or args.collection}'", EXIT_NOT_FOUND)
+
+    restore = _import_backend("cwt.core.restore")
+    return restore.restore_windows(
+        str(snapshot_path),
+        threshold=args.threshold,
+        return_to_origin=not args.no_return,
+        logger=logger,
+        matcher=args.matcher,
+        relaunch=args.relaunch
+    )
+
+
+def cmd_undo(args, logger):
+    if args.daemon:
+        result = _via_daemon(args, "undo")
+    else:
+        result = _import_backend("cwt.core.restore").undo_restore(logger=logger)
+    if not result.get("undone"):
+        raise CLIError("Nothing to undo", EXIT_NOT_FOUND)
+    return result
+
+
+def cmd_switch(args, logger):
+    if args.daemon:
+        return _via_daemon(args, "switch", collection=args.collection, snapshot=_absolute(args.snapshot),
+                           park=args.park)
+
+    if args.snapshot and not Path(args.snapshot).is_file():
+        raise CLIError(f"No snapshot found for '{args.snapshot}'", EXIT_NOT_FOUND)
+    _import_backend("cwt.core.restore")
+    from cwt.core.workspace_switcher import get_workspace_switcher
+    try:
+        return get_workspace_switcher(park=args.park, logger=logger).switch(args.collection, args.snapshot)
+    except FileNotFoundError as e:
+        raise CLIError(str(e), EXIT_NOT_FOUND)
+
+
+def cmd_list(args, logger):
+    if args.daemon:
+        return _via_daemon(args, "list", collection=args.collection)
+
+    if args.collection:
+        snapshots = list_snapshots(args.collection)
+        if not snapshots:
+            raise CLIError(f"No snapshots in collection '{args.collection}'", EXIT_NOT_FOUND)
+        return {
+            "collection": args.collection,
+            "snapshots": [{"file": str(p), "size": p.stat().st_size} for p in snapshots]
+        }
+
+    return {
+        "collections": [
+            {"name": name, "snapshot_count": len(list_snapshots(name))}
+            for name in list_collections()
+        ]
+    }
+
+
+def cmd_diff(args, logger):
+    from cwt.core.snapshot_diff import diff_history, diff_snapshots
+    from cwt.core.snapshot_model import Snapshot
+
+    if args.b is None:
+        snapshots = list_snapshots(args.a)[::-1]      # oldest first, by capture time
+        if not snapshots:
+            raise CLIError(f"No snapshots in collection '{args.a}'", EXIT_NOT_FOUND)
+        return {
+            "collection": args.a,
+            "history": [
+                {"from": str(a), "to": str(b), **summary}
+                for a, b, summary in diff_history(snapshots, logger=logger)
+            ]
+        }
+
+    path_a = _resolve_snapshot(args.a)
+    snap_a = _load_snapshot(path_a)
+    if args.b == "live":
+        restore = _import_backend("cwt.core.restore")
+        path_b = "live"
+        # compare layouts, not desktop names
+        from cwt.core.window_rules import load_rules
+        snap_b = Snapshot(snap_a.collection_name, "live", None, desktops=snap_a.desktops,
+                          windows=restore.get_all_visible_windows(rules=load_rules(logger=logger)))
+    else:
+        path_b = _resolve_snapshot(args.b)
+        snap_b = _load_snapshot(path_b)
+
+    return {"a": str(path_a), "b": str(path_b), **diff_snapshots(snap_a, snap_b)}
+
+
+def cmd_bench(args, logger):
+    timings = {}
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings[label] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    restore = timed("import_backend_ms", lambda: _import_backend("cwt.core.restore"))
+    from cwt.utils.vda_utils import DesktopManager
+
+    desktops = timed("desktop_map_ms", lambda: DesktopManager(logger=logger))
+    windows = timed("enumerate_windows_ms", lambda: restore.get_all_visible_windows(desktops))
+    result = {"live_windows": len(windows), "desktops": len(desktops)}
+
+    if args.collection:
+        snapshot_path = _resolve_snapshot(args.collection)
+        snapshot = timed("load_snapshot_ms", lambda: restore.load_snapshot(snapshot_path))
+        matches = timed("match_windows_ms", lambda: restore.match_windows(snapshot, windows, 85))
+        result.update({
+            "snapshot": str(snapshot_path),
+            "snapshot_windows": len(snapshot.windows),
+            "matched": sum(1 for _, live, score in matches if live and score >= 85)
+        })
+
+    result["timings"] = timings
+    return result
+
+
+def cmd_serve(args, logger):
+    from cwt.services import daemon
+
+    backend = daemon.LocalBackend       # built by serve() on its COM worker thread
+    if args.simulate:
+        from cwt.services.simulator import SimulatedBackend
+        backend = SimulatedBackend(args.simulate, logger=logger)
+    try:
+        daemon.serve(backend, port=args.port, logger=lambda msg: print(msg, file=sys.stderr))
+    except ImportError as e:
+        raise CLIError(f"Windows backend unavailable: {e}", EXIT_BACKEND_UNAVAILABLE)
+    return {"stopped": True}
+
+
+def cmd_upgrade(args, logger):
+    from cwt.core.snapshot_model import migrate_tree
+    from cwt.utils.paths import get_snapshots_dir
+
+    root = Path(args.root) if args.root else get_snapshots_dir()
+    if not root.is_dir():
+        raise CLIError(f"No such directory: {root}", EXIT_NOT_FOUND)
+    result = migrate_tree(root, workers=args.workers, dry_run=args.dry_run,
+                          backup=not args.no_backup, logger=logger)
+    return {"root": str(root), "dry_run": args.dry_run, **result}
+
+
+def cmd_gc(args, logger):
+    from cwt.core.snapshot_gc import SnapshotGC
+    from cwt.utils.paths import get_snapshots_dir
+
+    root = Path(args.root) if args.root else get_snapshots_dir()
+    if not root.is_dir():
+        raise CLIError(f"No such directory: {root}", EXIT_NOT_FOUND)
+    report = SnapshotGC(root, dry_run=args.dry_run, logger=logger).run(budget_seconds=args.budget)
+    return {"root": str(root), "dry_run": args.dry_run, **report}
+
+
+def cmd_store(args, logger):
+    from cwt.core.snapshot_store import SnapshotStore
+    from cwt.utils.paths import get_snapshots_dir
+
+    root = Path(args.root) if args.root else get_snapshots_dir()
+    if not root.is_dir():
+        raise CLIError(f"No such directory: {root}", EXIT_NOT_FOUND)
+    store = SnapshotStore(root, logger=logger)
+    if args.action == "pack":
+        return {"dry_run": args.dry_run, **store.pack(dry_run=args.dry_run)}
+    if args.action == "prune":
+        return {"dry_run": args.dry_run, **store.prune(dry_run=args.dry_run)}
+    if args.action == "which":
+        if not (args.query or args.exe):
+            raise CLIError("which needs a title substring and/or --exe", EXIT_USAGE)
+        windows = store.find_windows(title=args.query, exe=args.exe)
+        for window in windows:
+            window["snapshot_files"] = [str(p) for p in store.snapshots_containing(window["hash"])]
+        return {"windows": windows}
+    return store.stats()
+
+
+def cmd_search(args, logger):
+    from cwt.core.search_index import SearchIndex
+
+    index = SearchIndex(logger=logger)
+    refreshed = None if args.no_refresh else index.refresh()
+    start = time.perf_counter()
+    try:
+        hits = index.search(args.query, limit=args.limit, kind=args.kind)
+    except ValueError as e:
+        raise CLIError(str(e), EXIT_USAGE)
+    return {
+        "query": args.query,
+        "query_ms": round((time.perf_counter() - start) * 1000, 2),
+        "refresh": refreshed,
+        "hits": hits,
+    }
+
+
+COMMANDS = {
+    "capture": cmd_capture,
+    "restore": cmd_restore,
+    "undo": cmd_undo,
+    "switch": cmd_switch,
+    "list": cmd_list,
+    "diff": cmd_diff,
+    "bench": cmd_bench,
+    "serve": cmd_serve,
+    "upgrade": cmd_upgrade,
+    "gc": cmd_gc,
+    "search": cmd_search,
+    "store": cmd_store,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cwt", description="Chrome Workspace Toolkit — headless capture and restore")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Write log output to stderr")
+    parser.add_argument("--daemon", action="store_true", help="Forward capture/restore/undo/switch/list to a running `cwt serve`")
+    parser.add_argument("--port", type=int, default=47615, help="Service port for --daemon / serve")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("capture", help="Capture the current window layout into a collection")
+    p.add_argument("--name", help="Collection name (default: SS.DD-MMM-YY_HHMM)")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--chrome-only", action="store_true", help="Capture Chrome windows only")
+    group.add_argument("--apps-only", action="store_true", help="Capture non-Chrome windows only")
+
+    p = sub.add_parser("restore", help="Restore the newest snapshot of a collection")
+    p.add_argument("collection", nargs="?", help="Collection name")
+    p.add_argument("--snapshot", help="Restore this snapshot file instead of the newest in the collection")
+    p.add_argument("--threshold", type=int, help="Match threshold 0–100 (default: 85 fuzzy, 60 tfidf)")
+    p.add_argument("--matcher", choices=["fuzzy", "tfidf"], default="fuzzy",
+                   help="Title matcher: partial_ratio, or character n-gram TF-IDF (faster on large sets)")
+    p.add_argument("--no-return", action="store_true", help="Stay on the last desktop touched")
+    p.add_argument("--lazy", action="store_true",
+                   help="Restore the current desktop now and each other desktop on first visit (with --daemon)")
+    p.add_argument("--relaunch", action="store_true",
+                   help="Start apps that have no open window from their captured command line, then place them")
+
+    sub.add_parser("undo", help="Put the windows the last restore touched back where they were")
+
+    p = sub.add_parser("switch", help="Park the current workspace's windows and bring a collection's back")
+    p.add_argument("collection", help="Collection to switch to")
+    p.add_argument("--snapshot", help="Snapshot to restore on the first switch (default: the newest)")
+    p.add_argument("--park", choices=["minimize", "desktop"], default="minimize",
+                   help="Minimize outgoing windows, or move them to the 'CWT Parking' desktop")
+
+    p = sub.add_parser("list", help="List collections, or the snapshots in one collection")
+    p.add_argument("collection", nargs="?")
+
+    p = sub.add_parser("diff", help="Compare two snapshots, a snapshot and the live desktop, "
+                                     "or every consecutive pair in a collection")
+    p.add_argument("a", help="Snapshot file or collection name")
+    p.add_argument("b", nargs="?", help="Snapshot file, collection name or 'live' (omit for the collection's history)")
+
+    p = sub.add_parser("bench", help="Time enumeration, loading and matching")
+    p.add_argument("collection", nargs="?", help="Also time loading/matching this collection's newest snapshot")
+
+    p = sub.add_parser("serve", help="Run the local restore service (blocks)")
+    p.add_argument("--simulate", metavar="DIR", help="Serve the in-memory simulator, storing snapshots in DIR")
+
+    p = sub.add_parser("upgrade", help="Rewrite legacy snapshot/workspace files in the current format")
+    p.add_argument("root", nargs="?", help="Directory to migrate (default: the snapshots directory)")
+    p.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    p.add_argument("--no-backup", action="store_true", help="Do not keep a .bak copy of each upgraded file")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+
+    p = sub.add_parser("gc", help="Deduplicate, expire and compress old snapshots (see storage/retention.json)")
+    p.add_argument("root", nargs="?", help="Snapshots directory (default: the app's snapshots directory)")
+    p.add_argument("--dry-run", action="store_true", help="Report what would change without touching files")
+    p.add_argument("--budget", type=float, help="Stop after this many seconds; the next run resumes")
+
+    p = sub.add_parser("search", help="Search window titles, exes, desktops and tab URLs across all snapshots")
+    p.add_argument("query", help='e.g. \'obsidian desktop:5\' or \'"Clear Trend" exe:chrome\'')
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--kind", choices=["snapshot", "workspace"], help="Only this kind of document")
+    p.add_argument("--no-refresh", action="store_true", help="Skip re-scanning for new or changed files")
+
+    p = sub.add_parser("store", help="Inspect and maintain the content-addressed snapshot store")
+    p.add_argument("action", choices=["stats", "pack", "prune", "which"],
+                   help="pack: convert full snapshots to manifests; which: snapshots containing a window")
+    p.add_argument("query", nargs="?", help="Title substring (which)")
+    p.add_argument("--exe", help="Exe name filter (which)")
+    p.add_argument("--root", help="Snapshots directory (default: the app's snapshots directory)")
+    p.add_argument("--dry-run", action="store_true", help="Report what pack/prune would do")
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "restore" and not (args.collection or args.snapshot):
+        parser.error("restore needs a collection name or --snapshot")
+
+    logger = _make_logger(args.verbose)
+    try:
+        payload = COMMANDS[args.command](args, logger)
+    except CLIError as e:
+        _emit({"ok": False, "command": args.command, "error": str(e)})
+        return e.exit_code
+    except Exception as e:
+        _emit({"ok": False, "command": args.command, "error": f"{type(e).__name__}: {e}"})
+        return EXIT_ERROR
+
+    _emit({"ok": True, "command": args.command, **payload})
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
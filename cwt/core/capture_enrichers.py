@@ -0,0 +1,218 @@
+# core/capture_enrichers.py
+
+"""
+Capture enrichers: per-app plugins that add the context a window needs to be
+restored properly — the folder a VS Code window has open, an Obsidian vault,
+a Chrome profile and its active tab, an Explorer window's path.
+
+An enricher is an Enricher subclass that declares the exes it handles and
+gets all of a capture's windows of those exes in one call:
+
+    class VaultEnricher(Enricher):
+        name = "obsidian"                 # key in WindowRecord.context
+        exes = {"obsidian.exe"}
+        budget = 1.0                      # seconds
+
+        def enrich(self, windows):
+            return {w.hwnd: {"vault": ...} for w in windows}
+
+A "urls" entry in a result is moved to WindowRecord.urls, where the search
+index picks it up; the rest is stored under WindowRecord.context[name].
+
+Enrichers are discovered on first use, from two places:
+
+    plugins directory   every cwt/plugins/*.py (not starting with "_") that
+                        defines ENRICHERS = [...]; the built-ins live there
+    entry points        group "cwt.enrichers", for pip-installed plugins —
+                        an Enricher subclass, an instance, or a list of them
+
+Each capture runs the enrichers that have windows concurrently on a thread
+pool, each under its own time budget, counted from when the capture hands
+it out: capture waits at most for the largest budget, however slow a plugin
+is. A plugin that runs over is reported as "timeout" and its results are
+dropped (the thread is left to finish on its own — Python threads can't be
+killed). Per-enricher timings go in the capture report.
+"""
+
+import importlib.util
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from importlib.metadata import entry_points
+from pathlib import Path
+
+from cwt.utils.paths import PLUGINS_DIR
+
+ENTRY_POINT_GROUP = "cwt.enrichers"
+ENRICH_BUDGET = 1.0         # seconds per enricher per capture
+MAX_ENRICHERS = 8           # enrichers running at once
+
+
+class Enricher:
+    name = ""
+    exes = frozenset()          # lower-case exe names this enricher handles
+    budget = ENRICH_BUDGET
+
+    def handles(self, window) -> bool:
+        return window.exe.lower() in self.exes
+
+    def enrich(self, windows) -> dict:
+        """
+        Args:
+            windows (list[WindowRecord]): This capture's windows of the declared exes.
+
+        Returns:
+            dict: {hwnd: data} — a JSON-serializable dict per window it found
+            something for; windows it leaves out are not touched.
+        """
+        raise NotImplementedError
+
+
+def _as_enrichers(obj):
+    """Enricher instances from an Enricher subclass, an instance, or a list of either."""
+    items = obj if isinstance(obj, (list, tuple)) else [obj]
+    found = []
+    for item in items:
+        if isinstance(item, type) and issubclass(item, Enricher):
+            item = item()
+        if isinstance(item, Enricher) and item.name:
+            item.exes = frozenset(e.lower() for e in item.exes)
+            found.append(item)
+    return found
+
+
+class EnricherRegistry:
+    def __init__(self, plugins_dir=PLUGINS_DIR, entry_point_group=ENTRY_POINT_GROUP, logger=print):
+        """
+        Args:
+            plugins_dir (Path): Folder of plugin modules (None to skip).
+            entry_point_group (str): Entry point group to load (None to skip).
+            logger (Callable): Logging function for status messages.
+        """
+        self.plugins_dir = Path(plugins_dir) if plugins_dir else None
+        self.entry_point_group = entry_point_group
+        self.logger = logger
+        self._enrichers = None
+        self._lock = threading.Lock()
+
+    def _load_file(self, path):
+        module_name = f"cwt_plugin_{path.stem}"
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        return _as_enrichers(getattr(module, "ENRICHERS", []))
+
+    def _discover(self):
+        found = []
+        if self.plugins_dir is not None and self.plugins_dir.is_dir():
+            for path in sorted(self.plugins_dir.glob("*.py")):
+                if path.name.startswith("_"):
+                    continue
+                try:
+                    found += self._load_file(path)
+                except Exception as e:
+                    self.logger(f"[⚠️] Enricher plugin {path.name} not loaded: {e}")
+        if self.entry_point_group:
+            for ep in entry_points(group=self.entry_point_group):
+                try:
+                    found += _as_enrichers(ep.load())
+                except Exception as e:
+                    self.logger(f"[⚠️] Enricher entry point {ep.name} not loaded: {e}")
+
+        by_name = {}
+        for enricher in found:
+            if enricher.name in by_name:
+                self.logger(f"[⚠️] Duplicate enricher '{enricher.name}' ignored ({type(enricher).__name__})")
+                continue
+            by_name[enricher.name] = enricher
+        return list(by_name.values())
+
+    def enrichers(self):
+        """The discovered enrichers; discovery runs once, on first call."""
+        with self._lock:
+            if self._enrichers is None:
+                self._enrichers = self._discover()
+            return list(self._enrichers)
+
+    def reload(self):
+        with self._lock:
+            self._enrichers = None
+
+
+def _timed(enricher, windows):
+    start = time.perf_counter()
+    result = enricher.enrich(windows)
+    return result or {}, round((time.perf_counter() - start) * 1000, 2)
+
+
+def _apply(name, result, windows):
+    by_hwnd = {w.hwnd: w for w in windows}
+    applied = 0
+    for hwnd, data in result.items():
+        window = by_hwnd.get(hwnd)
+        if window is None or not data:
+            continue
+        data = dict(data)
+        urls = data.pop("urls", None)
+        if urls:
+            window.urls = tuple(urls)
+        if data:
+            # New dict: records copied out of the window cache share the old one
+            window.context = {**window.context, name: data}
+        applied += 1
+    return applied
+
+
+def run_enrichers(windows, enrichers, max_workers=MAX_ENRICHERS, logger=print) -> dict:
+    """
+    Runs every enricher that has windows, concurrently, and stores their results on the records.
+
+    Args:
+        windows (list[WindowRecord]): The capture's windows; updated in place.
+        enrichers (list[Enricher]): Enrichers to run.
+        max_workers (int): Enrichers running at once.
+        logger (Callable): Logging function for status messages.
+
+    Returns:
+        dict: {enricher name: {"windows", "enriched", "ms", "status"}} — status is
+        "ok", "timeout" or "error".
+    """
+    jobs = [(e, mine) for e in enrichers if (mine := [w for w in windows if e.handles(w)])]
+    if not jobs:
+        return {}
+    report = {}
+    started = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix="cwt-enrich")
+    try:
+        futures = [(e, mine, pool.submit(_timed, e, mine)) for e, mine in jobs]
+        for enricher, mine, future in futures:
+            entry = {"windows": len(mine), "enriched": 0, "ms": None, "status": "ok"}
+            remaining = started + enricher.budget - time.perf_counter()
+            try:
+                result, entry["ms"] = future.result(timeout=max(0.0, remaining))
+                entry["enriched"] = _apply(enricher.name, result, mine)
+            except TimeoutError:
+                future.cancel()
+                entry["status"] = "timeout"
+                entry["ms"] = round((time.perf_counter() - started) * 1000, 2)
+                logger(f"[⚠️] Enricher '{enricher.name}' ran over its {enricher.budget:g}s budget — skipped")
+            except Exception as e:
+                entry["status"] = "error"
+                logger(f"[⚠️] Enricher '{enricher.name}' failed: {e}")
+            report[enricher.name] = entry
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return report
+
+
+_registry = None
+
+
+def get_enricher_registry(logger=print) -> EnricherRegistry:
+    """Returns the shared registry over cwt/plugins and the "cwt.enrichers" entry points."""
+    global _registry
+    if _registry is None:
+        _registry = EnricherRegistry(logger=logger)
+    return _registry
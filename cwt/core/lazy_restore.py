@@ -0,0 +1,198 @@
+# core/lazy_restore.py
+
+"""
+Lazy per-desktop restore: desktops the user isn't looking at are restored
+on their first visit instead of up front.
+
+restore_windows(lazy=True) places the current desktop's windows at once and
+hands every other desktop's RestoreOps to a LazyDesktopRestore. That polls
+the current desktop (virtual desktop switches raise no WinEvent, and
+VirtualDesktop.current() is one cheap COM call) and, the first time the
+user lands on a desktop with a pending plan, runs it there.
+
+The polling thread only detects the visit. With a `submit` (the daemon's
+COM worker) the plan runs on the thread that owns the desktop map and the
+pyvda objects, like every other window operation; that thread re-checks the
+current desktop and re-reads each window's desktop first.
+
+A plan can be minutes or hours old by then, so each op is revalidated
+against the live window cache before it runs:
+
+    vanished   the hwnd is gone                          → dropped
+    replaced   the hwnd now belongs to another exe/class → dropped
+    moved      the user placed the window themselves     → left alone
+    otherwise  placed, using the window's current desktop
+
+Like RestoreScheduler, the Win32 / pyvda side is injected so the logic runs
+without a Windows session.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from cwt.core.restore_scheduler import RestoreOp
+
+POLL_INTERVAL = 0.25
+
+
+class LazyDesktopRestore:
+    def __init__(self, execute: Callable[[list], dict], current_desktop: Callable[[], str],
+                 lookup: Optional[Callable[[int], object]] = None, poll_interval=POLL_INTERVAL,
+                 logger=print, progress: Callable[[dict], None] = None, submit: Optional[Callable] = None,
+                 live_desktop: Optional[Callable[[int], Optional[int]]] = None):
+        """
+        Args:
+            execute (Callable[[list], dict]): Runs RestoreOps (execute_restore_plan).
+            current_desktop (Callable[[], str]): GUID of the desktop the user is looking at.
+            lookup (Callable[[int], WindowRecord | None]): Current state of an hwnd, e.g.
+                WindowStateCache.get. Without it ops run as planned.
+            poll_interval (float): Seconds between desktop checks.
+            logger (Callable): Logging function for status messages.
+            progress (Callable[[dict], None]): Receives one event per desktop restored on visit.
+            submit (Callable): submit(fn, *args) → Future, running fn on the thread that
+                owns the desktop / COM objects (e.g. the daemon's COM worker). Without it
+                a visit's plan runs on the polling thread.
+            live_desktop (Callable[[int], int | None]): Number of the desktop hosting an
+                hwnd right now; read just before a plan runs, since the lookup's desktop
+                may be stale.
+        """
+        self.execute = execute
+        self.current_desktop = current_desktop
+        self.lookup = lookup
+        self.poll_interval = poll_interval
+        self.logger = logger
+        self.progress = progress
+        self.submit = submit
+        self.live_desktop = live_desktop
+        self.pending = {}               # desktop GUID → [RestoreOp]
+        self.registered_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"desktops_run": 0, "restored": 0, "vanished": 0, "replaced": 0, "moved": 0}
+
+    def register(self, ops):
+        """Queues ops by target desktop. Ops without a target desktop are ignored."""
+        with self._lock:
+            for op in ops:
+                if op.desktop_guid:
+                    self.pending.setdefault(op.desktop_guid, []).append(op)
+            self.registered_at = time.time()
+        return {guid: len(group) for guid, group in self.pending.items()}
+
+    def revalidate(self, ops):
+        """Drops ops whose window vanished, was replaced or was placed by the user; refreshes the rest."""
+        if self.lookup is None:
+            return list(ops)
+        valid = []
+        for op in ops:
+            record = self.lookup(op.hwnd)
+            if record is None:
+                self.stats["vanished"] += 1
+                continue
+            planned = op.live_win
+            if record.exe.lower() != planned.exe.lower() or (
+                    planned.class_name and record.class_name != planned.class_name):
+                self.stats["replaced"] += 1
+                continue
+            rect = (record.x, record.y, record.width, record.height)
+            if rect != (planned.x, planned.y, planned.width, planned.height) and rect != op.rect:
+                self.stats["moved"] += 1
+                continue
+            if self.live_desktop is not None:
+                record = record.copy(desktop_number=self.live_desktop(op.hwnd))
+            valid.append(RestoreOp(op.snap_win, record, op.score, op.desktop_guid, op.desktop_number))
+        return valid
+
+    def visit(self, guid):
+        """Runs the pending plan for desktop guid, if there is one. Returns the executor's summary."""
+        with self._lock:
+            ops = self.pending.pop(guid, None)
+        if not ops:
+            return None
+        start = time.perf_counter()
+        valid = self.revalidate(ops)
+        result = self.execute(valid) if valid else {"restored": 0}
+        self.stats["desktops_run"] += 1
+        self.stats["restored"] += result.get("restored", 0)
+        event = {
+            "stage": "lazy_desktop",
+            "desktop": ops[0].desktop_number,
+            "windows": result.get("restored", 0),
+            "dropped": len(ops) - len(valid),
+            "desktops_pending": len(self.pending),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        self.logger(f"[✓] Desktop {event['desktop']} restored on first visit: {event['windows']} window(s), "
+                    f"{event['dropped']} dropped after revalidation ({event['elapsed_ms']} ms)")
+        if self.progress:
+            self.progress(event)
+        return result
+
+    def poll_once(self):
+        try:
+            guid = self.current_desktop()
+        except Exception as e:
+            self.logger(f"[!] Could not read the current desktop: {e}")
+            return None
+        if guid not in self.pending:
+            return None
+        if self.submit is None:
+            return self.visit(guid)
+        return self.submit(self._visit_if_current, guid).result()
+
+    def _visit_if_current(self, guid):
+        # Queued behind other work: the user may have moved on by the time it runs
+        if self.current_desktop() != guid:
+            return None
+        return self.visit(guid)
+
+    def _run(self):
+        try:
+            import comtypes         # current_desktop() is a pyvda COM call, made from this thread
+            comtypes.CoInitialize()
+        except Exception:
+            pass
+        while self.pending and not self._stop.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception as e:
+                self.logger(f"[!] Lazy restore stopped: {e}")
+                break
+        if self.progress:
+            self.progress(dict(self.stats, stage="lazy_complete", desktops_pending=len(self.pending)))
+
+    def start(self):
+        """Starts the polling thread; it exits once every pending desktop has been visited."""
+        if self.pending and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cwt-lazy-restore", daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        """Drops every pending plan (e.g. because another restore started)."""
+        self._stop.set()
+        with self._lock:
+            dropped = sum(len(group) for group in self.pending.values())
+            self.pending.clear()
+        if self._thread:
+            self._thread.join(self.poll_interval * 4)
+        return dropped
+
+
+_active = None
+
+
+def replace_active(lazy):
+    """Makes lazy the process's pending restore, cancelling the previous one."""
+    global _active
+    if _active is not None and _active is not lazy:
+        _active.cancel()
+    _active = lazy
+    return lazy
+
+
+def active_lazy_restore():
+    return _active
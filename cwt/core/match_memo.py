@@ -0,0 +1,174 @@
+# core/match_memo.py
+
+"""
+Persistent memo of confirmed window pairings.
+
+Each restore that pairs a snapshot window with a live window (at or above
+the threshold) remembers the pairing under stable identities:
+
+    (exe, window class, normalized title)  →  live identity
+
+where the normalized title is lowercased with digit runs collapsed, so
+"Inbox (3) - Gmail" and "Inbox (12) - Gmail" are the same window. On the
+next restore, snapshot windows whose remembered live identity is open
+again are paired by dictionary lookup; only the rest go through fuzzy /
+TF-IDF scoring.
+
+Scores are on the scale of the matcher that produced them, so an entry
+only resolves a window for the same matcher and only while its score meets
+the current threshold; anything else is scored afresh (and re-remembered).
+Entries unused for max_age_days are dropped, the least recently used go
+once the memo exceeds max_entries, and an entry is replaced as soon as
+scoring pairs its snapshot window with a different live window.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from cwt.core.snapshot_model import WindowRecord
+from cwt.core.title_matcher import DEFAULT_MATCHER, match_titles
+from cwt.utils.paths import STORAGE_DIR
+
+MEMO_FILE = STORAGE_DIR / "match_memo.json"
+DAY = 86400
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    return _SPACES.sub(" ", _DIGITS.sub("#", title.lower())).strip()
+
+
+def identity(window) -> str:
+    """Stable key for a window across sessions: exe, class, normalized title."""
+    return "\x1f".join((window.exe.lower(), window.class_name, normalize_title(window.title)))
+
+
+class MatchMemo:
+    def __init__(self, path=MEMO_FILE, max_entries=5000, max_age_days=30, logger=print):
+        """
+        Args:
+            path (Path): JSON file the memo persists to.
+            max_entries (int): LRU bound on remembered pairings.
+            max_age_days (float): Entries unused for longer than this are dropped.
+            logger (Callable): Logging function for status messages.
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age = max_age_days * DAY
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8")).get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._evict()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"entries": self._entries}, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    def _evict(self, now=None):
+        now = now or time.time()
+        self._entries = {k: e for k, e in self._entries.items() if now - e["last_used"] <= self.max_age}
+        if len(self._entries) > self.max_entries:
+            newest = sorted(self._entries.items(), key=lambda kv: kv[1]["last_used"], reverse=True)
+            self._entries = dict(newest[:self.max_entries])
+
+    def remember(self, snap_win, live_win, score, matcher=DEFAULT_MATCHER, now=None):
+        now = now or time.time()
+        key, target = identity(snap_win), identity(live_win)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["live"] == target:
+                entry["last_used"], entry["score"], entry["matcher"] = now, score, matcher
+            else:                       # new, or scoring now prefers another window → replace
+                self._entries[key] = {"live": target, "score": score, "matcher": matcher, "hits": 0,
+                                      "created": now, "last_used": now}
+            self._dirty = True
+
+    def match(self, snap_windows, current_windows, threshold, matcher=DEFAULT_MATCHER, logger=print):
+        """
+        Pairs windows by memo lookup first, then scores only the remainder.
+
+        Returns:
+            tuple: (matches, stats) — matches as match_titles() returns them,
+            stats = {"memo_hits", "memo_lookups", "memo_hit_rate"}.
+        """
+        live = [WindowRecord.coerce(w) for w in current_windows]
+        live_by_identity = {}
+        for live_win in live:
+            live_by_identity.setdefault(identity(live_win), []).append(live_win)
+
+        now = time.time()
+        matches, pending, claimed = [None] * len(snap_windows), [], set()
+        with self._lock:
+            for i, snap_win in enumerate(snap_windows):
+                entry = self._entries.get(identity(snap_win))
+                candidate = None
+                if (entry and now - entry["last_used"] <= self.max_age
+                        and entry.get("matcher") == matcher and entry["score"] >= threshold):
+                    candidate = next((w for w in live_by_identity.get(entry["live"], ())
+                                      if w.hwnd not in claimed), None)
+                if candidate is None:
+                    pending.append(i)
+                    continue
+                claimed.add(candidate.hwnd)
+                entry["hits"] += 1
+                entry["last_used"] = now
+                matches[i] = (snap_win, candidate, entry["score"])
+            if len(pending) < len(snap_windows):
+                self._dirty = True
+
+        if pending:
+            unclaimed = [w for w in live if w.hwnd not in claimed]
+            scored = match_titles([snap_windows[i] for i in pending], unclaimed, matcher, logger)
+            for i, result in zip(pending, scored):
+                matches[i] = result
+                snap_win, live_win, score = result
+                if live_win is not None and score >= threshold:
+                    self.remember(snap_win, live_win, score, matcher, now)
+
+        hits = len(snap_windows) - len(pending)
+        stats = {
+            "memo_hits": hits,
+            "memo_lookups": len(snap_windows),
+            "memo_hit_rate": round(hits / len(snap_windows), 3) if snap_windows else 0.0,
+        }
+        logger(f"[🧠] Match memo: {hits}/{len(snap_windows)} window(s) resolved by lookup "
+               f"({stats['memo_hit_rate']:.0%}), {len(pending)} scored")
+        return matches, stats
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+
+_memo = None
+
+
+def get_match_memo(logger=print) -> MatchMemo:
+    """Returns the shared memo backed by storage/match_memo.json."""
+    global _memo
+    if _memo is None:
+        _memo = MatchMemo(logger=logger)
+    return _memo
@@ -0,0 +1,169 @@
+# core/relaunch.py
+
+"""
+Relaunch stage: start the apps a snapshot expects but that aren't running.
+
+Snapshot windows left without a live match after matching are grouped by
+the command captured for them (exe path, command line and working
+directory — see utils/process_inventory.py), and each distinct command is
+started once on a bounded thread pool. A launch is ready when a new
+top-level window of that exe shows up: the wait is event-driven
+(WindowStateCache.wait_for wakes on every window event) with a timeout,
+and a window that already existed before the stage — or was claimed by
+another launch — never counts. The new windows are handed back as
+matches, so positioning treats them like any other window.
+
+Each launch reports its latency: Popen returning (launch_ms) and the
+first window appearing (ready_ms), both measured from the start of the
+launch.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from cwt.utils.process_inventory import with_chromium_profile
+
+MAX_LAUNCHERS = 4
+READY_TIMEOUT = 20.0        # seconds for an app's first window
+EXTRA_WINDOW_GRACE = 3.0    # seconds to wait for each further window of the same launch
+
+
+@dataclass(slots=True)
+class LaunchResult:
+    exe: str
+    command: tuple
+    pid: Optional[int] = None
+    windows: list = field(default_factory=list)     # [(snapshot window, new live window)]
+    expected: int = 1
+    launch_ms: Optional[float] = None
+    ready_ms: Optional[float] = None
+    error: str = ""
+
+    def report(self) -> dict:
+        return {"exe": self.exe, "pid": self.pid, "windows": len(self.windows), "expected": self.expected,
+                "launch_ms": self.launch_ms, "ready_ms": self.ready_ms, "error": self.error}
+
+
+def launch_command(snap_win) -> tuple:
+    """
+    The command to start a snapshot window's app: its captured command line,
+    else its exe path. A browser window whose own profile is known (the
+    chromium enricher) opens in that profile, not the process's launch profile.
+    """
+    command = tuple(snap_win.cmdline) if snap_win.cmdline else ((snap_win.exe_path,) if snap_win.exe_path else ())
+    profile = (snap_win.context.get("chromium") or {}).get("profile")
+    if command and profile:
+        command = with_chromium_profile(command, profile)
+    return command
+
+
+def popen_launch(command, cwd=None):
+    """Starts command detached from this process (no console, no inherited handles)."""
+    flags = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+    return subprocess.Popen(list(command), cwd=cwd if cwd and os.path.isdir(cwd) else None,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            close_fds=True, creationflags=flags)
+
+
+class Relauncher:
+    def __init__(self, wait_for: Callable, existing_hwnds=(), launch: Callable = popen_launch,
+                 max_workers=MAX_LAUNCHERS, timeout=READY_TIMEOUT, logger=print):
+        """
+        Args:
+            wait_for (Callable): WindowStateCache.wait_for(predicate, timeout, exclude).
+            existing_hwnds (Iterable[int]): Windows open before the stage; never claimed.
+            launch (Callable[[tuple, str], Popen]): Starts a command in a working directory.
+            max_workers (int): Launches in flight at once.
+            timeout (float): Seconds to wait for each app's first window.
+            logger (Callable): Logging function for status messages.
+        """
+        self.wait_for = wait_for
+        self.launch = launch
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.logger = logger
+        self._claimed = set(existing_hwnds)
+        self._lock = threading.Lock()
+
+    def relaunch(self, snap_windows):
+        """
+        Launches every distinct command once and waits for its windows.
+
+        Returns:
+            list[LaunchResult]: One per command; snapshot windows without a
+            captured command are not launched.
+        """
+        groups = {}
+        for snap_win in snap_windows:
+            command = launch_command(snap_win)
+            if command:
+                groups.setdefault((command, snap_win.cwd), []).append(snap_win)
+        if not groups:
+            return []
+        self.logger(f"[🚀] Relaunching {len(groups)} app(s) for {sum(map(len, groups.values()))} missing window(s)")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cwt-relaunch") as pool:
+            return list(pool.map(self._launch_group, groups.items()))
+
+    def _launch_group(self, item):
+        (command, cwd), snaps = item
+        result = LaunchResult(exe=snaps[0].exe, command=command, expected=len(snaps))
+        start = time.perf_counter()
+        try:
+            result.pid = self.launch(command, cwd).pid
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            result.error = str(e)
+            self.logger(f"[!] Could not launch {snaps[0].exe}: {e}")
+            return result
+        result.launch_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        exe = snaps[0].exe.lower()
+        deadline = time.monotonic() + self.timeout
+        for snap_win in snaps:
+            remaining = deadline - time.monotonic()
+            if result.windows:
+                remaining = min(remaining, EXTRA_WINDOW_GRACE)
+            live_win = self._wait_and_claim(exe, remaining) if remaining > 0 else None
+            if live_win is None:
+                break
+            if result.ready_ms is None:
+                result.ready_ms = round((time.perf_counter() - start) * 1000, 2)
+            result.windows.append((snap_win, live_win))
+
+        if not result.windows:
+            result.error = f"no window within {self.timeout:g}s"
+            self.logger(f"[⚠️] {snaps[0].exe} started (pid {result.pid}) but showed no window within {self.timeout:g}s")
+        else:
+            self.logger(f"[✓] {snaps[0].exe} ready in {result.ready_ms} ms "
+                        f"({len(result.windows)}/{len(snaps)} window(s))")
+        return result
+
+    def _wait_and_claim(self, exe, timeout):
+        """Waits for an unclaimed window of exe and claims it; two launches never get the same window."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            with self._lock:
+                exclude = set(self._claimed)
+            record = self.wait_for(lambda w: w.exe.lower() == exe, timeout=remaining, exclude=exclude)
+            if record is None:
+                return None
+            with self._lock:
+                if record.hwnd not in self._claimed:
+                    self._claimed.add(record.hwnd)
+                    return record
+
+
+def relaunch_summary(results) -> dict:
+    return {
+        "apps": len(results),
+        "windows": sum(len(r.windows) for r in results),
+        "failed": sum(1 for r in results if not r.windows),
+        "launches": [r.report() for r in results],
+    }
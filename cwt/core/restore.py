@@ -1,19 +1,26 @@
 # core/restore.py
 
-import json
 import traceback
 import win32gui
 import win32con
 import win32api
-from fuzzywuzzy import fuzz
 from pathlib import Path
-from pyvda import AppView, get_virtual_desktops
-from cwt.utils.get_all_visible_windows import get_all_visible_windows
-from cwt.utils.vda_utils import get_current_virtual_desktop_id
-
-# Future: make this a .windowignore file
-IGNORED_PROCESSES = {"VoiceAccess.exe", "explorer.exe"}
+from pyvda import AppView
+from cwt.utils.get_all_visible_windows import (describe_window, enumerate_hwnds, get_all_visible_windows,
+                                               visible_titles)
+from cwt.utils.vda_utils import DesktopManager
+from cwt.core.snapshot_model import load_snapshot
+from cwt.core.restore_scheduler import RestoreOp, RestoreScheduler
+from cwt.core.window_rules import load_rules
+from cwt.core.title_matcher import DEFAULT_MATCHER, match_titles, threshold_for
+from cwt.core.match_memo import get_match_memo
+from cwt.core.lazy_restore import LazyDesktopRestore, replace_active
+from cwt.core.restore_checkpoint import MINIMIZED_POS, get_checkpoints, take_checkpoint, undo_ops
+from cwt.core.restore_verify import VERIFY_PASSES, AdaptivePacer, converge
+from cwt.core.restore_plan_cache import RestorePlan, get_plan_cache, live_fingerprint
+from cwt.core.relaunch import READY_TIMEOUT, Relauncher, relaunch_summary
 
+DESKTOP_PACER = AdaptivePacer()     # shared: the virtual desktop service is one per session
 
 def get_monitor_bounds():
     """
@@ -61,111 +68,544 @@ def move_and_resize(hwnd, x, y, width, height, logger=print):
         logger(f"[!] MoveWindow failed for hwnd {hwnd}: {e}")
         logger(traceback.format_exc())
 
-def load_snapshot(snapshot_path):
-    with open(snapshot_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def match_windows(snapshot, current_windows, threshold):
+def match_windows(snapshot, current_windows, threshold, matcher=DEFAULT_MATCHER, logger=print):
     """
-    Performs fuzzy matching between saved snapshot windows and currently visible windows.
+    Matches saved snapshot windows to currently visible windows of the same exe.
 
     Args:
-        snapshot (dict): Snapshot data containing saved window entries.
-        current_windows (list): List of currently visible windows.
+        snapshot (Snapshot): Loaded snapshot model.
+        current_windows (list): Currently visible windows (WindowRecord or enumeration dicts).
         threshold (int): Matching score threshold to consider a window a valid match.
+        matcher (str): "fuzzy" (partial_ratio) or "tfidf" (character n-gram TF-IDF).
+        logger (Callable): Logging function for status messages.
 
     Returns:
         list: Tuples of (snapshot_window, matched_live_window, match_score)
     """
-    matches = []
-    for snap_win in snapshot["windows"]:
-        best_match = None
-        best_score = 0
-        for live_win in current_windows:
-            if snap_win["exe"].lower() == live_win["exe"].lower():
-                score = fuzz.partial_ratio(snap_win["title"], live_win["title"])
-                if score > best_score:
-                    best_score = score
-                    best_match = live_win
-        matches.append((snap_win, best_match, best_score))
-    return matches
-
-def resolve_desktop(snap_win, logger):
-    desktops = get_virtual_desktops()
-    for d in desktops:
-        if str(d.id) == snap_win.get("desktop_id"):
-            return d
-    index = snap_win.get("desktop_number")
-    if isinstance(index, int) and 0 < index <= len(desktops):
+    return match_titles(snapshot.windows, current_windows, matcher, logger)
+
+def resolve_desktop(snap_win, desktops, logger):
+    """Resolves the target desktop for a snapshot window from the shared desktop map."""
+    try:
+        return desktops.resolve(snap_win)
+    except Exception as e:
+        logger(f"[!] Failed to resolve desktop for {snap_win.title}: {e}")
+    return None
+
+def apply_window_batch(ops, logger=print, keep_z_order=False):
+    """
+    Positions a front-to-back list of RestoreOps in a single DeferWindowPos
+    batch, chaining each window behind the previous one so the snapshot's
+    stacking order is applied in one go. Falls back to per-window SetWindowPos
+    if the batch is rejected (e.g. a window closed mid-restore).
+
+    With keep_z_order the rects are fixed without touching the stacking order
+    (verify passes re-issue a subset that must not jump above the rest).
+
+    Returns:
+        int: Number of windows placed.
+    """
+    for op in ops:
         try:
-            return desktops[index - 1]
+            if win32gui.IsIconic(op.hwnd) or win32gui.IsZoomed(op.hwnd):
+                win32gui.ShowWindow(op.hwnd, win32con.SW_SHOWNOACTIVATE)
+                win32gui.ShowWindow(op.hwnd, win32con.SW_RESTORE)
         except Exception as e:
-            logger(f"[!] Failed to resolve desktop index {index} for {snap_win.get('title', '')}: {e}")
-    return None
+            logger(f"[!] ShowWindow failed for hwnd {op.hwnd}: {e}")
 
-def restore_window_layout(matches, threshold, logger):
-    bounds = get_monitor_bounds()
+    flags = win32con.SWP_NOACTIVATE | win32con.SWP_NOOWNERZORDER
+    if keep_z_order:
+        flags |= win32con.SWP_NOZORDER
+    try:
+        hdwp = win32gui.BeginDeferWindowPos(len(ops))
+        for i, op in enumerate(ops):
+            insert_after = win32con.HWND_TOP if i == 0 else ops[i - 1].hwnd
+            hdwp = win32gui.DeferWindowPos(hdwp, op.hwnd, insert_after, *op.rect, flags)
+        win32gui.EndDeferWindowPos(hdwp)
+        return len(ops)
+    except Exception as e:
+        logger(f"[⚠️] Batched placement failed ({e}) — placing windows one by one")
+
+    placed = 0
+    for i, op in enumerate(ops):
+        insert_after = win32con.HWND_TOP if i == 0 else ops[i - 1].hwnd
+        try:
+            win32gui.SetWindowPos(op.hwnd, insert_after, *op.rect, flags)
+            placed += 1
+        except Exception as e:
+            logger(f"[!] SetWindowPos failed for hwnd {op.hwnd}: {e}")
+    return placed
+
+def plan_restore(matches, threshold, logger, desktops, rules=None, bounds=None):
+    """
+    Turns match results into RestoreOps, dropping ignored, off-screen and unmatched windows.
+
+    Returns:
+        tuple: (ops, summary) — summary holds skipped/unmatched counts.
+    """
+    if bounds is None:
+        bounds = get_monitor_bounds()
     logger(f"[🖥️] Monitor bounds: x={bounds[0]}→{bounds[2]}, y={bounds[1]}→{bounds[3]}")
+    summary = {"restored": 0, "skipped": 0, "unmatched": 0}
+    ops = []
+    claimed = set()
 
     for snap_win, live_win, score in matches:
-        if score >= threshold and live_win:
-            if snap_win.get("exe") in IGNORED_PROCESSES:
-                logger(f"[!] Skipping known system window: {snap_win['exe']}")
-                continue
-
-            x, y, w, h = snap_win["x"], snap_win["y"], snap_win["width"], snap_win["height"]
-
-            if not is_within_bounds(x, y, w, h, bounds):
-                logger(f"[⚠️] Out of bounds — skipping: '{snap_win['title']}' @ ({x}, {y}) {w}×{h}")
-                continue
-
-            hwnd = live_win["hwnd"]
-            move_and_resize(hwnd, x, y, w, h, logger)
-            target_desktop = resolve_desktop(snap_win, logger)
-            if target_desktop:
-                try:
-                    AppView(hwnd).move(target_desktop)
-                except Exception as e:
-                    logger(f"[!] Failed to move hwnd {hwnd} to desktop: {e}")
-                    logger(traceback.format_exc())
-            logger(f"[✓] {snap_win['title']} → {live_win['title']} (score: {score})")
+        if score < threshold or not live_win:
+            logger(f"[!] No match: {snap_win.title} (best: {score})")
+            summary["unmatched"] += 1
+            continue
+        if rules is not None and rules.ignores(snap_win):
+            logger(f"[!] Skipping ignored window: {snap_win.exe} — {snap_win.title}")
+            summary["skipped"] += 1
+            continue
+        if not is_within_bounds(snap_win.x, snap_win.y, snap_win.width, snap_win.height, bounds):
+            logger(f"[⚠️] Out of bounds — skipping: '{snap_win.title}' @ ({snap_win.x}, {snap_win.y}) "
+                   f"{snap_win.width}×{snap_win.height}")
+            summary["skipped"] += 1
+            continue
+        if live_win.hwnd in claimed:
+            # Two snapshot rows matched the same live window; the first (topmost) wins
+            summary["skipped"] += 1
+            continue
+        claimed.add(live_win.hwnd)
+
+        target = resolve_desktop(snap_win, desktops, logger)
+        guid = str(target.id) if target else None
+        ops.append(RestoreOp(snap_win, live_win, score, guid, desktops.number_of(guid) if guid else None))
+        logger(f"[✓] {snap_win.title} → {live_win.title} (score: {score})")
+
+    return ops, summary
+
+def restore_window_layout(matches, threshold, logger, desktops=None, progress=None, background=False,
+                          rules=None):
+    """
+    Moves matched windows into place and onto their desktops — the current
+    desktop first, then the others, each in one z-ordered batch.
+
+    Args:
+        progress (Callable[[dict], None]): Per-desktop progress events.
+        background (bool): Return once the current desktop is restored and
+            finish the other desktops on a background thread.
+        rules (RuleSet): Ignore rules; matching snapshot windows are skipped.
+
+    Returns:
+        dict: Counts of restored, skipped and unmatched windows plus scheduling stats.
+    """
+    if desktops is None:
+        desktops = DesktopManager(logger=logger)
+    ops, summary = plan_restore(matches, threshold, logger, desktops, rules)
+    summary.update(execute_restore_plan(ops, logger, desktops, progress, background))
+    return summary
+
+def move_window_to_desktop(op, desktops, logger=print, pacer=None):
+    """
+    Moves op's window onto its target desktop, unless it is already known to be
+    there. Calls are spaced by an AdaptivePacer (default: the process-wide
+    DESKTOP_PACER), which backs off while the virtual desktop service fails.
+    """
+    if op.live_win.desktop_number == op.desktop_number:
+        return True
+    pacer = pacer or DESKTOP_PACER
+    pacer.wait()
+    try:
+        AppView(op.hwnd).move(desktops.by_guid(op.desktop_guid))
+        pacer.record(True)
+        return True
+    except Exception as e:
+        pacer.record(False)
+        logger(f"[!] Failed to move hwnd {op.hwnd} to desktop: {e}")
+        return False
+
+def execute_restore_plan(ops, logger, desktops, progress=None, background=False, reissue=False):
+    """
+    Runs planned RestoreOps through the RestoreScheduler and focuses the
+    window the snapshot had on top. A reissue (verify pass) only fixes rects
+    and desktops: stacking order and focus are left as the first pass set them.
+
+    Returns:
+        dict: Scheduling stats (restored, desktops_done, foreground_ms, ...).
+    """
+    scheduler = RestoreScheduler(
+        apply_batch=lambda batch: apply_window_batch(batch, logger, keep_z_order=reissue),
+        move_to_desktop=lambda op: move_window_to_desktop(op, desktops, logger),
+        current_desktop=desktops.current_id(),
+        logger=logger,
+        progress=progress
+    )
+    result = scheduler.run(ops, background=background)
+
+    if scheduler.foreground_op and not reissue:
+        try:
+            win32gui.SetForegroundWindow(scheduler.foreground_op.hwnd)
+        except Exception as e:
+            logger(f"[!] SetForegroundWindow failed: {e}")
+    return result
+
+def read_window_layout(hwnds, desktops, window_cache=None):
+    """
+    Reads where a set of windows is right now, in one EnumWindows pass.
+
+    Returns:
+        dict: {hwnd: (x, y, width, height, z_order, desktop_guid, desktop_number, iconic)};
+        z_order ranks the requested windows front to back, minimized windows
+        report their restored rect and iconic=True.
+    """
+    wanted = set(hwnds)
+    cached = {w.hwnd: w for w in window_cache.windows()} if window_cache is not None else {}
+    guid_by_number = desktops.guid_map()
+    layout = {}
+    for z_order, hwnd in enumerate(h for h in enumerate_hwnds() if h in wanted):
+        try:
+            iconic = bool(win32gui.IsIconic(hwnd))
+            if iconic:
+                left, top, right, bottom = win32gui.GetWindowPlacement(hwnd)[4]
+            else:
+                left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        except Exception:
+            continue
+        if hwnd in cached:
+            number = cached[hwnd].desktop_number
+            guid = cached[hwnd].desktop_id or guid_by_number.get(number)
         else:
-            logger(f"[!] No match: {snap_win['title']} (best: {score})")
+            guid = desktops.desktop_of_window(hwnd)
+            number = desktops.number_of(guid)
+        layout[hwnd] = (left, top, right - left, bottom - top, z_order, guid, number, iconic)
+    return layout
 
-def restore_windows(snapshot_path, threshold=85, return_to_origin=True, logger=print):
+def execute_and_verify(ops, logger, desktops, progress=None, passes=VERIFY_PASSES):
+    """
+    execute_restore_plan(), then read every touched window back and re-issue
+    the ops that didn't land (see core/restore_verify.py).
+
+    Returns:
+        dict: The first pass's scheduling stats plus "verify": {passes, reissued,
+        unconverged, vanished, converge_ms, desktop_moves}.
+    """
+    first = [True]
+
+    def execute(batch):
+        # Progress events describe the restore itself, not the re-issue passes
+        reissue, first[0] = not first[0], False
+        return execute_restore_plan(batch, logger, desktops, None if reissue else progress, reissue=reissue)
+
+    # Read desktops straight from pyvda: a window cache never sees desktop moves
+    summary, stats = converge(ops, execute, lambda hwnds: read_window_layout(hwnds, desktops),
+                              passes=passes, logger=logger)
+    summary["verify"] = dict(stats, desktop_moves=DESKTOP_PACER.stats())
+    return summary
+
+def _execute(ops, logger, desktops, progress=None, background=False, passes=VERIFY_PASSES):
+    # A background run is still placing windows when execute returns — nothing to read back yet
+    if background or passes <= 1:
+        return execute_restore_plan(ops, logger, desktops, progress, background)
+    return execute_and_verify(ops, logger, desktops, progress, passes)
+
+def _layout_from_ops(ops, desktops):
+    """Pre-restore layout straight from the live records the plan was matched against."""
+    guid_by_number = desktops.guid_map()
+    layout = {}
+    for op in ops:
+        w = op.live_win
+        try:
+            iconic = bool(win32gui.IsIconic(op.hwnd))
+        except Exception:
+            iconic = w.x <= MINIMIZED_POS and w.y <= MINIMIZED_POS
+        layout[op.hwnd] = (w.x, w.y, w.width, w.height, w.z_order,
+                           w.desktop_id or guid_by_number.get(w.desktop_number), w.desktop_number, iconic)
+    return layout
+
+def _split_lazy(ops, desktops, window_cache):
+    """
+    Splits ops for a lazy restore: (now, later, evict). `now` targets the current
+    desktop; `later` waits for a first visit; `evict` are later ops whose window
+    sits on the current desktop (or may) and is moved off it right away.
+    """
+    current = desktops.current_id()
+    current_number = desktops.number_of(current)
+    now, later, evict = [], [], []
+    for op in ops:
+        if not op.desktop_guid or op.desktop_guid == current:
+            now.append(op)
+            continue
+        later.append(op)
+        live = window_cache.get(op.hwnd) if window_cache is not None else None
+        number = (live or op.live_win).desktop_number
+        if number is None or number == current_number:
+            evict.append(op)
+    return now, later, evict
+
+def _live_fingerprint(desktops, bounds, current_windows, window_cache):
+    """Fingerprint of the live layout from whatever is cheapest: given windows, the cache, or titles only."""
+    if current_windows is not None:
+        windows, source = current_windows, "given"
+    elif window_cache is not None:
+        windows, source = window_cache.windows(), "cache"
+    else:
+        windows, source = visible_titles(), "enum"
+    guids = [g for _, g in sorted(desktops.guid_map().items())]
+    return live_fingerprint(windows, guids, bounds, source)
+
+def _relaunch_missing(matches, threshold, rules, desktops, window_cache, timeout, logger):
+    """
+    Starts the apps of unmatched snapshot windows and pairs each with the window it opens.
+
+    Returns:
+        tuple: (matches with the new windows filled in, relaunch summary or None)
+    """
+    missing = [snap_win for snap_win, live_win, score in matches
+               if (score < threshold or not live_win) and not rules.ignores(snap_win)
+               and (snap_win.cmdline or snap_win.exe_path)]
+    if not missing:
+        return matches, None
+    source = None
+    if window_cache is None:
+        # Readiness is event-driven: a one-off cache gets its WinEvent hook for the launches
+        from cwt.core.window_cache import start_live_cache
+        window_cache, source = start_live_cache(desktops, rules, logger)
+    try:
+        relauncher = Relauncher(window_cache.wait_for,
+                                existing_hwnds={w.hwnd for w in window_cache.windows()},
+                                timeout=timeout, logger=logger)
+        results = relauncher.relaunch(missing)
+    finally:
+        if source is not None:
+            source.stop()
+    opened = {id(snap_win): live_win for r in results for snap_win, live_win in r.windows}
+    matches = [(snap_win, opened[id(snap_win)], 100) if id(snap_win) in opened else (snap_win, live_win, score)
+               for snap_win, live_win, score in matches]
+    return matches, relaunch_summary(results)
+
+def restore_windows(snapshot_path, threshold=None, return_to_origin=True, logger=print,
+                    provision_desktops=True, desktops=None, current_windows=None, window_cache=None,
+                    progress=None, background=False, rules=None, matcher=DEFAULT_MATCHER, memo=None,
+                    plan_cache=None, on_plan=None, lazy=False, checkpoints=None, verify_passes=VERIFY_PASSES,
+                    relaunch=False, relaunch_timeout=READY_TIMEOUT, submit=None):
     """
     Restores a captured workspace snapshot by matching saved windows to current ones,
     moving them to their original positions, and optionally reassigning them to their
     original virtual desktops. Also returns to the starting desktop if requested.
 
+    When the snapshot file, the live windows (hwnds and titles), desktops, monitors,
+    threshold, matcher and rules are all unchanged since an earlier restore of it,
+    the compiled plan is reused and execution starts without loading, enumerating
+    or matching anything.
+
     Args:
         snapshot_path (str): Path to the snapshot JSON file.
-        threshold (int): Fuzzy match threshold for window comparison (0–100).
+        threshold (int): Match score threshold (0–100); the matcher's default when None.
         return_to_origin (bool): Whether to return to the original desktop after restore.
         logger (Callable): Logging function for status messages.
+        provision_desktops (bool): Create and name any desktops the snapshot expects
+            before windows are placed.
+        desktops (DesktopManager): Pre-built desktop map (e.g. kept warm by the daemon).
+        current_windows (list): Pre-enumerated live windows; enumerated fresh when omitted.
+        window_cache (WindowStateCache): Live window cache to read current windows from.
+        progress (Callable[[dict], None]): Per-desktop progress events (see RestoreScheduler).
+        background (bool): Return once the current desktop is restored; other desktops
+            finish on a background thread.
+        rules (RuleSet): Compiled ignore rules; loaded from .windowignore when omitted.
+        matcher (str): Title matcher — "fuzzy" or "tfidf" (see core/title_matcher.py).
+        memo (MatchMemo): Remembered pairings to resolve before scoring (default: the
+            shared memo in storage/match_memo.json). Pass False to always score.
+        plan_cache (RestorePlanCache): Compiled plans to reuse (default: the process-wide
+            cache). Pass False to always plan from scratch.
+        on_plan (Callable[[list], None]): Receives the RestoreOps just before they
+            execute (the workspace switcher records its window sets from them).
+        lazy (bool): Restore only the current desktop now; every other desktop is
+            restored the first time the user switches to it (see core/lazy_restore.py).
+            Needs a long-lived process (daemon, GUI) to see the visits.
+        checkpoints (CheckpointStack): Where the pre-restore layout of every touched
+            window is recorded for undo_restore() (default: the shared stack in
+            storage/restore_checkpoints.json). Pass False to skip.
+        verify_passes (int): Executions allowed per window, read-back re-issues included
+            (see core/restore_verify.py); 1 executes once without checking. Windows a
+            background restore finishes later are not verified.
+        relaunch (bool): Start the apps of snapshot windows that have no live match,
+            from their captured command line and working directory, and place the
+            windows they open (see core/relaunch.py).
+        relaunch_timeout (float): Seconds to wait for each relaunched app's first window.
+        submit (Callable): submit(fn, *args) → Future on the thread that owns `desktops`
+            (the daemon's COM worker); lazy desktops are restored through it.
+
+    Returns:
+        dict: Restore summary (snapshot path, window counts, desktops provisioned).
     """
-    snapshot = load_snapshot(snapshot_path)
-    current_windows = get_all_visible_windows()
-    start_desktop = get_current_virtual_desktop_id()
+    # A new restore supersedes desktops still waiting from an earlier lazy one
+    replace_active(None)
+    if rules is None:
+        rules = load_rules(logger=logger)
+    if desktops is None:
+        desktops = DesktopManager(logger=logger)
+    if plan_cache is None:
+        plan_cache = get_plan_cache()
+    threshold = threshold_for(matcher, threshold)
+    start_desktop = desktops.current_id()
+
+    snapshot = plan = key = None
+    snapshot_hash = meta = None
+    if plan_cache is not False:
+        snapshot_hash = plan_cache.snapshot_hash(snapshot_path)
+        meta = plan_cache.snapshot_meta(snapshot_hash)
+    if meta is None:
+        snapshot = load_snapshot(snapshot_path)
+        meta = (snapshot.collection_name, snapshot.desktops, len(snapshot.windows))
+    collection_name, snapshot_desktops, window_count = meta
+
+    provisioned = {"created": 0, "renamed": 0}
+    if provision_desktops:
+        provisioned = desktops.provision(snapshot_desktops)
+
+    logger(f"\n📂 Collection: {collection_name}")
+    logger(f"🖥️ Desktops: {len(snapshot_desktops)} — {' | '.join(snapshot_desktops.values())}\n")
+
+    bounds = get_monitor_bounds()
+    if plan_cache is not False:
+        key = (snapshot_hash, _live_fingerprint(desktops, bounds, current_windows, window_cache),
+               threshold, matcher, tuple(r.source for r in rules.rules))
+        plan = plan_cache.get(key)
+        if plan is not None and relaunch and plan.summary.get("unmatched"):
+            plan = None         # the cached plan gave up on windows a relaunch may bring back
 
-    ws_name = snapshot.get("workspace", "Unnamed Workspace")
-    desktops = snapshot.get("desktops", {})
-    desktop_count = len(desktops)
-    desktop_labels = list(desktops.values())
+    memo_stats = {}
+    relaunched = None
+    if plan is not None:
+        logger(f"[⚡] Reusing cached restore plan ({len(plan.ops)} window(s), used {plan.hits}×)")
+        ops, summary = plan.ops, dict(plan.summary)
+    else:
+        if snapshot is None:
+            snapshot = load_snapshot(snapshot_path)
+        if current_windows is None and window_cache is not None:
+            current_windows = window_cache.windows()
+        if current_windows is None:
+            current_windows = get_all_visible_windows(desktops, rules)
 
-    logger(f"\n📂 Workspace: {ws_name}")
-    logger(f"🖥️ Desktops: {desktop_count} — {' | '.join(desktop_labels)}\n")
+        if memo is None:
+            memo = get_match_memo(logger)
+        if memo is not False:
+            matches, memo_stats = memo.match(snapshot.windows, current_windows, threshold, matcher, logger)
+        else:
+            matches = match_windows(snapshot, current_windows, threshold, matcher, logger)
+        if relaunch:
+            matches, relaunched = _relaunch_missing(matches, threshold, rules, desktops, window_cache,
+                                                    relaunch_timeout, logger)
+            if relaunched and relaunched["windows"]:
+                key = None      # the key fingerprints the layout from before the launches
+        ops, summary = plan_restore(matches, threshold, logger, desktops, rules, bounds)
+        if key is not None:
+            plan_cache.put(key, RestorePlan(collection_name, snapshot_desktops, window_count,
+                                            list(ops), dict(summary)))
 
-    matches = match_windows(snapshot, current_windows, threshold)
-    restore_window_layout(matches, threshold, logger)
+    if on_plan is not None:
+        on_plan(ops)
+    if checkpoints is None:
+        checkpoints = get_checkpoints(logger)
+    if checkpoints is not False and ops:
+        # A cached plan's live records are as old as the plan: re-read just the touched windows
+        layout = read_window_layout([op.hwnd for op in ops], desktops, window_cache) if plan is not None \
+            else _layout_from_ops(ops, desktops)
+        checkpoints.push(take_checkpoint(ops, layout, snapshot_path))
+    if lazy:
+        now, later, evict = _split_lazy(ops, desktops, window_cache)
+        for op in evict:
+            move_window_to_desktop(op, desktops, logger)
+        summary.update(_execute(now, logger, desktops, progress, background, verify_passes))
+        lookup = window_cache.get if window_cache is not None else (lambda hwnd: describe_window(hwnd, desktops))
+        pending = LazyDesktopRestore(
+            execute=lambda batch: _execute(batch, logger, desktops, passes=verify_passes),
+            current_desktop=desktops.current_id,
+            lookup=lookup,
+            logger=logger,
+            progress=progress,
+            submit=submit,
+            live_desktop=lambda hwnd: desktops.number_of(desktops.desktop_of_window(hwnd))
+        )
+        queued = pending.register(later)
+        replace_active(pending).start()
+        summary["lazy_pending"] = {desktops.number_of(guid): n for guid, n in queued.items()}
+        summary["lazy_evicted"] = len(evict)
+        logger(f"[💤] {len(later)} window(s) on {len(queued)} other desktop(s) will be restored on first visit")
+    else:
+        summary.update(_execute(ops, logger, desktops, progress, background, verify_passes))
+    if plan is None and memo is not False:
+        try:
+            memo.save()
+        except OSError as e:
+            logger(f"[⚠️] Match memo not saved: {e}")
 
     if return_to_origin:
         try:
-            for d in get_virtual_desktops():
-                if str(d.id) == start_desktop:
-                    d.go()
-                    logger("[↩] Returned to starting desktop")
-                    break
+            origin = desktops.by_guid(start_desktop)
+            if origin:
+                origin.go()
+                logger("[↩] Returned to starting desktop")
         except Exception as e:
             logger(f"[!] Could not return to origin: {e}")
-            logger(traceback.format_exc())
\ No newline at end of file
+            logger(traceback.format_exc())
+
+    summary.update({
+        "snapshot": str(snapshot_path),
+        "windows": window_count,
+        "matcher": matcher,
+        "plan_cache": "off" if plan_cache is False else ("hit" if plan is not None else "miss"),
+        **memo_stats,
+        **({"relaunch": relaunched} if relaunched else {}),
+        "desktops_created": provisioned["created"],
+        "desktops_renamed": provisioned["renamed"],
+    })
+    return summary
+
+def window_alive(window):
+    """True while window.hwnd exists and still has the recorded window class (hwnds get reused)."""
+    try:
+        return bool(win32gui.IsWindow(window.hwnd)) and (
+            not window.class_name or win32gui.GetClassName(window.hwnd) == window.class_name)
+    except Exception:
+        return False
+
+def undo_restore(logger=print, desktops=None, checkpoints=None):
+    """
+    Puts every window the last restore touched back where it was, through the
+    same batched executor as a restore.
+
+    Args:
+        logger (Callable): Logging function for status messages.
+        desktops (DesktopManager): Shared desktop map.
+        checkpoints (CheckpointStack): Checkpoint stack (default: the shared one).
+
+    Returns:
+        dict: Executor summary plus "snapshot" (the restore undone), "windows"
+        (checkpointed) and "closed" (windows that no longer exist), or
+        {"undone": False} when there is nothing to undo.
+    """
+    replace_active(None)                # pending lazy desktops belong to the restore being undone
+    if checkpoints is None:
+        checkpoints = get_checkpoints(logger)
+    checkpoint = checkpoints.peek()
+    if checkpoint is None:
+        logger("[!] Nothing to undo")
+        return {"undone": False}
+    if desktops is None:
+        desktops = DesktopManager(logger=logger)
+
+    ops, minimized = undo_ops(checkpoint, window_alive)
+    closed = len(checkpoint["windows"]) - len(ops) - len(minimized)
+    summary = _execute(ops, logger, desktops)
+    for op in minimized:
+        move_window_to_desktop(op, desktops, logger)
+        try:
+            win32gui.ShowWindowAsync(op.hwnd, win32con.SW_SHOWMINNOACTIVE)
+        except Exception as e:
+            logger(f"[!] Failed to minimize hwnd {op.hwnd}: {e}")
+    checkpoints.pop()
+
+    logger(f"[↩] Undid restore of {checkpoint['snapshot']}: {summary.get('restored', 0) + len(minimized)} "
+           f"window(s) put back, {closed} already closed")
+    summary.update({
+        "undone": True,
+        "snapshot": checkpoint["snapshot"],
+        "windows": len(checkpoint["windows"]),
+        "minimized": len(minimized),
+        "closed": closed,
+    })
+    return summary
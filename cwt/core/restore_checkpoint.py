@@ -0,0 +1,136 @@
+# core/restore_checkpoint.py
+
+"""
+Pre-restore layout checkpoints, for undo.
+
+Before restore_windows() executes its plan it records, for every window it
+is about to touch, where that window is now: rect, desktop and z-order. The
+data comes from the enumeration the restore already did (a cached plan
+re-reads just the touched windows in one EnumWindows pass), so taking a
+checkpoint costs no extra enumeration.
+
+Undo turns the newest checkpoint back into RestoreOps and runs them through
+the same batched executor as a restore. Checkpoints are kept in memory and
+persisted to storage/restore_checkpoints.json (newest last, a few deep), so
+undo still works after the GUI or daemon restarts — as long as the windows
+are still open: each entry is only replayed while its hwnd is alive with the
+same window class.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from cwt.core.restore_scheduler import RestoreOp
+from cwt.core.snapshot_model import WindowRecord, _write_json_atomic
+from cwt.utils.paths import RESTORE_CHECKPOINTS
+
+MAX_CHECKPOINTS = 5
+MINIMIZED_POS = -32000      # GetWindowRect of a minimized window (fallback when IsIconic can't be asked)
+
+
+def take_checkpoint(ops, layout, snapshot_path=None) -> dict:
+    """
+    Args:
+        ops (list): RestoreOps about to execute.
+        layout (dict): {hwnd: (x, y, width, height, z_order, desktop_guid, desktop_number, iconic)}
+            — where each window is before the restore.
+        snapshot_path (str): The snapshot being restored (for display).
+
+    Returns:
+        dict: {"snapshot", "created", "windows": [...]}
+    """
+    windows = []
+    for op in ops:
+        if op.hwnd not in layout:
+            continue
+        x, y, width, height, z_order, guid, number, iconic = layout[op.hwnd]
+        live = op.live_win
+        windows.append({
+            "hwnd": op.hwnd, "title": live.title, "exe": live.exe, "class_name": live.class_name,
+            "x": x, "y": y, "width": width, "height": height, "z_order": z_order,
+            "desktop_id": guid, "desktop_number": number,
+            "restored_to": op.desktop_number,       # where the restore sends it, so undo only moves back if needed
+            "minimized": iconic,
+        })
+    return {"snapshot": str(snapshot_path) if snapshot_path else None, "created": time.time(), "windows": windows}
+
+
+def undo_ops(checkpoint, alive=None):
+    """
+    RestoreOps that put every checkpointed window back.
+
+    Args:
+        checkpoint (dict): As returned by take_checkpoint().
+        alive (Callable[[WindowRecord], bool]): Filters out windows that have closed
+            (or whose hwnd now belongs to another window).
+
+    Returns:
+        tuple: (ops, minimized) — minimized windows have no rect to restore; they
+        only go back to their desktop and are minimized again.
+    """
+    ops, minimized = [], []
+    for entry in checkpoint.get("windows", ()):
+        record = WindowRecord.from_dict(entry)
+        if alive is not None and not alive(record):
+            continue
+        live = record.copy(desktop_number=entry.get("restored_to"))
+        op = RestoreOp(record, live, 100, entry.get("desktop_id"), entry.get("desktop_number"))
+        (minimized if entry.get("minimized") else ops).append(op)
+    return ops, minimized
+
+
+class CheckpointStack:
+    def __init__(self, path=RESTORE_CHECKPOINTS, depth=MAX_CHECKPOINTS, logger=print):
+        self.path = Path(path)
+        self.depth = depth
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._items = self._load()
+
+    def _load(self):
+        try:
+            items = json.loads(self.path.read_text(encoding="utf-8")).get("checkpoints", [])
+            return items if isinstance(items, list) else []
+        except (OSError, ValueError, AttributeError):
+            return []
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _write_json_atomic(self.path, {"checkpoints": self._items}, compact=True)
+        except OSError as e:
+            self.logger(f"[⚠️] Restore checkpoint not saved: {e}")
+
+    def push(self, checkpoint):
+        with self._lock:
+            self._items.append(checkpoint)
+            del self._items[:-self.depth]
+            self._save()
+
+    def peek(self):
+        with self._lock:
+            return self._items[-1] if self._items else None
+
+    def pop(self):
+        with self._lock:
+            if not self._items:
+                return None
+            checkpoint = self._items.pop()
+            self._save()
+            return checkpoint
+
+    def __len__(self):
+        return len(self._items)
+
+
+_stack = None
+
+
+def get_checkpoints(logger=print) -> CheckpointStack:
+    """Returns the shared checkpoint stack backed by storage/restore_checkpoints.json."""
+    global _stack
+    if _stack is None:
+        _stack = CheckpointStack(logger=logger)
+    return _stack
@@ -0,0 +1,136 @@
+# core/restore_plan_cache.py
+
+"""
+Compiled restore plans, cached by what they were computed from.
+
+A plan is the list of RestoreOps (hwnd, rect, target desktop) that
+load_snapshot → enumerate → match → resolve_desktop produced for one
+snapshot against one set of live windows. It is keyed by
+
+    snapshot content hash     sha256 of the file bytes (memoized by mtime/size)
+    live fingerprint          hwnds + normalized titles + desktop GUIDs + monitor bounds
+    threshold, matcher, rules
+
+so restoring the same collection again — e.g. toggling between two
+collections during the day — skips straight to execution while nothing
+relevant has changed, and misses as soon as a window opens or closes, a
+title changes meaningfully, a desktop is added, or the snapshot file is
+rewritten. Window rects are deliberately not part of the fingerprint:
+executing a plan moves them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from cwt.core.match_memo import normalize_title
+from cwt.core.restore_scheduler import RestoreOp
+
+
+@dataclass(slots=True)
+class RestorePlan:
+    collection_name: str
+    desktops: dict                  # snapshot desktop map, for provisioning
+    windows: int                    # snapshot window count
+    ops: list                       # RestoreOps, live desktop unknown (see RestorePlanCache.put)
+    summary: dict                   # skipped / unmatched counts from planning
+    created: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+def live_fingerprint(windows, desktop_guids=(), bounds=None, source="") -> str:
+    """
+    Cheap identity of the live window set.
+
+    Args:
+        windows (Iterable): (hwnd, title) pairs, WindowRecords or enumeration dicts.
+        desktop_guids (Iterable[str]): Live desktop GUIDs, in order.
+        bounds (tuple): Monitor bounds (plan_restore drops out-of-bounds windows).
+        source (str): Where the windows came from ("cache" / "enum"), so
+            fingerprints from different sources never collide.
+    """
+    pairs = sorted(w if isinstance(w, tuple) else (w["hwnd"], w["title"]) if isinstance(w, dict) else (w.hwnd, w.title)
+                   for w in windows)
+    h = hashlib.sha1(source.encode())
+    for hwnd, title in pairs:
+        h.update(f"{hwnd}\x1f{normalize_title(title or '')}\x1e".encode("utf-8", "surrogatepass"))
+    h.update("\x1d".join(map(str, desktop_guids)).encode())
+    h.update(repr(bounds).encode())
+    return h.hexdigest()
+
+
+class RestorePlanCache:
+    def __init__(self, max_plans=16):
+        self.max_plans = max_plans
+        self._plans = OrderedDict()
+        self._file_hashes = {}          # path → (mtime_ns, size, sha256)
+        self._meta = {}                 # snapshot hash → (collection_name, desktops, windows)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def snapshot_hash(self, path) -> str:
+        path = Path(path)
+        st = path.stat()
+        key = str(path.resolve())
+        cached = self._file_hashes.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self._file_hashes[key] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def snapshot_meta(self, snapshot_hash):
+        """(collection_name, desktops, window count) from any plan of this snapshot, or None."""
+        return self._meta.get(snapshot_hash)
+
+    def get(self, key):
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            plan.hits += 1
+            self.hits += 1
+            return plan
+
+    def put(self, key, plan: RestorePlan):
+        # Executing the plan moves windows, so the live desktop each op saw is stale
+        # afterwards: cached ops always issue their desktop move.
+        plan.ops = [RestoreOp(op.snap_win, op.live_win.copy(desktop_number=None), op.score,
+                              op.desktop_guid, op.desktop_number) for op in plan.ops]
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+            self._meta[key[0]] = (plan.collection_name, plan.desktops, plan.windows)
+
+    def invalidate(self, snapshot_hash=None):
+        """Drops every plan, or only the plans of one snapshot."""
+        with self._lock:
+            if snapshot_hash is None:
+                self._plans.clear()
+                self._meta.clear()
+                return
+            for key in [k for k in self._plans if k[0] == snapshot_hash]:
+                del self._plans[key]
+            self._meta.pop(snapshot_hash, None)
+
+    def __len__(self):
+        return len(self._plans)
+
+
+_cache = None
+
+
+def get_plan_cache() -> RestorePlanCache:
+    """Returns the process-wide plan cache (the daemon and GUI keep it warm between restores)."""
+    global _cache
+    if _cache is None:
+        _cache = RestorePlanCache()
+    return _cache
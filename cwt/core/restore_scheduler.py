@@ -0,0 +1,169 @@
+# core/restore_scheduler.py
+
+"""
+Restore scheduling: which windows move, in what order, on which thread.
+
+Matched windows are grouped by target desktop. The desktop the user is
+looking at is restored first, on the calling thread, so it is usable
+almost immediately; every other desktop is restored afterwards (optionally
+on a background thread) while the user already works. Within a desktop the
+whole group is positioned in one batch, ordered by the snapshot's z_order
+so the captured stacking is reproduced instead of "last window touched wins".
+
+The Win32 / pyvda side is injected (apply_batch, move_to_desktop), so the
+ordering logic runs and can be exercised without a Windows session.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(slots=True)
+class RestoreOp:
+    """One window to place: the snapshot row, the live window it matched and where it goes."""
+    snap_win: object
+    live_win: object
+    score: int
+    desktop_guid: Optional[str] = None    # target desktop, None = leave where it is
+    desktop_number: Optional[int] = None
+
+    @property
+    def hwnd(self):
+        return self.live_win.hwnd
+
+    @property
+    def rect(self):
+        s = self.snap_win
+        return s.x, s.y, s.width, s.height
+
+    @property
+    def z_order(self):
+        z = self.snap_win.z_order
+        return z if z is not None and z >= 0 else 1 << 30   # unknown → bottom of the stack
+
+
+class RestoreScheduler:
+    def __init__(self, apply_batch: Callable, move_to_desktop: Callable = None, current_desktop: str = None,
+                 logger=print, progress: Callable[[dict], None] = None):
+        """
+        Args:
+            apply_batch (Callable[[list], int]): Positions and stacks a front-to-back list of
+                RestoreOps in one batch; returns how many were placed.
+            move_to_desktop (Callable[[RestoreOp], bool]): Moves one window onto op.desktop_guid.
+            current_desktop (str): GUID of the desktop the user is looking at.
+            logger (Callable): Logging function for status messages.
+            progress (Callable[[dict], None]): Receives one event per finished desktop and a
+                final {"stage": "complete"} event.
+        """
+        self.apply_batch = apply_batch
+        self.move_to_desktop = move_to_desktop
+        self.current_desktop = current_desktop
+        self.logger = logger
+        self.progress = progress
+        self._thread = None
+        self.foreground_op = None
+        self.summary = {"restored": 0, "desktops_done": 0, "desktops_total": 0, "foreground_ms": None}
+
+    def batches(self, ops):
+        """
+        Groups ops by target desktop: the current desktop (and windows with no
+        desktop target) first, the rest by desktop number. Each group is sorted
+        front-to-back by snapshot z_order.
+        """
+        groups = {}
+        for op in ops:
+            key = op.desktop_guid if op.desktop_guid != self.current_desktop else None
+            groups.setdefault(key, []).append(op)
+
+        def rank(item):
+            key, group = item
+            if key is None:
+                return (0, 0)
+            return (1, min((op.desktop_number or 1 << 30) for op in group))
+
+        ordered = sorted(groups.items(), key=rank)
+        return [(key, sorted(group, key=lambda op: op.z_order)) for key, group in ordered]
+
+    def _move_group(self, group):
+        if self.move_to_desktop:
+            for op in group:
+                if op.desktop_guid:
+                    self.move_to_desktop(op)
+
+    def _run_batch(self, key, group, move=True):
+        start = time.perf_counter()
+        if move:
+            self._move_group(group)
+        placed = self.apply_batch(group)
+        self.summary["restored"] += placed
+        self.summary["desktops_done"] += 1
+        event = {
+            "stage": "desktop",
+            "desktop": group[0].desktop_number if key is not None else "current",
+            "windows": placed,
+            "desktops_done": self.summary["desktops_done"],
+            "desktops_total": self.summary["desktops_total"],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        self.logger(f"[✓] Desktop {event['desktop']}: {placed} window(s) placed in {event['elapsed_ms']} ms")
+        if self.progress:
+            self.progress(event)
+
+    def _run_remaining(self, batches, move=True):
+        try:
+            for key, group in batches:
+                self._run_batch(key, group, move)
+        except Exception as e:
+            self.logger(f"[!] Background restore stopped: {e}")
+        finally:
+            if self.progress:
+                self.progress(dict(self.summary, stage="complete"))
+
+    def run(self, ops, background=False):
+        """
+        Restores the current desktop synchronously, then the remaining desktops —
+        inline, or on a daemon thread when background is True. Desktop moves
+        (pyvda/COM) always happen on the calling thread; only the Win32
+        positioning of off-screen desktops is handed to the background thread.
+
+        Args:
+            ops (list): RestoreOps to apply.
+            background (bool): Return as soon as the current desktop is done.
+
+        Returns:
+            dict: Summary so far (restored, desktops_done/total, foreground_ms, pending).
+        """
+        start = time.perf_counter()
+        batches = self.batches(ops)
+        self.summary["desktops_total"] = len(batches)
+        if not batches:
+            if self.progress:
+                self.progress(dict(self.summary, stage="complete"))
+            return dict(self.summary, pending=0)
+
+        first, rest = batches[0], batches[1:]
+        if first[0] is None:
+            self._run_batch(*first)
+            self.foreground_op = first[1][0]
+        else:
+            rest = batches
+        self.summary["foreground_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        if background and rest:
+            for _, group in rest:
+                self._move_group(group)
+            self._thread = threading.Thread(target=self._run_remaining, args=(rest, False),
+                                            name="cwt-restore", daemon=True)
+            self._thread.start()
+            return dict(self.summary, pending=sum(len(g) for _, g in rest))
+
+        self._run_remaining(rest)
+        return dict(self.summary, pending=0)
+
+    def join(self, timeout=None):
+        """Waits for a background restore to finish."""
+        if self._thread:
+            self._thread.join(timeout)
+        return dict(self.summary)
@@ -0,0 +1,144 @@
+# core/restore_verify.py
+
+"""
+Verify-and-converge for restores, plus adaptive pacing of desktop moves.
+
+SetWindowPos / DeferWindowPos and AppView.move are fire-and-forget: an app
+that is still starting may ignore the first placement, one that enforces a
+minimum size ends up bigger than asked, and the virtual desktop service
+fails COM calls when it is hammered. After executing, converge() reads
+every touched window back in one batch (rect + desktop), re-issues only the
+ops that didn't land, and repeats for a few passes:
+
+    pass 1      execute everything
+    pass 2..n   read back → re-execute the ops that are off by more than
+                `tolerance` px or on the wrong desktop
+    done        everything landed, nothing is left to retry, or out of passes
+
+AdaptivePacer spaces out desktop moves: the delay doubles after a failed
+call and decays after each success, so a healthy session runs at full
+speed and a struggling one backs off instead of failing every call.
+
+The Win32 / pyvda side is injected (like RestoreScheduler), so this runs
+without a Windows session.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from cwt.core.restore_scheduler import RestoreOp
+
+VERIFY_PASSES = 3
+TOLERANCE = 2               # px — DWM can round a placement by a pixel
+SETTLE_SECONDS = 0.1        # before each re-check, times the pass number
+
+
+class AdaptivePacer:
+    def __init__(self, min_delay=0.0, max_delay=0.5, first_backoff=0.01, backoff=2.0, recover=0.5):
+        """
+        Args:
+            min_delay (float): Delay while calls succeed (seconds).
+            max_delay (float): Upper bound after repeated failures.
+            first_backoff (float): Delay after the first failure from min_delay.
+            backoff (float): Multiplier applied on each failure.
+            recover (float): Multiplier applied on each success.
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.first_backoff = first_backoff
+        self.backoff = backoff
+        self.recover = recover
+        self.delay = min_delay
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.delay > 0:
+            time.sleep(self.delay)
+
+    def record(self, ok):
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self.delay = max(self.min_delay, self.delay * self.recover)
+                if self.delay < self.first_backoff / 2:
+                    self.delay = self.min_delay
+            else:
+                self.failures += 1
+                self.delay = min(self.max_delay, max(self.first_backoff, self.delay * self.backoff))
+
+    def call(self, fn, *args):
+        """Runs fn(*args) after the current delay; a falsy result or an exception counts as a failure."""
+        self.wait()
+        try:
+            ok = bool(fn(*args))
+        except Exception:
+            self.record(False)
+            raise
+        self.record(ok)
+        return ok
+
+    def stats(self):
+        return {"calls": self.calls, "failures": self.failures, "delay_ms": round(self.delay * 1000, 1)}
+
+
+def landed(op, state, tolerance=TOLERANCE):
+    """True when the read-back state (x, y, width, height, z_order, guid, number, iconic) matches op's target."""
+    x, y, width, height, _, guid = state[:6]
+    tx, ty, tw, th = op.rect
+    if max(abs(x - tx), abs(y - ty), abs(width - tw), abs(height - th)) > tolerance:
+        return False
+    return op.desktop_guid is None or guid is None or guid == op.desktop_guid
+
+
+def converge(ops, execute: Callable[[list], dict], read_layout: Callable[[list], dict], passes=VERIFY_PASSES,
+             tolerance=TOLERANCE, settle=SETTLE_SECONDS, logger=print):
+    """
+    Executes ops, then re-issues whatever didn't land until it all has or passes run out.
+
+    Args:
+        ops (list): RestoreOps.
+        execute (Callable[[list], dict]): Runs a list of ops (execute_restore_plan); its
+            summary from the first pass is returned.
+        read_layout (Callable[[list], dict]): hwnds → {hwnd: (x, y, w, h, z, guid, number, iconic)}.
+        passes (int): Total executions allowed, the first included.
+        tolerance (int): Allowed rect error in px.
+        settle (float): Seconds to let windows settle before a re-check, times the pass number.
+        logger (Callable): Logging function for status messages.
+
+    Returns:
+        tuple: (first-pass summary, {"passes", "reissued", "unconverged", "vanished", "converge_ms"})
+    """
+    start = time.perf_counter()
+    summary = execute(ops)
+    stats = {"passes": 1, "reissued": 0, "unconverged": 0, "vanished": 0, "converge_ms": 0.0}
+    pending = list(ops)
+
+    while pending:
+        time.sleep(settle * stats["passes"])
+        layout = read_layout([op.hwnd for op in pending])
+        retry = []
+        for op in pending:
+            state = layout.get(op.hwnd)
+            if state is None:
+                stats["vanished"] += 1
+            elif not landed(op, state, tolerance):
+                # Only re-issue the desktop move if the read-back says it's on the wrong one
+                retry.append(RestoreOp(op.snap_win, op.live_win.copy(desktop_number=state[6]), op.score,
+                                       op.desktop_guid, op.desktop_number))
+        pending = retry
+        if not pending or stats["passes"] >= passes:
+            break
+        logger(f"[↻] Pass {stats['passes'] + 1}: re-issuing {len(pending)} window(s) that didn't land")
+        execute(pending)
+        stats["passes"] += 1
+        stats["reissued"] += len(pending)
+
+    stats["unconverged"] = len(pending)
+    stats["converge_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    if pending:
+        logger(f"[⚠️] {len(pending)} window(s) still off target after {stats['passes']} pass(es): "
+               + ", ".join(op.live_win.title[:40] for op in pending[:5]))
+    return summary, stats
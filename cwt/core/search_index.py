@@ -0,0 +1,328 @@
+# core/search_index.py
+
+"""
+Full-text search across every snapshot and workspace.
+
+One SQLite FTS5 table holds a row per captured window (title, exe, desktop,
+tab URLs, collection) and a row per workspace. Queries look like
+
+    obsidian desktop:5                 free text AND field filters
+    "Clear Trend" exe:chrome           quoted text is matched as a phrase
+    collection:morning url:github
+
+Free-text words match as prefixes. Fields: title, exe (alias app), desktop,
+url (alias tab), collection. A desktop is indexed as "<number> <name>", so
+desktop:5 and desktop:vault both work.
+
+The index is incremental: capture and workspace saves index their own file,
+and refresh() re-reads only files whose (mtime, size) changed and drops
+vanished ones. Rows are keyed by document id × ROW_SPAN + position, so a
+document's rows are replaced by an FTS5 rowid range delete instead of a
+full-table scan.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from cwt.core.snapshot_model import load_snapshot, load_workspace
+from cwt.utils.paths import SEARCH_INDEX, find_snapshot_files, get_snapshots_dir, get_workspaces_dir
+
+ROW_SPAN = 1 << 16      # max rows per document; rowid = doc_id * ROW_SPAN + position
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,              -- 'snapshot' or 'workspace'
+    collection TEXT,
+    captured_at TEXT,
+    mtime REAL,
+    size INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    title, exe, desktop, urls, collection,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+FIELD_ALIASES = {
+    "title": "title", "exe": "exe", "app": "exe", "desktop": "desktop",
+    "url": "urls", "tab": "urls", "collection": "collection",
+}
+TOKEN_REGEX = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+WORD_REGEX = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match(query: str) -> str:
+    """
+    Translates the search syntax into an FTS5 MATCH expression.
+
+    Raises:
+        ValueError: If the query has no searchable words.
+    """
+    terms = []
+    for field, phrase, word in TOKEN_REGEX.findall(query):
+        column = FIELD_ALIASES.get(field.lower())
+        text = phrase or word
+        if field and not column:                       # "foo:bar" that isn't a field
+            text = f"{field} {text}"
+        words = WORD_REGEX.findall(text)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"' + ("" if phrase else "*")
+        terms.append(f"{column} : {term}" if column else term)
+    if not terms:
+        raise ValueError(f"Nothing to search for in {query!r}")
+    return " AND ".join(terms)
+
+
+def _desktop_text(number, name):
+    return " ".join(str(part) for part in (number, name) if part not in (None, "", "Unknown"))
+
+
+def _window_urls(window):
+    # Tab URLs come from capture enrichers (core/capture_enrichers.py); most records have none
+    return " ".join(getattr(window, "urls", None) or ())
+
+
+class SearchIndex:
+    def __init__(self, path=SEARCH_INDEX, snapshots_root=None, workspaces_dir=None, logger=print):
+        """
+        Args:
+            path (Path): SQLite index file.
+            snapshots_root (Path): Snapshots root to refresh from (default: the app's).
+            workspaces_dir (Path): Workspaces folder to refresh from (default: the app's).
+            logger (Callable): Logging function for status messages.
+        """
+        self.path = Path(path)
+        self.snapshots_root = Path(snapshots_root) if snapshots_root else get_snapshots_dir()
+        self.workspaces_dir = Path(workspaces_dir) if workspaces_dir else get_workspaces_dir()
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.executescript(SCHEMA)
+        return conn
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+
+    def _replace(self, conn, path: Path, kind, collection, captured_at, rows):
+        st = path.stat()
+        key = str(path.resolve())
+        found = conn.execute("SELECT id FROM documents WHERE path = ?", (key,)).fetchone()
+        if found:
+            doc_id = found[0]
+            conn.execute("DELETE FROM entries WHERE rowid BETWEEN ? AND ?",
+                         (doc_id * ROW_SPAN, doc_id * ROW_SPAN + ROW_SPAN - 1))
+            conn.execute("UPDATE documents SET kind = ?, collection = ?, captured_at = ?, mtime = ?, size = ? "
+                         "WHERE id = ?", (kind, collection, captured_at, st.st_mtime, st.st_size, doc_id))
+        else:
+            doc_id = conn.execute(
+                "INSERT INTO documents (path, kind, collection, captured_at, mtime, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, collection, captured_at, st.st_mtime, st.st_size)
+            ).lastrowid
+        conn.executemany(
+            "INSERT INTO entries (rowid, title, exe, desktop, urls, collection) VALUES (?, ?, ?, ?, ?, ?)",
+            [(doc_id * ROW_SPAN + i, *row) for i, row in enumerate(rows[:ROW_SPAN])]
+        )
+
+    def _snapshot_rows(self, snapshot):
+        return [(w.title, w.exe, _desktop_text(w.desktop_number, w.desktop_name), _window_urls(w),
+                 snapshot.collection_name) for w in snapshot.windows]
+
+    def _workspace_rows(self, workspace):
+        desktops = " ".join(_desktop_text(n, name) for n, name in sorted(workspace.desktops.items()))
+        return [(workspace.workspace_name, "", desktops, "", " ".join(workspace.collections))]
+
+    def index_snapshot(self, path, snapshot=None):
+        """Indexes (or re-indexes) one snapshot file. Pass the Snapshot to skip re-reading it."""
+        path = Path(path)
+        snapshot = snapshot or load_snapshot(path)
+        captured = snapshot.captured_at.isoformat(timespec="seconds") if snapshot.captured_at else None
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    self._replace(conn, path, "snapshot", snapshot.collection_name, captured,
+                                  self._snapshot_rows(snapshot))
+            finally:
+                conn.close()
+
+    def index_workspace(self, path, workspace=None):
+        path = Path(path)
+        workspace = workspace or load_workspace(path)
+        created = workspace.created_at.isoformat(timespec="seconds") if workspace.created_at else None
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    self._replace(conn, path, "workspace", workspace.workspace_name, created,
+                                  self._workspace_rows(workspace))
+            finally:
+                conn.close()
+
+    def _forget(self, conn, doc_id):
+        conn.execute("DELETE FROM entries WHERE rowid BETWEEN ? AND ?",
+                     (doc_id * ROW_SPAN, doc_id * ROW_SPAN + ROW_SPAN - 1))
+        conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def _candidate_files(self):
+        snapshots = []
+        if self.snapshots_root.is_dir():
+            folders = [self.snapshots_root] + [d for d in self.snapshots_root.iterdir()
+                                               if d.is_dir() and not d.name.startswith(".")]
+            snapshots = [p for folder in folders for p in find_snapshot_files(folder)]
+        workspaces = sorted(self.workspaces_dir.glob("*.json")) if self.workspaces_dir.is_dir() else []
+        return [(p, "snapshot") for p in snapshots] + [(p, "workspace") for p in workspaces]
+
+    def refresh(self):
+        """
+        Brings the index up to date: (re)indexes new or changed files, drops
+        vanished ones. Unchanged files cost one stat each.
+
+        Returns:
+            dict: {"indexed", "removed", "unchanged", "failed": {path: error}, "elapsed_ms"}
+        """
+        start = time.perf_counter()
+        report = {"indexed": 0, "removed": 0, "unchanged": 0, "failed": {}}
+        with self._lock:
+            conn = self._connect()
+            try:
+                known = {path: (doc_id, mtime, size) for doc_id, path, mtime, size
+                         in conn.execute("SELECT id, path, mtime, size FROM documents")}
+                seen = set()
+                for path, kind in self._candidate_files():
+                    key = str(path.resolve())
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue                # deleted mid-scan: dropped below like any vanished file
+                    seen.add(key)
+                    entry = known.get(key)
+                    if entry and entry[1] == st.st_mtime and entry[2] == st.st_size:
+                        report["unchanged"] += 1
+                        continue
+                    try:
+                        if kind == "snapshot":
+                            doc = load_snapshot(path)
+                            captured = doc.captured_at.isoformat(timespec="seconds") if doc.captured_at else None
+                            args = ("snapshot", doc.collection_name, captured, self._snapshot_rows(doc))
+                        else:
+                            doc = load_workspace(path)
+                            created = doc.created_at.isoformat(timespec="seconds") if doc.created_at else None
+                            args = ("workspace", doc.workspace_name, created, self._workspace_rows(doc))
+                    except Exception as e:
+                        report["failed"][str(path)] = f"{type(e).__name__}: {e}"
+                        continue
+                    with conn:
+                        self._replace(conn, path, *args)
+                    report["indexed"] += 1
+                with conn:
+                    for key in known.keys() - seen:
+                        self._forget(conn, known[key][0])
+                        report["removed"] += 1
+            finally:
+                conn.close()
+        report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.logger(f"[✓] Search index: {report['indexed']} indexed, {report['removed']} removed, "
+                    f"{report['unchanged']} unchanged ({report['elapsed_ms']} ms)")
+        return report
+
+    # ── Querying ─────────────────────────────────────────────────────────────
+
+    def search(self, query: str, limit=50, kind=None, distinct=True):
+        """
+        Runs a query, newest captures first.
+
+        Args:
+            query (str): Search text (see module docstring for the syntax).
+            limit (int): Maximum hits returned.
+            kind (str): Only "snapshot" or only "workspace" hits.
+            distinct (bool): Collapse hits for the same window in the same collection
+                (a layout captured 200 times shows up once, from its newest snapshot).
+
+        Returns:
+            list[dict]: {"path", "kind", "collection", "captured_at", "title", "exe", "desktop", "urls"}
+        """
+        match = build_match(query)
+        sql = ("SELECT d.id, d.path, d.kind, d.collection, d.captured_at, e.title, e.exe, e.desktop, e.urls "
+               "FROM entries e JOIN documents d ON d.id = e.rowid / ? "
+               "WHERE entries MATCH ?" + (" AND d.kind = ?" if kind else "") +
+               " ORDER BY d.captured_at DESC, e.rowid DESC LIMIT ?")
+        fetch = limit * 20 if distinct else limit
+        params = (ROW_SPAN, match, *((kind,) if kind else ()), fetch)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        hits, seen, missing = [], set(), set()
+        for doc_id, path, doc_kind, collection, captured_at, title, exe, desktop, urls in rows:
+            if doc_id in missing:
+                continue
+            if not Path(path).exists():          # deleted since it was indexed
+                missing.add(doc_id)
+                continue
+            identity = (collection, title, exe, desktop)
+            if distinct and identity in seen:
+                continue
+            seen.add(identity)
+            hits.append({"path": path, "kind": doc_kind, "collection": collection, "captured_at": captured_at,
+                         "title": title, "exe": exe, "desktop": desktop, "urls": urls})
+            if len(hits) >= limit:
+                break
+        if missing:
+            self._drop(missing)
+        return hits
+
+    def _drop(self, doc_ids):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    for doc_id in doc_ids:
+                        self._forget(conn, doc_id)
+            finally:
+                conn.close()
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            documents = dict(conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+            rows = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        finally:
+            conn.close()
+        return {"index": str(self.path), "snapshots": documents.get("snapshot", 0),
+                "workspaces": documents.get("workspace", 0), "rows": rows}
+
+
+_index = None
+
+
+def get_search_index(logger=print) -> SearchIndex:
+    """Returns the shared index over the app's snapshots and workspaces."""
+    global _index
+    if _index is None:
+        _index = SearchIndex(logger=logger)
+    return _index
+
+
+def index_quietly(kind, path, document=None, logger=print):
+    """Capture/save hook: indexes one file, never letting index trouble fail the caller."""
+    try:
+        index = get_search_index(logger)
+        if kind == "workspace":
+            index.index_workspace(path, document)
+        else:
+            index.index_snapshot(path, document)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger(f"[⚠️] Search index not updated for {path}: {e}")
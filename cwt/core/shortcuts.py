@@ -0,0 +1,115 @@
+# core/shortcuts.py
+
+"""
+Chrome profile shortcut generation.
+
+Shortcuts are written natively via utils.shell_link (no subprocess per
+profile). If the native writer fails, every remaining shortcut is created
+by a single batched PowerShell invocation. Shortcuts whose existing .lnk
+already points at the same target/arguments/icon are skipped.
+"""
+
+import base64
+import os
+import struct
+import subprocess
+from pathlib import Path
+
+from cwt.utils.shell_link import read_shell_link, write_shell_link
+
+
+def chrome_shortcut_spec(chrome_path, profile, target_dir):
+    """Builds the shortcut description for one Chrome profile."""
+    return {
+        "path": str(Path(target_dir) / f"Chrome - {profile}.lnk"),
+        "target": chrome_path,
+        "arguments": f'--profile-directory="{profile}"',
+        "icon_location": chrome_path,
+        "icon_index": 0,
+        "profile": profile,
+    }
+
+
+def is_up_to_date(spec):
+    """True if the .lnk at spec["path"] already launches the same target, arguments and icon."""
+    try:
+        existing = read_shell_link(Path(spec["path"]).read_bytes())
+    except (OSError, ValueError, struct.error):
+        return False
+    return (
+        existing["target"].lower() == spec["target"].lower()
+        and existing["arguments"] == spec["arguments"]
+        and existing["icon_location"].lower() == spec["icon_location"].lower()
+        and existing["icon_index"] == spec["icon_index"]
+    )
+
+
+def _ps_quote(value):
+    """Single-quoted PowerShell literal — embedded quotes are doubled, nothing is interpolated."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_powershell_batch(specs):
+    """Renders one PowerShell script that creates every shortcut in specs."""
+    lines = ["$shell = New-Object -ComObject WScript.Shell"]
+    for spec in specs:
+        lines += [
+            f"$s = $shell.CreateShortcut({_ps_quote(spec['path'])})",
+            f"$s.TargetPath = {_ps_quote(spec['target'])}",
+            f"$s.Arguments = {_ps_quote(spec['arguments'])}",
+            f"$s.IconLocation = {_ps_quote(spec['icon_location'] + ',' + str(spec['icon_index']))}",
+            "$s.Save()",
+        ]
+    return "\n".join(lines)
+
+
+def _run_powershell_batch(specs):
+    script = build_powershell_batch(specs)
+    encoded = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+    subprocess.run(
+        ["powershell", "-NoProfile", "-NonInteractive", "-EncodedCommand", encoded],
+        check=True, capture_output=True
+    )
+
+
+def generate_shortcuts(specs, force=False, logger=print):
+    """
+    Creates .lnk files for a list of shortcut specs.
+
+    Args:
+        specs (list): Dicts from chrome_shortcut_spec().
+        force (bool): Rewrite shortcuts even if they are already up to date.
+        logger (Callable): Logging function for status messages.
+
+    Returns:
+        dict: {"created": [...], "skipped": [...], "failed": [...]} of shortcut paths.
+    """
+    result = {"created": [], "skipped": [], "failed": []}
+    pending = []
+
+    for spec in specs:
+        if not force and is_up_to_date(spec):
+            result["skipped"].append(spec["path"])
+            continue
+        try:
+            write_shell_link(
+                spec["path"], spec["target"], spec["arguments"],
+                icon_location=spec["icon_location"], icon_index=spec["icon_index"]
+            )
+            result["created"].append(spec["path"])
+            logger(f"[✓] Shortcut created: {spec['path']}")
+        except Exception as e:
+            logger(f"[!] Native shortcut write failed for {spec['path']}: {e} — queued for PowerShell")
+            pending.append(spec)
+
+    if pending and os.name == "nt":
+        try:
+            _run_powershell_batch(pending)
+            result["created"] += [s["path"] for s in pending]
+            logger(f"[✓] {len(pending)} shortcut(s) created via PowerShell fallback")
+            pending = []
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger(f"[!] PowerShell fallback failed: {e}")
+
+    result["failed"] += [s["path"] for s in pending]
+    return result
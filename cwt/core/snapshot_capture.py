@@ -1,26 +1,28 @@
 # core/snapshot_capture.py
 
-import json
+import time
 import uuid
-import win32gui
-import win32con
 from datetime import datetime
 from pathlib import Path
 from typing import Callable, Optional
-from cwt.utils.get_all_visible_windows import get_all_visible_windows
-from cwt.utils.vda_utils import get_virtual_desktop_id_map
+from cwt.utils.get_all_visible_windows import EnumerationStats, enumerate_hwnds, get_all_visible_windows
+from cwt.utils.vda_utils import DesktopManager
 from cwt.utils.paths import get_snapshots_dir
+from cwt.core.snapshot_model import Snapshot, WindowRecord, save_snapshot
+from cwt.core.snapshot_store import get_store
+from cwt.core.search_index import index_quietly
+from cwt.core.window_rules import RuleSet, capture_filter_lines, load_rules
+from cwt.core.capture_enrichers import get_enricher_registry, run_enrichers
 
 
-def build_snapshot_dict(collection_name: str, collection_id: str, timestamp: str, desktops: dict, windows: list) -> dict:
-    return {
-        "format_version": "1.0",
-        "collection_name": collection_name,
-        "collection_id": collection_id,
-        "captured_at": datetime.now().strftime("%d-%b-%Y %H:%M"),
-        "desktops": {str(i): name for i, name in desktops.items()},
-        "windows": windows
-    }
+def build_snapshot(collection_name: str, collection_id: str, desktops: dict, windows: list) -> Snapshot:
+    return Snapshot(
+        collection_name=collection_name,
+        collection_id=collection_id,
+        captured_at=datetime.now().replace(microsecond=0),
+        desktops=dict(desktops),
+        windows=[WindowRecord.coerce(w) for w in windows]
+    )
 
 
 def capture_snapshot(
@@ -28,7 +30,11 @@ def capture_snapshot(
     logger: Callable[[str], None] = print,
     gui_callback: Optional[Callable[[dict], None]] = None,
     chrome_only: bool = False,
-    app_only: bool = False
+    app_only: bool = False,
+    window_cache=None,
+    rules=None,
+    store=None,
+    enrichers=None
 ) -> str:
     """
     Captures the current window layout into a snapshot file.
@@ -39,6 +45,14 @@ def capture_snapshot(
         gui_callback: Optional GUI hook to report summary metadata.
         chrome_only: If True, capture only Chrome windows.
         app_only: If True, capture only non-Chrome windows.
+        window_cache: Optional live WindowStateCache; when given, windows are read
+            from it instead of being re-enumerated.
+        rules: Compiled ignore rules (RuleSet); loaded from .windowignore when omitted.
+            The chrome_only / app_only filters are applied after them, so they have the final say.
+        store: SnapshotStore to write through (default: the snapshots root's).
+            Pass False to write a self-contained snapshot file instead.
+        enrichers: Capture enrichers to run (default: the plugins discovered by
+            core/capture_enrichers.py). Pass False to skip enrichment.
 
     Returns:
         str: Full path to the saved snapshot file.
@@ -50,51 +64,73 @@ def capture_snapshot(
     collection_id = str(uuid.uuid4())
     snapshot_path = snapshot_dir / f"snapshot_{timestamp}.json"
 
-    logger("[INFO] Starting window enumeration and desktop mapping.")
-    visible_windows = get_all_visible_windows()
-    desktop_map = get_virtual_desktop_id_map()
-
-    # Apply capture filters
-    if chrome_only:
-        visible_windows = [w for w in visible_windows if "chrome" in w.get("exe", "").lower()]
-        logger(f"[INFO] Chrome-only filter applied — {len(visible_windows)} windows retained.")
-    elif app_only:
-        visible_windows = [w for w in visible_windows if "chrome" not in w.get("exe", "").lower()]
-        logger(f"[INFO] Apps-only filter applied — {len(visible_windows)} windows retained.")
+    if rules is None:
+        rules = load_rules(logger=logger)
+    filters = capture_filter_lines(chrome_only, app_only)
+    if filters:
+        rules = rules + RuleSet.from_lines(filters)
 
-    # Build z-order mapping
-    hwnd_order = []
-    hwnd = win32gui.GetTopWindow(0)
-    while hwnd:
-        hwnd_order.append(hwnd)
-        hwnd = win32gui.GetWindow(hwnd, win32con.GW_HWNDNEXT)
-
-    hwnd_rank = {h: i for i, h in enumerate(hwnd_order)}
-    for win in visible_windows:
-        win["z_order"] = hwnd_rank.get(win["hwnd"], -1)
-    visible_windows.sort(key=lambda w: w.get("z_order", -1))
-
-    snapshot = build_snapshot_dict(
+    logger("[INFO] Starting window enumeration and desktop mapping.")
+    started = time.perf_counter()
+    if window_cache is not None and window_cache.desktops is not None:
+        desktops = window_cache.desktops
+        window_cache.refresh_desktops()
+        cached = window_cache.windows()
+        visible_windows = [w for w in cached if not rules.ignores(w)]
+
+        # z-order for the surviving hwnds only: their rank in the EnumWindows order
+        survivors = {w.hwnd for w in visible_windows}
+        hwnd_rank = {h: i for i, h in enumerate(h for h in enumerate_hwnds() if h in survivors)}
+        for win in visible_windows:
+            win.z_order = hwnd_rank.get(win.hwnd, -1)
+        visible_windows.sort(key=lambda w: (w.z_order < 0, w.z_order))
+        report = {"source": "cache", "cached": len(cached), "kept": len(visible_windows)}
+    else:
+        desktops = DesktopManager(logger=logger)
+        stats = EnumerationStats()
+        visible_windows = get_all_visible_windows(desktops, rules, stats)  # already z-ordered
+        report = dict(stats.report(), source="enumeration")
+        logger(f"[INFO] Enumeration: {stats.summary_line()}")
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    if enrichers is None:
+        enrichers = get_enricher_registry(logger).enrichers()
+    if enrichers:
+        started = time.perf_counter()
+        report["enrichers"] = run_enrichers(visible_windows, enrichers, logger=logger)
+        report["enrich_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if report["enrichers"]:
+            logger("[INFO] Enrichers: " + ", ".join(
+                f"{name} {e['enriched']}/{e['windows']} in {e['ms']} ms"
+                + ("" if e["status"] == "ok" else f" ({e['status']})") for name, e in report["enrichers"].items()))
+    desktop_map = desktops.name_map()
+    if filters:
+        logger(f"[INFO] {'Chrome' if chrome_only else 'Apps'}-only filter applied — "
+               f"{len(visible_windows)} windows retained.")
+
+    snapshot = build_snapshot(
         collection_name=collection_name,
         collection_id=collection_id,
-        timestamp=timestamp,
         desktops=desktop_map,
         windows=visible_windows
     )
-
-    with snapshot_path.open("w", encoding="utf-8") as f:
-        json.dump(snapshot, f, indent=2)
-        f.write("\n")
-
-    logger(f"[📸] Captured snapshot to: {snapshot_path}")
+    if store is False:
+        save_snapshot(snapshot, snapshot_path)
+        logger(f"[📸] Captured snapshot to: {snapshot_path}")
+    else:
+        stored = (store or get_store(logger=logger)).save(snapshot, snapshot_path)
+        report["objects_written"] = stored["objects_written"]
+        logger(f"[📸] Captured snapshot to: {snapshot_path} "
+               f"({stored['objects_written']} new object(s) for {stored['windows']} window(s))")
+    index_quietly("snapshot", snapshot_path, snapshot, logger)
 
     if gui_callback:
         gui_callback({
             "collection_name": collection_name,
             "collection_id": collection_id,
-            "captured_at": snapshot["captured_at"],
+            "captured_at": snapshot.captured_at_display,
             "desktop_count": len(desktop_map),
-            "desktop_names": list(desktop_map.values())
+            "desktop_names": list(desktop_map.values()),
+            "capture_report": report
         })
 
     return str(snapshot_path)
\ No newline at end of file
@@ -0,0 +1,178 @@
+# core/snapshot_diff.py
+
+"""
+Snapshot diff and layout comparison engine.
+
+Compares two window tables (two captures, or a capture and the live desktop)
+and reports added / removed / moved / retitled windows and desktop
+reassignments. Windows are paired with keyed passes — same window of the same
+session, then exact (exe, title), then same (exe, rect, desktop) for retitled
+windows — so a diff is linear in the number of windows instead of a pairwise
+fuzzy scan.
+"""
+
+from collections import defaultdict, deque
+
+from cwt.core.snapshot_model import WindowRecord, load_snapshot
+
+RECT_KEYS = ("x", "y", "width", "height")
+
+
+def _rect(win):
+    return (win.x, win.y, win.width, win.height)
+
+
+def _exe(win):
+    return win.exe.lower()
+
+
+def _session_key(win):
+    """
+    hwnd-based identity, only trusted within one session: Windows reuses hwnds,
+    so the class and owning process (create time, when captured) must match too.
+    Records without a class name (older captures) aren't paired this way.
+    """
+    if not win.hwnd or not win.class_name:
+        return None
+    return (win.hwnd, _exe(win), win.class_name, win.create_time)
+
+
+def _pair_by(key_fn, old_left, new_left, pairs):
+    """Pairs remaining windows whose key_fn values are equal (FIFO within a key)."""
+    buckets = defaultdict(deque)
+    for i in old_left:
+        key = key_fn(i[1])
+        if key is not None:
+            buckets[key].append(i)
+
+    still_new = []
+    for j in new_left:
+        bucket = buckets.get(key_fn(j[1]))
+        if bucket:
+            pairs.append((bucket.popleft(), j))
+        else:
+            still_new.append(j)
+
+    paired_old = {id(i) for i, _ in pairs}
+    return [i for i in old_left if id(i) not in paired_old], still_new
+
+
+def diff_windows(old_windows, new_windows):
+    """
+    Diffs two window lists (WindowRecords or enumeration dicts).
+
+    Returns:
+        dict: added, removed, moved, retitled, desktop_changes lists and an unchanged count.
+    """
+    old_left = list(enumerate(map(WindowRecord.coerce, old_windows)))
+    new_left = list(enumerate(map(WindowRecord.coerce, new_windows)))
+    pairs = []
+
+    old_left, new_left = _pair_by(_session_key, old_left, new_left, pairs)
+    old_left, new_left = _pair_by(lambda w: (_exe(w), w.title), old_left, new_left, pairs)
+    old_left, new_left = _pair_by(lambda w: (_exe(w), _rect(w), w.desktop_number),
+                                  old_left, new_left, pairs)
+
+    result = {
+        "added": [w.to_dict() for _, w in new_left],
+        "removed": [w.to_dict() for _, w in old_left],
+        "moved": [],
+        "retitled": [],
+        "desktop_changes": [],
+        "unchanged": 0,
+    }
+
+    for (_, old), (_, new) in sorted(pairs, key=lambda p: p[1][0]):
+        changed = False
+        if old.title != new.title:
+            result["retitled"].append({"exe": new.exe, "from": old.title, "to": new.title})
+            changed = True
+        if _rect(old) != _rect(new):
+            result["moved"].append({
+                "exe": new.exe, "title": new.title,
+                "from": dict(zip(RECT_KEYS, _rect(old))), "to": dict(zip(RECT_KEYS, _rect(new)))
+            })
+            changed = True
+        if old.desktop_number != new.desktop_number:
+            result["desktop_changes"].append({
+                "exe": new.exe, "title": new.title,
+                "from": old.desktop_number, "to": new.desktop_number,
+                "from_name": old.desktop_name, "to_name": new.desktop_name
+            })
+            changed = True
+        if not changed:
+            result["unchanged"] += 1
+
+    return result
+
+
+def diff_snapshots(old, new):
+    """
+    Diffs two Snapshot models — window tables plus the desktop name tables.
+
+    Returns:
+        dict: diff_windows() output plus "desktops_changed" and a "summary" of counts.
+    """
+    result = diff_windows(old.windows, new.windows)
+
+    old_desktops = {str(k): v for k, v in old.desktops.items()}
+    new_desktops = {str(k): v for k, v in new.desktops.items()}
+    result["desktops_changed"] = {
+        k: [old_desktops.get(k), new_desktops.get(k)]
+        for k in sorted(set(old_desktops) | set(new_desktops), key=lambda k: (len(k), k))
+        if old_desktops.get(k) != new_desktops.get(k)
+    }
+    result["summary"] = summarize(result)
+    return result
+
+
+def summarize(result):
+    return {
+        "added": len(result["added"]),
+        "removed": len(result["removed"]),
+        "moved": len(result["moved"]),
+        "retitled": len(result["retitled"]),
+        "desktop_changes": len(result["desktop_changes"]),
+        "desktops_changed": len(result.get("desktops_changed", {})),
+        "unchanged": result["unchanged"],
+    }
+
+
+def diff_history(snapshot_paths, loader=load_snapshot, logger=print):
+    """
+    Yields (older_path, newer_path, summary) for each consecutive pair in a
+    chronologically ordered list of snapshots. Each file is loaded once and only
+    two snapshots are held in memory, so long histories stream cheaply.
+    """
+    previous_path, previous = None, None
+    for path in snapshot_paths:
+        try:
+            current = loader(path)
+        except Exception as e:
+            logger(f"[!] Skipping unreadable snapshot {path}: {e}")
+            continue
+        if previous is not None:
+            yield previous_path, path, diff_snapshots(previous, current)["summary"]
+        previous_path, previous = path, current
+
+
+def format_diff(result, limit=50):
+    """Renders a diff as log lines for the GUI."""
+    lines = []
+    for w in result["added"]:
+        lines.append(f"[+] {w.get('exe')} — {w.get('title')}")
+    for w in result["removed"]:
+        lines.append(f"[-] {w.get('exe')} — {w.get('title')}")
+    for m in result["moved"]:
+        f, t = m["from"], m["to"]
+        lines.append(f"[↔] {m['title']} ({f['x']}, {f['y']}) {f['width']}×{f['height']} → "
+                     f"({t['x']}, {t['y']}) {t['width']}×{t['height']}")
+    for r in result["retitled"]:
+        lines.append(f"[✎] {r['exe']}: '{r['from']}' → '{r['to']}'")
+    for d in result["desktop_changes"]:
+        lines.append(f"[🖥️] {d['title']}: desktop {d['from']} → {d['to']}")
+    for k, (a, b) in result.get("desktops_changed", {}).items():
+        lines.append(f"[🖥️] Desktop {k} renamed: '{a}' → '{b}'")
+    if len(lines) > limit:
+        lines = lines[:limit] + [f"… {len(lines) - limit} more change(s)"]
+    return lines
@@ -0,0 +1,329 @@
+# core/snapshot_gc.py
+
+"""
+Snapshot storage maintenance: orphan adoption, deduplication, retention and
+compression.
+
+Each pass over a collection (newest snapshot first):
+
+    1. dedupe    — captures whose layout hashes identically to a newer one are removed
+    2. retention — beyond keep_last, snapshots older than keep_days are removed
+    3. compress  — survivors older than compress_after_days are rewritten as
+                   compact JSON and compressed (.json.zst, or .json.gz without zstandard)
+
+The newest snapshot of a collection is never removed or compressed, and
+unreadable files are reported but never touched. Without a retention.json
+the built-in policy removes nothing and only compresses. Loose snapshot files in the
+snapshots root are first moved into a collection folder.
+
+Manifests written through the object store (core/snapshot_store.py) are
+deduplicated and expired like any snapshot but never compressed; after a
+complete pass the store is pruned of objects no manifest references.
+
+Work is incremental: content hashes are cached in .gc_state.json by
+(mtime, size), and SnapshotGC.run() can stop after a time budget and resume
+with the next collection on the following call — which is how the
+background thread (start_background) spreads the work out.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional
+
+from cwt.core.snapshot_model import Snapshot
+from cwt.core.snapshot_store import SnapshotStore, is_manifest
+from cwt.utils.compression import DEFAULT_CODEC, compress, is_compressed, read_bytes
+from cwt.utils.paths import STORAGE_DIR, find_snapshot_files, get_snapshots_dir
+
+STATE_FILE = ".gc_state.json"
+POLICY_FILE = STORAGE_DIR / "retention.json"
+ORPHAN_COLLECTION = "Unsorted"
+DAY = 86400
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    # Defaults delete nothing: expiry and dedupe only run once retention.json asks for them
+    keep_last: int = 50                    # newest N are always kept
+    keep_days: Optional[float] = None      # …as is anything younger than this (None = keep all)
+    compress_after_days: Optional[float] = 2   # None = never compress
+    dedupe: bool = False
+
+
+def load_policies(path=POLICY_FILE):
+    """
+    Reads retention.json: {"default": {...}, "collections": {"name": {...}}}.
+
+    Returns:
+        tuple: (default RetentionPolicy, {collection_name: RetentionPolicy})
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return RetentionPolicy(), {}
+    default = replace(RetentionPolicy(), **data.get("default", {}))
+    overrides = {name: replace(default, **values) for name, values in data.get("collections", {}).items()}
+    return default, overrides
+
+
+def content_hash(snapshot: Snapshot) -> str:
+    """Hash of what a capture *shows* — desktops and window layout, not its id, time or hwnds."""
+    rows = [(w.exe, w.title, w.x, w.y, w.width, w.height, w.desktop_number, w.z_order) for w in snapshot.windows]
+    payload = json.dumps([sorted(snapshot.desktops.items()), rows], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _new_report():
+    return {
+        "bytes_before": 0, "bytes_after": 0, "bytes_reclaimed": 0,
+        "adopted": [], "deduplicated": [], "expired": [], "compressed": [],
+        "objects_pruned": 0, "errors": {}, "collections": 0, "complete": True,
+    }
+
+
+class SnapshotGC:
+    def __init__(self, root=None, policies=None, dry_run=False, logger=print):
+        """
+        Args:
+            root (Path): Snapshots root (default: the app's snapshots directory).
+            policies (tuple): (default, overrides) as returned by load_policies().
+            dry_run (bool): Report what would happen without changing any file.
+            logger (Callable): Logging function for status messages.
+        """
+        self.root = Path(root) if root else get_snapshots_dir()
+        self.default_policy, self.overrides = policies or load_policies()
+        self.dry_run = dry_run
+        self.logger = logger
+        self.store = SnapshotStore(self.root, logger=logger)
+        self._state_path = self.root / STATE_FILE
+        self._state = self._load_state()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ── State ────────────────────────────────────────────────────────────────
+
+    def _load_state(self):
+        try:
+            state = json.loads(self._state_path.read_text(encoding="utf-8"))
+            state.setdefault("hashes", {})
+            state.setdefault("cursor", None)
+            return state
+        except (OSError, ValueError):
+            return {"hashes": {}, "cursor": None}
+
+    def _save_state(self):
+        if self.dry_run:
+            return
+        live = {str(p.relative_to(self.root)) for d in self._collection_dirs() for p in find_snapshot_files(d)}
+        self._state["hashes"] = {k: v for k, v in self._state["hashes"].items() if k in live}
+        tmp = self._state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._state), encoding="utf-8")
+        os.replace(tmp, self._state_path)
+
+    def _hash_of(self, path: Path):
+        key = str(path.relative_to(self.root))
+        st = path.stat()
+        cached = self._state["hashes"].get(key)
+        if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+            return cached[2]
+        digest = content_hash(Snapshot.from_dict(json.loads(read_bytes(path)), path))
+        self._state["hashes"][key] = [st.st_mtime, st.st_size, digest]
+        return digest
+
+    # ── Helpers ──────────────────────────────────────────────────────────────
+
+    def policy_for(self, collection):
+        return self.overrides.get(collection, self.default_policy)
+
+    def _collection_dirs(self):
+        return sorted(d for d in self.root.iterdir() if d.is_dir() and not d.name.startswith("."))
+
+    def _remove(self, path: Path, bucket, report):
+        report[bucket].append(str(path))
+        if not self.dry_run:
+            path.unlink()
+            self.store.forget(path)
+
+    # ── Passes ───────────────────────────────────────────────────────────────
+
+    def adopt_orphans(self, report):
+        """Moves loose snapshot files from the root into a collection folder."""
+        for path in find_snapshot_files(self.root):
+            try:
+                name = Snapshot.from_dict(json.loads(read_bytes(path)), path).collection_name
+            except Exception:
+                name = ORPHAN_COLLECTION
+            if not name or name == self.root.name:
+                name = ORPHAN_COLLECTION
+            target = self.root / name / path.name
+            if target.exists():
+                target = target.with_name(path.name.replace("snapshot_", "snapshot_adopted_", 1))
+            report["adopted"].append(f"{path} → {target}")
+            if not self.dry_run:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(path), str(target))
+
+    def _compress_file(self, path: Path, report):
+        raw = json.loads(read_bytes(path))
+        if is_manifest(raw):
+            return   # a few bytes per window already; the objects are shared
+        snapshot = Snapshot.from_dict(raw, path)
+        data = compress(json.dumps(snapshot.to_dict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        target = path.with_name(path.name + DEFAULT_CODEC)
+        report["compressed"].append(str(target))
+        if self.dry_run:
+            report["bytes_after"] += len(data) - path.stat().st_size
+            return
+        st = path.stat()
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.stem}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.utime(tmp_name, (st.st_atime, st.st_mtime))   # ordering falls back to mtime for undated files
+            os.replace(tmp_name, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        path.unlink()
+
+    def collect(self, collection_dir: Path, report, now=None):
+        """Runs dedupe → retention → compression over one collection."""
+        policy = self.policy_for(collection_dir.name)
+        now = now or time.time()
+        files = find_snapshot_files(collection_dir)   # newest first
+        kept, seen = [], set()
+
+        for path in files:
+            try:
+                digest = self._hash_of(path) if policy.dedupe else None
+            except Exception as e:
+                report["errors"][str(path)] = f"{type(e).__name__}: {e}"
+                continue   # unreadable → never touched
+            if digest and digest in seen:
+                self._remove(path, "deduplicated", report)
+                continue
+            seen.add(digest)
+            kept.append(path)
+
+        survivors = []
+        for index, path in enumerate(kept):
+            age_days = (now - path.stat().st_mtime) / DAY
+            expired = (index >= max(1, policy.keep_last)
+                       and policy.keep_days is not None and age_days > policy.keep_days)
+            if expired:
+                self._remove(path, "expired", report)
+            else:
+                survivors.append((index, path, age_days))
+
+        if policy.compress_after_days is None:
+            return
+        for index, path, age_days in survivors:
+            if index == 0 or is_compressed(path) or age_days <= policy.compress_after_days:
+                continue
+            try:
+                self._compress_file(path, report)
+            except Exception as e:
+                report["errors"][str(path)] = f"{type(e).__name__}: {e}"
+
+    def run(self, budget_seconds=None, now=None):
+        """
+        One maintenance pass. With a budget, stops between collections once the
+        budget is spent and resumes from the next collection on the next call.
+
+        Returns:
+            dict: Report — bytes before/after/reclaimed and the files adopted,
+            deduplicated, expired and compressed (plus per-file errors).
+        """
+        start = time.monotonic()
+        report = _new_report()
+        report["bytes_before"] = self._tree_size()
+        self.adopt_orphans(report)
+
+        dirs = self._collection_dirs()
+        names = [d.name for d in dirs]
+        cursor = self._state.get("cursor")
+        if cursor in names:
+            dirs = dirs[names.index(cursor):] + dirs[:names.index(cursor)]
+
+        for i, collection_dir in enumerate(dirs):
+            # Always make progress: at least one collection per pass
+            if i and budget_seconds is not None and time.monotonic() - start > budget_seconds:
+                self._state["cursor"] = collection_dir.name
+                report["complete"] = False
+                break
+            self.collect(collection_dir, report, now)
+            report["collections"] += 1
+        else:
+            self._state["cursor"] = None
+
+        if report["complete"]:
+            pruned = self.store.prune(dry_run=self.dry_run)
+            report["objects_pruned"] = pruned["objects_pruned"]
+            if self.dry_run:
+                report["bytes_after"] -= pruned["object_bytes_reclaimed"]
+
+        self._save_state()
+        if self.dry_run:
+            report["bytes_after"] += report["bytes_before"] - self._removed_bytes(report)
+        else:
+            report["bytes_after"] = self._tree_size()
+        report["bytes_reclaimed"] = report["bytes_before"] - report["bytes_after"]
+        self.logger(
+            f"[🧹] Snapshot GC{' (dry run)' if self.dry_run else ''}: {report['collections']} collection(s), "
+            f"{len(report['deduplicated'])} duplicate(s), {len(report['expired'])} expired, "
+            f"{len(report['compressed'])} compressed, {len(report['adopted'])} adopted, "
+            f"{report['objects_pruned']} object(s) pruned — "
+            f"{report['bytes_reclaimed'] / 1024:.1f} KiB reclaimed"
+        )
+        for path, error in report["errors"].items():
+            self.logger(f"[!] Skipped unreadable snapshot {path}: {error}")
+        return report
+
+    def _tree_size(self):
+        snapshots = sum(p.stat().st_size for p in self.root.rglob("snapshot_*") if p.is_file())
+        return snapshots + sum(p.stat().st_size for p in self.store.object_files())
+
+    def _removed_bytes(self, report):
+        total = 0
+        for path in report["deduplicated"] + report["expired"]:
+            try:
+                total += Path(path).stat().st_size
+            except OSError:
+                pass
+        return total
+
+    # ── Background ───────────────────────────────────────────────────────────
+
+    def start_background(self, interval=3600.0, budget_seconds=2.0):
+        """Runs budgeted passes every `interval` seconds on a daemon thread until stop()."""
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.run(budget_seconds=budget_seconds)
+                except Exception as e:
+                    self.logger(f"[!] Background snapshot GC failed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="cwt-snapshot-gc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def collect_garbage(root=None, dry_run=False, budget_seconds=None, logger=print):
+    """Convenience wrapper: one GC pass with the policies from retention.json."""
+    return SnapshotGC(root, dry_run=dry_run, logger=logger).run(budget_seconds=budget_seconds)
@@ -0,0 +1,423 @@
+# core/snapshot_model.py
+
+"""
+Typed in-memory model for snapshots and workspaces, plus the versioned
+upgrader for every on-disk shape the toolkit has written:
+
+    snapshot "list"  bare list of windows (earliest captures)
+    snapshot "0"     {"workspace", ISO "captured_at", windows with "desktop_id"}
+    snapshot "1.0"   {"format_version": "1.0", "collection_name", "%d-%b-%Y %H:%M" timestamp}
+                     (some 1.0 files still carry "workspace" + ISO timestamps)
+    snapshot "1.1"   current — "collection_name", ISO-8601 "captured_at"
+
+    workspace "0"    {"workspace", "desktops", "snapshots"}
+    workspace "1.0"  {"format_version", "workspace_name", "workspace_id", "created_at", "collections"}
+
+Loaders call load_snapshot()/load_workspace() and get a Snapshot/Workspace
+back; raw key probing lives only in the upgrade steps below. Snapshots
+written through core/snapshot_store.py are manifests of object references
+("store" key) and are expanded before upgrading.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from cwt.utils.compression import read_bytes
+
+SNAPSHOT_FORMAT_VERSION = "1.1"
+WORKSPACE_FORMAT_VERSION = "1.0"
+DISPLAY_TIMESTAMP = "%d-%b-%Y %H:%M"
+
+
+@dataclass(slots=True)
+class WindowRecord:
+    """
+    One window row. Slotted (no per-instance __dict__) and with exe, title and
+    desktop name interned, so thousands of loaded snapshots of the same
+    collection share one copy of each repeated string.
+    """
+    hwnd: Optional[int]
+    title: str
+    exe: str
+    x: int
+    y: int
+    width: int
+    height: int
+    desktop_number: Optional[int] = None
+    desktop_name: str = "Unknown"
+    desktop_id: Optional[str] = None
+    z_order: int = -1
+    class_name: str = ""
+    # Owning process (utils/process_inventory.py) — what a relaunch needs
+    pid: Optional[int] = None
+    exe_path: str = ""
+    cmdline: tuple = ()
+    cwd: str = ""
+    create_time: Optional[float] = None
+    # Capture enrichers (core/capture_enrichers.py): {enricher name: data}, plus any tab URLs they found
+    context: dict = field(default_factory=dict)
+    urls: tuple = ()
+
+    def __post_init__(self):
+        self.exe = sys.intern(self.exe)
+        self.title = sys.intern(self.title)
+        self.desktop_name = sys.intern(self.desktop_name)
+        self.class_name = sys.intern(self.class_name)
+        self.exe_path = sys.intern(self.exe_path)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "WindowRecord":
+        return cls(
+            hwnd=d.get("hwnd"),
+            title=d.get("title") or "",
+            exe=d.get("exe") or "",
+            x=d.get("x", 0),
+            y=d.get("y", 0),
+            width=d.get("width", 0),
+            height=d.get("height", 0),
+            desktop_number=d.get("desktop_number"),
+            desktop_name=d.get("desktop_name") or "Unknown",
+            desktop_id=d.get("desktop_id"),
+            z_order=d.get("z_order", -1),
+            class_name=d.get("class_name") or "",
+            pid=d.get("pid"),
+            exe_path=d.get("exe_path") or "",
+            cmdline=tuple(d.get("cmdline") or ()),
+            cwd=d.get("cwd") or "",
+            create_time=d.get("create_time"),
+            context=dict(d.get("context") or {}),
+            urls=tuple(d.get("urls") or ()),
+        )
+
+    @classmethod
+    def coerce(cls, obj) -> "WindowRecord":
+        """Accepts a WindowRecord or an enumeration/snapshot dict."""
+        return obj if isinstance(obj, cls) else cls.from_dict(obj)
+
+    def copy(self, **changes) -> "WindowRecord":
+        return replace(self, **changes)
+
+    def to_dict(self) -> dict:
+        d = {
+            "hwnd": self.hwnd,
+            "title": self.title,
+            "exe": self.exe,
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "desktop_number": self.desktop_number,
+            "desktop_name": self.desktop_name,
+            "z_order": self.z_order,
+        }
+        if self.class_name:
+            d["class_name"] = self.class_name
+        if self.desktop_id:
+            d["desktop_id"] = self.desktop_id
+        if self.pid is not None:
+            d["pid"] = self.pid
+            d["create_time"] = self.create_time
+        for key in ("exe_path", "cmdline", "cwd", "context", "urls"):
+            value = getattr(self, key)
+            if value:
+                d[key] = list(value) if key in ("cmdline", "urls") else value
+        return d
+
+
+@dataclass(slots=True)
+class Snapshot:
+    collection_name: str
+    collection_id: str
+    captured_at: Optional[datetime]
+    desktops: dict = field(default_factory=dict)     # {desktop_number (int): name}
+    windows: list = field(default_factory=list)      # [WindowRecord]
+    format_version: str = SNAPSHOT_FORMAT_VERSION
+    path: Optional[Path] = None
+
+    @classmethod
+    def from_dict(cls, raw, path=None) -> "Snapshot":
+        if isinstance(raw, dict) and "store" in raw:
+            from cwt.core.snapshot_store import expand_manifest   # store imports this module
+            raw = expand_manifest(raw, path)
+        d = upgrade_snapshot_dict(raw, path)
+        return cls(
+            collection_name=d["collection_name"],
+            collection_id=d["collection_id"],
+            captured_at=_parse_timestamp(d.get("captured_at")),
+            desktops={int(k): v for k, v in d["desktops"].items()},
+            windows=[WindowRecord.from_dict(w) for w in d["windows"]],
+            format_version=d["format_version"],
+            path=Path(path) if path else None,
+        )
+
+    @property
+    def captured_at_display(self) -> str:
+        return self.captured_at.strftime(DISPLAY_TIMESTAMP) if self.captured_at else "—"
+
+    def to_dict(self) -> dict:
+        return {
+            "format_version": self.format_version,
+            "collection_name": self.collection_name,
+            "collection_id": self.collection_id,
+            "captured_at": self.captured_at.isoformat(timespec="seconds") if self.captured_at else None,
+            "desktops": {str(k): v for k, v in self.desktops.items()},
+            "windows": [w.to_dict() for w in self.windows],
+        }
+
+
+@dataclass(slots=True)
+class Workspace:
+    workspace_name: str
+    workspace_id: Optional[str]
+    created_at: Optional[datetime]
+    desktops: dict = field(default_factory=dict)     # {desktop_number (int): name}
+    collections: list = field(default_factory=list)
+    format_version: str = WORKSPACE_FORMAT_VERSION
+    path: Optional[Path] = None
+
+    @classmethod
+    def from_dict(cls, raw, path=None) -> "Workspace":
+        d = upgrade_workspace_dict(raw, path)
+        return cls(
+            workspace_name=d["workspace_name"],
+            workspace_id=d.get("workspace_id"),
+            created_at=_parse_timestamp(d.get("created_at")),
+            desktops={int(k): v for k, v in d["desktops"].items()},
+            collections=list(d["collections"]),
+            format_version=d["format_version"],
+            path=Path(path) if path else None,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "format_version": self.format_version,
+            "workspace_name": self.workspace_name,
+            "workspace_id": self.workspace_id,
+            "created_at": self.created_at.strftime(DISPLAY_TIMESTAMP) if self.created_at else None,
+            "desktops": {str(k): v for k, v in self.desktops.items()},
+            "collections": list(self.collections),
+        }
+
+
+# ── Timestamps ────────────────────────────────────────────────────────────────
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, DISPLAY_TIMESTAMP)):
+        try:
+            return parse(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _iso(value) -> Optional[str]:
+    ts = _parse_timestamp(value)
+    return ts.isoformat(timespec="seconds") if ts else None
+
+
+# ── Snapshot upgrade steps ────────────────────────────────────────────────────
+
+def detect_snapshot_version(raw) -> str:
+    if isinstance(raw, list):
+        return "list"
+    return raw.get("format_version") or "0"
+
+
+def _snapshot_from_list(raw, path):
+    name = Path(path).parent.name if path else "Unnamed Collection"
+    return {"collection_name": name, "collection_id": Path(path).stem if path else "",
+            "captured_at": None, "desktops": {}, "windows": raw}
+
+
+def _snapshot_0_to_1_0(raw, path):
+    d = dict(raw)
+    d["collection_name"] = d.pop("workspace", None) or d.get("collection_name") or \
+        (Path(path).parent.name if path else "Unnamed Collection")
+    d["format_version"] = "1.0"
+    return d
+
+
+def _snapshot_1_0_to_1_1(raw, path):
+    d = dict(raw)
+    # Hybrid 1.0 files still carry the legacy "workspace" key
+    if "workspace" in d:
+        legacy = d.pop("workspace")
+        d.setdefault("collection_name", legacy)
+    d.setdefault("collection_name", Path(path).parent.name if path else "Unnamed Collection")
+    d.setdefault("collection_id", Path(path).stem if path else "")
+    d["captured_at"] = _iso(d.get("captured_at"))
+    d["desktops"] = {str(k): v for k, v in (d.get("desktops") or {}).items()}
+
+    windows = []
+    for w in d.get("windows") or []:
+        w = dict(w)
+        if not w.get("desktop_id"):
+            w.pop("desktop_id", None)
+        w.setdefault("desktop_number", None)
+        w.setdefault("desktop_name", "Unknown")
+        w.setdefault("z_order", -1)
+        windows.append(w)
+    d["windows"] = windows
+    d["format_version"] = "1.1"
+    return d
+
+
+SNAPSHOT_UPGRADES = {
+    "list": _snapshot_from_list,
+    "0": _snapshot_0_to_1_0,
+    "1.0": _snapshot_1_0_to_1_1,
+}
+
+
+def upgrade_snapshot_dict(raw, path=None) -> dict:
+    """Runs the upgrade steps needed to bring a raw snapshot to the current format."""
+    version = detect_snapshot_version(raw)
+    while version != SNAPSHOT_FORMAT_VERSION:
+        step = SNAPSHOT_UPGRADES.get(version)
+        if step is None:
+            raise ValueError(f"Unsupported snapshot format_version: {version!r}")
+        raw = step(raw, path)
+        version = detect_snapshot_version(raw)
+    return raw
+
+
+# ── Workspace upgrade steps ───────────────────────────────────────────────────
+
+def _workspace_0_to_1_0(raw, path):
+    return {
+        "format_version": "1.0",
+        "workspace_name": raw.get("workspace") or (Path(path).stem if path else ""),
+        "workspace_id": raw.get("workspace_id"),
+        "created_at": raw.get("created_at"),
+        "desktops": {str(k): v for k, v in (raw.get("desktops") or {}).items()},
+        "collections": list(raw.get("snapshots") or raw.get("collections") or []),
+    }
+
+
+WORKSPACE_UPGRADES = {"0": _workspace_0_to_1_0}
+
+
+def upgrade_workspace_dict(raw, path=None) -> dict:
+    version = raw.get("format_version") or "0"
+    while version != WORKSPACE_FORMAT_VERSION:
+        step = WORKSPACE_UPGRADES.get(version)
+        if step is None:
+            raise ValueError(f"Unsupported workspace format_version: {version!r}")
+        raw = step(raw, path)
+        version = raw.get("format_version") or "0"
+    return raw
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+
+def _read_json(path):
+    return json.loads(read_bytes(path))
+
+
+def load_snapshot(path) -> Snapshot:
+    return Snapshot.from_dict(_read_json(path), path)
+
+
+def load_workspace(path) -> Workspace:
+    return Workspace.from_dict(_read_json(path), path)
+
+
+def save_snapshot(snapshot: Snapshot, path) -> None:
+    _write_json_atomic(Path(path), snapshot.to_dict())
+
+
+def save_workspace(workspace: Workspace, path) -> None:
+    _write_json_atomic(Path(path), workspace.to_dict())
+
+
+def _write_json_atomic(path: Path, data, compact=False) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.stem}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if compact:
+                json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+            else:
+                json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+# ── Bulk migration ────────────────────────────────────────────────────────────
+
+def _is_workspace(raw) -> bool:
+    return isinstance(raw, dict) and "windows" not in raw and (
+        "workspace_name" in raw or "collections" in raw or "snapshots" in raw
+    )
+
+
+def migrate_file(path, dry_run=False, backup=True):
+    """
+    Upgrades one snapshot or workspace file in place.
+
+    Returns:
+        tuple: (path, status, error) — status is "upgraded", "current" or "failed".
+    """
+    path = Path(path)
+    try:
+        raw = _read_json(path)
+        if _is_workspace(raw):
+            current = raw.get("format_version") == WORKSPACE_FORMAT_VERSION
+            upgraded = None if current else upgrade_workspace_dict(raw, path)
+        else:
+            current = detect_snapshot_version(raw) == SNAPSHOT_FORMAT_VERSION
+            upgraded = None if current else Snapshot.from_dict(raw, path).to_dict()
+        if current:
+            return str(path), "current", None
+        if not dry_run:
+            if backup:
+                path.with_name(path.name + ".bak").write_bytes(path.read_bytes())
+            _write_json_atomic(path, upgraded)
+        return str(path), "upgraded", None
+    except Exception as e:
+        return str(path), "failed", f"{type(e).__name__}: {e}"
+
+
+def migrate_tree(root, workers=None, dry_run=False, backup=True, logger=print) -> dict:
+    """
+    Upgrades every *.json snapshot/workspace under root, in parallel worker processes.
+
+    Returns:
+        dict: {"upgraded": [...], "current": [...], "failed": {path: error}}
+    """
+    root = Path(root)
+    # Skip tool state (.gc_state.json, .objects/…): only snapshot/workspace documents are migrated
+    files = sorted(str(p) for p in root.rglob("*.json")
+                   if not any(part.startswith(".") for part in p.relative_to(root).parts))
+    result = {"upgraded": [], "current": [], "failed": {}}
+    if not files:
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        outcomes = pool.map(migrate_file, files, [dry_run] * len(files), [backup] * len(files),
+                            chunksize=max(1, len(files) // 64))
+        for path, status, error in outcomes:
+            if status == "failed":
+                result["failed"][path] = error
+                logger(f"[!] Could not upgrade {path}: {error}")
+            else:
+                result[status].append(path)
+
+    verb = "Would upgrade" if dry_run else "Upgraded"
+    logger(f"[✓] {verb} {len(result['upgraded'])} file(s); {len(result['current'])} already current, "
+           f"{len(result['failed'])} failed")
+    return result
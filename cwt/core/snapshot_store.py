@@ -0,0 +1,456 @@
+# core/snapshot_store.py
+
+"""
+Content-addressed snapshot store.
+
+Window records and desktop maps are stored once each, under the sha256 of
+their canonical JSON, in the snapshots root's .objects/ folder:
+
+    .objects/3f/9a1c…          one window record or desktop map
+    .objects/index.sqlite      reverse index: object → snapshots referencing it
+
+A snapshot saved through the store is a small manifest of references:
+
+    {"format_version": "1.1", "store": 1, "collection_name": …, "captured_at": …,
+     "desktops": "<hash>", "windows": [["<hash>", hwnd, z_order(, pid, create_time)], …]}
+
+hwnd, z_order and the owning process instance (pid, create_time) change
+with every capture or app restart, so they live in the manifest; the rest
+of a record (exe, title, class, rect, desktop, command line) is what
+repeats from one capture of a layout to the next. Re-capturing an unchanged layout
+writes one manifest and no objects.
+
+Snapshot.from_dict() expands manifests transparently, so every loader
+(restore, diff, GC, CLI) reads both shapes. Objects no manifest references
+any more are swept by prune(), which SnapshotGC runs after a complete pass.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from cwt.core.snapshot_model import Snapshot, WindowRecord, _write_json_atomic, load_snapshot
+from cwt.utils.compression import is_compressed, read_bytes
+from cwt.utils.paths import OBJECTS_DIRNAME, find_snapshot_files, get_snapshots_dir
+
+STORE_VERSION = 1
+INDEX_FILE = "index.sqlite"
+VOLATILE_FIELDS = ("hwnd", "z_order", "pid", "create_time")   # kept per manifest entry, not in the shared object
+PRUNE_GRACE_SECONDS = 3600                # objects touched this recently are never pruned
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,              -- 'window' or 'desktops'
+    exe TEXT,
+    title TEXT,
+    desktop_name TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    path TEXT PRIMARY KEY,           -- relative to the snapshots root
+    collection_name TEXT,
+    captured_at TEXT
+);
+CREATE TABLE IF NOT EXISTS refs (
+    snapshot TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (snapshot, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS refs_by_hash ON refs (hash);
+CREATE INDEX IF NOT EXISTS objects_by_exe ON objects (exe COLLATE NOCASE);
+"""
+
+
+def _canonical(obj) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def object_hash(payload) -> str:
+    return hashlib.sha256(_canonical(payload)).hexdigest()
+
+
+def window_payload(window) -> dict:
+    """The shareable part of a window record: everything except VOLATILE_FIELDS."""
+    d = WindowRecord.coerce(window).to_dict()
+    for key in VOLATILE_FIELDS:
+        d.pop(key, None)
+    return d
+
+
+def window_hash(window) -> str:
+    return object_hash(window_payload(window))
+
+
+def is_manifest(raw) -> bool:
+    return isinstance(raw, dict) and "store" in raw
+
+
+@lru_cache(maxsize=8192)
+def _read_object(path: str) -> dict:
+    # Objects are immutable (named by their content), so caching by path is safe.
+    # Callers must not mutate the returned dict.
+    return json.loads(Path(path).read_bytes())
+
+
+class SnapshotStore:
+    def __init__(self, root=None, logger=print):
+        """
+        Args:
+            root (Path): Snapshots root; objects live in root/.objects.
+            logger (Callable): Logging function for status messages.
+        """
+        self.root = Path(root) if root else get_snapshots_dir()
+        self.objects_dir = self.root / OBJECTS_DIRNAME
+        self.index_path = self.objects_dir / INDEX_FILE
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    # ── Objects ──────────────────────────────────────────────────────────────
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def put(self, payload) -> tuple:
+        """
+        Stores one object unless it already exists. An existing object's mtime
+        is refreshed, so a concurrent prune() treats it as freshly referenced.
+
+        Returns:
+            tuple: (hash, written) — written is False when the object was already stored.
+        """
+        digest = object_hash(payload)
+        path = self._object_path(digest)
+        try:
+            os.utime(path)
+            return digest, False
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".obj.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_canonical(payload))
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        return digest, True
+
+    def get(self, digest: str) -> dict:
+        path = self._object_path(digest)
+        try:
+            return _read_object(str(path))
+        except FileNotFoundError:
+            raise ValueError(f"Snapshot store object {digest[:12]}… is missing from {self.objects_dir}")
+
+    # ── Snapshots ────────────────────────────────────────────────────────────
+
+    def save(self, snapshot: Snapshot, path) -> dict:
+        """
+        Writes a snapshot as a manifest, storing only the objects not seen before.
+
+        Returns:
+            dict: {"windows", "objects_written", "manifest_bytes"}
+        """
+        path = Path(path)
+        written = 0
+        desktops_ref, new = self.put({str(k): v for k, v in snapshot.desktops.items()})
+        written += new
+        entries, rows = [], [(desktops_ref, "desktops", None, None, None)]
+        for window in snapshot.windows:
+            ref, new = self.put(window_payload(window))
+            written += new
+            entry = [ref, window.hwnd, window.z_order]
+            if window.pid is not None:
+                entry += [window.pid, window.create_time]
+            entries.append(entry)
+            rows.append((ref, "window", window.exe, window.title, window.desktop_name))
+
+        manifest = {
+            "format_version": snapshot.format_version,
+            "store": STORE_VERSION,
+            "collection_name": snapshot.collection_name,
+            "collection_id": snapshot.collection_id,
+            "captured_at": snapshot.captured_at.isoformat(timespec="seconds") if snapshot.captured_at else None,
+            "desktops": desktops_ref,
+            "windows": entries,
+        }
+        _write_json_atomic(path, manifest, compact=True)
+        self._index(path, snapshot.collection_name, manifest["captured_at"], rows)
+        return {"windows": len(entries), "objects_written": written, "manifest_bytes": path.stat().st_size}
+
+    def expand(self, raw) -> dict:
+        """Turns a manifest back into a plain 1.1 snapshot dict."""
+        d = {k: v for k, v in raw.items() if k != "store"}
+        d["desktops"] = dict(self.get(raw["desktops"]))
+        windows = []
+        for ref, hwnd, z_order, *process in raw["windows"]:
+            w = dict(self.get(ref))
+            w["hwnd"], w["z_order"] = hwnd, z_order
+            if process:
+                w["pid"], w["create_time"] = process
+            windows.append(w)
+        d["windows"] = windows
+        return d
+
+    # ── Reverse index ────────────────────────────────────────────────────────
+
+    def _connect(self):
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=5)
+        conn.executescript(INDEX_SCHEMA)
+        return conn
+
+    def _key(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _index(self, path, collection_name, captured_at, rows):
+        """Records which objects a snapshot references. Index trouble never fails a save."""
+        key = self._key(path)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute("DELETE FROM refs WHERE snapshot = ?", (key,))
+                        conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                                     (key, collection_name, captured_at))
+                        conn.executemany("INSERT OR IGNORE INTO objects VALUES (?, ?, ?, ?, ?)", rows)
+                        conn.executemany("INSERT OR IGNORE INTO refs VALUES (?, ?)",
+                                         [(key, row[0]) for row in rows])
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            self.logger(f"[⚠️] Snapshot index not updated for {path}: {e}")
+
+    def forget(self, path):
+        """Drops a removed snapshot from the reverse index."""
+        if not self.index_path.exists():
+            return
+        key = self._key(path)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute("DELETE FROM refs WHERE snapshot = ?", (key,))
+                        conn.execute("DELETE FROM snapshots WHERE path = ?", (key,))
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            self.logger(f"[⚠️] Snapshot index not updated for {path}: {e}")
+
+    def snapshots_containing(self, window) -> list:
+        """
+        Snapshots that contained a window, newest first.
+
+        Args:
+            window: A WindowRecord, a snapshot window dict or an object hash.
+
+        Returns:
+            list[Path]: Snapshot files.
+        """
+        ref = window if isinstance(window, str) else window_hash(window)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT s.path FROM refs r JOIN snapshots s ON s.path = r.snapshot "
+                "WHERE r.hash = ? ORDER BY s.captured_at DESC", (ref,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [self.root / p for (p,) in rows]
+
+    def find_windows(self, title=None, exe=None, limit=50) -> list:
+        """
+        Stored window records by title substring and/or exe name, with the
+        number of snapshots each appears in.
+
+        Returns:
+            list[dict]: {"hash", "exe", "title", "desktop_name", "snapshots"}
+        """
+        clauses, params = ["o.kind = 'window'"], []
+        if title:
+            clauses.append("o.title LIKE ?")
+            params.append(f"%{title}%")
+        if exe:
+            clauses.append("o.exe = ? COLLATE NOCASE")
+            params.append(exe)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT o.hash, o.exe, o.title, o.desktop_name, COUNT(r.snapshot) AS n "
+                f"FROM objects o LEFT JOIN refs r ON r.hash = o.hash "
+                f"WHERE {' AND '.join(clauses)} GROUP BY o.hash ORDER BY n DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"hash": h, "exe": e, "title": t, "desktop_name": d, "snapshots": n} for h, e, t, d, n in rows]
+
+    # ── Maintenance ──────────────────────────────────────────────────────────
+
+    def _snapshot_files(self):
+        folders = [self.root] + sorted(d for d in self.root.iterdir() if d.is_dir() and not d.name.startswith("."))
+        return [p for folder in folders for p in find_snapshot_files(folder)]
+
+    def object_files(self):
+        if not self.objects_dir.is_dir():
+            return []
+        return [p for d in self.objects_dir.iterdir() if d.is_dir() for p in d.iterdir()
+                if p.is_file() and not p.name.startswith(".")]
+
+    def pack(self, dry_run=False) -> dict:
+        """
+        Rewrites every self-contained snapshot under the root as a manifest
+        (compressed ones become plain .json manifests). Modification times are
+        kept, so collection ordering does not change.
+
+        Returns:
+            dict: {"packed": [...], "bytes_before", "bytes_after", "objects_written", "errors": {path: error}}
+        """
+        report = {"packed": [], "bytes_before": 0, "bytes_after": 0, "objects_written": 0, "errors": {}}
+        for path in self._snapshot_files():
+            try:
+                if is_manifest(json.loads(read_bytes(path))):
+                    continue
+                snapshot = load_snapshot(path)
+            except Exception as e:
+                report["errors"][str(path)] = f"{type(e).__name__}: {e}"
+                continue
+            target = path.with_name(path.name[:-len(path.suffix)]) if is_compressed(path) else path
+            st = path.stat()
+            report["packed"].append(str(target))
+            report["bytes_before"] += st.st_size
+            if dry_run:
+                continue
+            result = self.save(snapshot, target)
+            os.utime(target, (st.st_atime, st.st_mtime))
+            if target != path:
+                path.unlink()
+            report["bytes_after"] += result["manifest_bytes"]
+            report["objects_written"] += result["objects_written"]
+        if not dry_run:
+            report["bytes_after"] += sum(p.stat().st_size for p in self.object_files())
+        self.logger(f"[✓] {'Would pack' if dry_run else 'Packed'} {len(report['packed'])} snapshot(s) into the "
+                    f"object store ({report['objects_written']} new object(s))")
+        return report
+
+    def prune(self, dry_run=False, grace_seconds=PRUNE_GRACE_SECONDS) -> dict:
+        """
+        Mark-and-sweep: removes objects no manifest references and brings the
+        reverse index in line with the manifests on disk. Nothing is removed if
+        a manifest is unreadable, since its references can't be known, and
+        objects stored or reused within grace_seconds are left for a later pass
+        (a capture may be writing the manifest that references them).
+
+        Returns:
+            dict: {"objects_pruned", "object_bytes_reclaimed", "errors": {path: error}}
+        """
+        report = {"objects_pruned": 0, "object_bytes_reclaimed": 0, "errors": {}}
+        live, manifests = set(), {}
+        for path in self._snapshot_files():
+            try:
+                data = read_bytes(path)
+                raw = json.loads(data)
+            except Exception as e:
+                if isinstance(e, OSError) or b'"store"' in data:   # possibly a damaged manifest
+                    report["errors"][str(path)] = f"{type(e).__name__}: {e}"
+                continue
+            if is_manifest(raw):
+                refs = {raw["desktops"], *(entry[0] for entry in raw["windows"])}
+                live |= refs
+                manifests[self._key(path)] = (path, raw)
+        if report["errors"]:
+            self.logger(f"[⚠️] Object prune skipped: {len(report['errors'])} unreadable snapshot(s)")
+            return report
+
+        cutoff = time.time() - grace_seconds
+        for path in self.object_files():
+            st = path.stat()
+            if path.parent.name + path.name in live or st.st_mtime > cutoff:
+                continue
+            report["objects_pruned"] += 1
+            report["object_bytes_reclaimed"] += st.st_size
+            if not dry_run:
+                path.unlink()
+        if not dry_run and self.objects_dir.is_dir():
+            self._sync_index(manifests)
+        return report
+
+    def _sync_index(self, manifests):
+        conn = self._connect()
+        try:
+            indexed = {p for (p,) in conn.execute("SELECT path FROM snapshots")}
+            with conn:
+                for key in indexed - manifests.keys():
+                    conn.execute("DELETE FROM refs WHERE snapshot = ?", (key,))
+                    conn.execute("DELETE FROM snapshots WHERE path = ?", (key,))
+                conn.execute("DELETE FROM objects WHERE hash NOT IN (SELECT hash FROM refs)")
+        finally:
+            conn.close()
+        for key in manifests.keys() - indexed:
+            path, raw = manifests[key]
+            try:
+                snapshot = Snapshot.from_dict(raw, path)
+            except Exception as e:
+                self.logger(f"[!] Could not index {path}: {e}")
+                continue
+            rows = [(raw["desktops"], "desktops", None, None, None)]
+            rows += [(entry[0], "window", w.exe, w.title, w.desktop_name)
+                     for entry, w in zip(raw["windows"], snapshot.windows)]
+            self._index(path, raw.get("collection_name"), raw.get("captured_at"), rows)
+
+    def stats(self) -> dict:
+        objects = self.object_files()
+        manifests = 0
+        for path in self._snapshot_files():
+            try:
+                manifests += is_manifest(json.loads(read_bytes(path)))
+            except Exception:
+                continue
+        return {
+            "root": str(self.root),
+            "objects": len(objects),
+            "object_bytes": sum(p.stat().st_size for p in objects),
+            "manifests": manifests,
+        }
+
+
+_stores = {}
+
+
+def get_store(root=None, logger=print) -> SnapshotStore:
+    """Returns the (shared) store for a snapshots root."""
+    root = Path(root) if root else get_snapshots_dir()
+    key = str(root.resolve())
+    if key not in _stores:
+        _stores[key] = SnapshotStore(root, logger=logger)
+    return _stores[key]
+
+
+def _store_for(path) -> SnapshotStore:
+    """The store a manifest belongs to: the nearest parent folder holding .objects/."""
+    if path:
+        for parent in Path(path).resolve().parents:
+            if (parent / OBJECTS_DIRNAME).is_dir():
+                return get_store(parent)
+    return get_store()
+
+
+def expand_manifest(raw, path=None) -> dict:
+    """Hook for Snapshot.from_dict(): resolves a manifest's references."""
+    return _store_for(path).expand(raw)
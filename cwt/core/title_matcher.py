@@ -0,0 +1,130 @@
+# core/title_matcher.py
+
+"""
+Title matchers: pair every snapshot window with the best live window of the
+same exe.
+
+    fuzzy   fuzzywuzzy partial_ratio, scored one pair at a time (default)
+    tfidf   character n-gram TF-IDF: all saved and live titles are vectorized
+            once and each exe's full similarity matrix is one sparse product
+
+Both return (snapshot_window, live_window or None, score 0–100) per snapshot
+window. The scores are on different scales — partial_ratio rewards a title
+contained in another, cosine similarity penalizes the extra words — so each
+matcher has its own default threshold (DEFAULT_THRESHOLDS).
+
+The tfidf matcher needs scikit-learn; without it match_titles() falls back
+to fuzzy with a warning.
+"""
+
+from fuzzywuzzy import fuzz
+
+from cwt.core.snapshot_model import WindowRecord
+
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+except ImportError:
+    np = TfidfVectorizer = None
+
+MATCHERS = ("fuzzy", "tfidf")
+DEFAULT_MATCHER = "fuzzy"
+DEFAULT_THRESHOLDS = {"fuzzy": 85, "tfidf": 60}
+NGRAM_RANGE = (2, 4)
+CHUNK_ROWS = 1024       # snapshot rows per dense block of the similarity matrix
+
+
+def group_by_exe(current_windows):
+    live_by_exe = {}
+    for live_win in map(WindowRecord.coerce, current_windows):
+        live_by_exe.setdefault(live_win.exe.lower(), []).append(live_win)
+    return live_by_exe
+
+
+def match_fuzzy(snap_windows, live_by_exe):
+    matches = []
+    for snap_win in snap_windows:
+        best_match = None
+        best_score = 0
+        for live_win in live_by_exe.get(snap_win.exe.lower(), ()):
+            score = fuzz.partial_ratio(snap_win.title, live_win.title)
+            if score > best_score:
+                best_score = score
+                best_match = live_win
+        matches.append((snap_win, best_match, best_score))
+    return matches
+
+
+def match_tfidf(snap_windows, live_by_exe):
+    """
+    One vectorizer is fitted over every title (so IDF down-weights n-grams
+    shared by everything, like " - Google Chrome"); each exe group then
+    scores all its snapshot rows against all its live rows at once.
+    """
+    matches = [(snap_win, None, 0) for snap_win in snap_windows]
+    live_groups = list(live_by_exe.items())
+    live_titles = [w.title for _, group in live_groups for w in group]
+    if not snap_windows or not live_titles:
+        return matches
+
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=NGRAM_RANGE, lowercase=True,
+                                 sublinear_tf=True, dtype=np.float32)
+    try:
+        # Each title is analyzed exactly once: saved rows first, then live rows grouped by exe
+        vectors = vectorizer.fit_transform([w.title for w in snap_windows] + live_titles).tocsr()
+    except ValueError:          # every title empty → empty vocabulary
+        return matches
+    saved = vectors[:len(snap_windows)]
+
+    live_slices, offset = {}, len(snap_windows)
+    for exe, group in live_groups:
+        live_slices[exe] = (group, offset, offset + len(group))
+        offset += len(group)
+
+    rows_by_exe = {}
+    for i, snap_win in enumerate(snap_windows):
+        rows_by_exe.setdefault(snap_win.exe.lower(), []).append(i)
+
+    for exe, rows in rows_by_exe.items():
+        if exe not in live_slices:
+            continue
+        live, start, stop = live_slices[exe]
+        live_t = vectors[start:stop].T.tocsc()
+        for first in range(0, len(rows), CHUNK_ROWS):
+            block = rows[first:first + CHUNK_ROWS]
+            sim = (saved[block] @ live_t).toarray()        # rows are L2-normalized → cosine
+            best = sim.argmax(axis=1)
+            scores = sim[np.arange(len(block)), best]
+            for row, col, score in zip(block, best, scores):
+                score = int(round(float(score) * 100))
+                if score > 0:
+                    matches[row] = (snap_windows[row], live[col], score)
+    return matches
+
+
+def match_titles(snap_windows, current_windows, matcher=DEFAULT_MATCHER, logger=print):
+    """
+    Matches snapshot windows to live windows with the chosen matcher.
+
+    Args:
+        snap_windows (list[WindowRecord]): Saved windows.
+        current_windows (list): Live windows (WindowRecord or enumeration dicts).
+        matcher (str): "fuzzy" or "tfidf".
+        logger (Callable): Logging function for status messages.
+
+    Returns:
+        list: Tuples of (snapshot_window, matched_live_window, match_score)
+    """
+    if matcher not in MATCHERS:
+        raise ValueError(f"Unknown matcher {matcher!r} (expected one of {', '.join(MATCHERS)})")
+    live_by_exe = group_by_exe(current_windows)
+    if matcher == "tfidf":
+        if TfidfVectorizer is not None:
+            return match_tfidf(snap_windows, live_by_exe)
+        logger("[⚠️] scikit-learn is not installed — using the fuzzy matcher")
+    return match_fuzzy(snap_windows, live_by_exe)
+
+
+def threshold_for(matcher, threshold=None):
+    """The caller's threshold, or the matcher's default when None."""
+    return DEFAULT_THRESHOLDS.get(matcher, DEFAULT_THRESHOLDS[DEFAULT_MATCHER]) if threshold is None else threshold
@@ -0,0 +1,373 @@
+# core/window_cache.py
+
+"""
+Live window-state cache kept current from window events.
+
+Instead of re-walking EnumWindows and re-querying every window for each
+capture and restore, a WindowStateCache is seeded once and then updated
+per-hwnd as windows are created, destroyed, moved or retitled. Event sources:
+
+    WinEventSource        — SetWinEventHook on a background thread (Windows)
+    SimulatedEventSource  — in-memory window world driven by tests/simulator
+
+Consumers read cache.windows() for an instant capture and call
+cache.wait_for(predicate, timeout) to block until a specific window appears.
+"""
+
+import threading
+import time
+
+from cwt.core.snapshot_model import WindowRecord
+
+# Event kinds understood by WindowStateCache.handle_event()
+EVENT_CREATE = "create"
+EVENT_DESTROY = "destroy"
+EVENT_SHOW = "show"
+EVENT_HIDE = "hide"
+EVENT_MOVE = "move"
+EVENT_TITLE = "title"
+
+
+class WindowStateCache:
+    def __init__(self, describe, read_rect=None, read_title=None, desktops=None, logger=print):
+        """
+        Args:
+            describe (Callable[[int], WindowRecord | None]): Full per-window query (title, rect,
+                exe, desktop). Returns None for windows that should not be tracked.
+            read_rect (Callable[[int], tuple]): Cheap (left, top, right, bottom) read used
+                for move events. Falls back to describe() when omitted.
+            read_title (Callable[[int], str]): Cheap title read used for rename events.
+            desktops (DesktopManager): Desktop map used by refresh_desktops().
+            logger (Callable): Logging function for status messages.
+        """
+        self.describe = describe
+        self.read_rect = read_rect
+        self.read_title = read_title
+        self.desktops = desktops
+        self.logger = logger
+        self._windows = {}
+        self._cond = threading.Condition()
+        self.version = 0
+        self.event_count = 0
+
+    # ── Population ───────────────────────────────────────────────────────────
+
+    def seed(self, records):
+        """Replaces the cached state with a full enumeration."""
+        with self._cond:
+            self._windows = {r.hwnd: r.copy() for r in map(WindowRecord.coerce, records)}
+            self._bump()
+
+    def refresh(self, hwnd):
+        """Re-describes one window and stores (or drops) it."""
+        record = self.describe(hwnd)
+        with self._cond:
+            if record:
+                self._windows[hwnd] = record
+            else:
+                self._windows.pop(hwnd, None)
+            self._bump()
+        return record
+
+    def refresh_desktops(self):
+        """
+        Re-reads desktop membership for every cached window. Moving a window to
+        another virtual desktop raises no WinEvent, so capture calls this instead
+        of a full re-enumeration.
+        """
+        if self.desktops is None:
+            return
+        hwnds = list(self._windows)
+        updates = {}
+        for hwnd in hwnds:
+            guid = self.desktops.desktop_of_window(hwnd)
+            number = self.desktops.number_of(guid) if guid else None
+            updates[hwnd] = (number, self.desktops.name_of(guid) if number else "Unknown")
+        with self._cond:
+            for hwnd, (number, name) in updates.items():
+                record = self._windows.get(hwnd)
+                if record:
+                    record.desktop_number = number
+                    record.desktop_name = name
+            self._bump()
+
+    def handle_event(self, event, hwnd):
+        """Applies a single window event to the cache."""
+        self.event_count += 1
+        if event in (EVENT_DESTROY, EVENT_HIDE):
+            with self._cond:
+                if self._windows.pop(hwnd, None) is not None:
+                    self._bump()
+            return
+
+        if event == EVENT_MOVE and self.read_rect and hwnd in self._windows:
+            try:
+                left, top, right, bottom = self.read_rect(hwnd)
+            except Exception:
+                return
+            with self._cond:
+                record = self._windows.get(hwnd)
+                if record:
+                    record.x, record.y = left, top
+                    record.width, record.height = right - left, bottom - top
+                    self._bump()
+            return
+
+        if event == EVENT_TITLE and self.read_title and hwnd in self._windows:
+            try:
+                title = self.read_title(hwnd)
+            except Exception:
+                return
+            with self._cond:
+                record = self._windows.get(hwnd)
+                if record and title:
+                    record.title = title
+                    self._bump()
+            return
+
+        # create / show, or a move/rename of a window we weren't tracking yet
+        self.refresh(hwnd)
+
+    def _bump(self):
+        self.version += 1
+        self._cond.notify_all()
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def windows(self):
+        """Returns copies of all cached window records."""
+        with self._cond:
+            return [r.copy() for r in self._windows.values()]
+
+    def get(self, hwnd):
+        with self._cond:
+            record = self._windows.get(hwnd)
+            return record.copy() if record else None
+
+    def __len__(self):
+        return len(self._windows)
+
+    def wait_for(self, predicate, timeout=10.0, exclude=()):
+        """
+        Blocks until a cached window satisfies predicate, woken by cache updates.
+
+        Args:
+            predicate (Callable[[WindowRecord], bool]): Test applied to each window record.
+            timeout (float): Seconds to wait before giving up.
+            exclude (Iterable[int]): hwnds to ignore (e.g. already-claimed windows).
+
+        Returns:
+            WindowRecord: The first matching record, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        exclude = set(exclude)
+        with self._cond:
+            while True:
+                for hwnd, record in self._windows.items():
+                    if hwnd not in exclude and predicate(record):
+                        return record.copy()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+
+# ── Event sources ─────────────────────────────────────────────────────────────
+
+class WinEventSource:
+    """
+    Feeds a WindowStateCache from SetWinEventHook on a dedicated message-loop
+    thread. Only top-level window objects are forwarded.
+    """
+
+    EVENT_OBJECT_CREATE = 0x8000
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_SHOW = 0x8002
+    EVENT_OBJECT_HIDE = 0x8003
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    GA_ROOT = 2
+    WM_QUIT = 0x0012
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._event_map = {
+            self.EVENT_OBJECT_CREATE: EVENT_CREATE,
+            self.EVENT_OBJECT_DESTROY: EVENT_DESTROY,
+            self.EVENT_OBJECT_SHOW: EVENT_SHOW,
+            self.EVENT_OBJECT_HIDE: EVENT_HIDE,
+            self.EVENT_OBJECT_LOCATIONCHANGE: EVENT_MOVE,
+            self.EVENT_OBJECT_NAMECHANGE: EVENT_TITLE,
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="cwt-winevent", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        return self
+
+    def stop(self):
+        if self._thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        if self._thread:
+            self._thread.join(2.0)
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+        try:
+            import comtypes         # describe_window asks pyvda for each new window's desktop
+            comtypes.CoInitialize()
+        except Exception:
+            pass
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        user32.GetAncestor.restype = wintypes.HWND
+        user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [
+            wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc,
+            wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+        ]
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, timestamp):
+            if id_object != self.OBJID_WINDOW or id_child != 0 or not hwnd:
+                return
+            if user32.GetAncestor(hwnd, self.GA_ROOT) != hwnd:
+                return
+            kind = self._event_map.get(event)
+            if kind:
+                try:
+                    self.cache.handle_event(kind, hwnd)
+                except Exception as e:
+                    self.cache.logger(f"[!] Window cache event failed for hwnd {hwnd}: {e}")
+
+        # Keep a reference — ctypes callbacks are freed when collected
+        self._proc = WinEventProc(callback)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        ranges = [
+            (self.EVENT_OBJECT_CREATE, self.EVENT_OBJECT_HIDE),
+            (self.EVENT_OBJECT_LOCATIONCHANGE, self.EVENT_OBJECT_NAMECHANGE),
+        ]
+        hooks = [user32.SetWinEventHook(lo, hi, 0, self._proc, 0, 0, flags) for lo, hi in ranges]
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self._ready.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+        try:
+            import comtypes
+            comtypes.CoUninitialize()
+        except Exception:
+            pass
+
+
+class SimulatedEventSource:
+    """
+    In-memory window world for tests and the simulator. Mutating methods update
+    the world and deliver the matching event to the attached cache.
+    """
+
+    def __init__(self):
+        self.world = {}
+        self.cache = None
+        self._next_hwnd = 1000
+
+    def describe(self, hwnd):
+        record = self.world.get(hwnd)
+        return WindowRecord.from_dict(record) if record else None
+
+    def read_rect(self, hwnd):
+        r = self.world[hwnd]
+        return r["x"], r["y"], r["x"] + r["width"], r["y"] + r["height"]
+
+    def read_title(self, hwnd):
+        return self.world[hwnd]["title"]
+
+    def make_cache(self, logger=print):
+        """Builds a WindowStateCache wired to this world and seeds it."""
+        self.cache = WindowStateCache(self.describe, self.read_rect, self.read_title, logger=logger)
+        self.cache.seed(self.world.values())
+        return self.cache
+
+    def _emit(self, event, hwnd):
+        if self.cache is not None:
+            self.cache.handle_event(event, hwnd)
+
+    def create_window(self, title, exe, x=0, y=0, width=800, height=600, desktop_number=1, desktop_name="Unknown"):
+        hwnd = self._next_hwnd
+        self._next_hwnd += 1
+        self.world[hwnd] = {
+            "hwnd": hwnd, "title": title, "exe": exe,
+            "x": x, "y": y, "width": width, "height": height,
+            "desktop_number": desktop_number, "desktop_name": desktop_name,
+        }
+        self._emit(EVENT_CREATE, hwnd)
+        return hwnd
+
+    def destroy_window(self, hwnd):
+        self.world.pop(hwnd, None)
+        self._emit(EVENT_DESTROY, hwnd)
+
+    def move_window(self, hwnd, x, y, width=None, height=None):
+        record = self.world[hwnd]
+        record.update(x=x, y=y)
+        if width is not None:
+            record["width"] = width
+        if height is not None:
+            record["height"] = height
+        self._emit(EVENT_MOVE, hwnd)
+
+    def retitle_window(self, hwnd, title):
+        self.world[hwnd]["title"] = title
+        self._emit(EVENT_TITLE, hwnd)
+
+
+def start_live_cache(desktops=None, rules=None, logger=print):
+    """
+    Seeds a WindowStateCache from one full enumeration and starts the WinEvent
+    hook that keeps it current. Windows only. Windows ignored by `rules`
+    (default: the .windowignore rules) are never cached.
+
+    Returns:
+        tuple: (cache, source) — call source.stop() to unhook.
+    """
+    import win32gui
+    from cwt.utils.get_all_visible_windows import describe_window, get_all_visible_windows
+    from cwt.utils.vda_utils import DesktopManager
+    from cwt.core.window_rules import load_rules
+
+    if desktops is None:
+        desktops = DesktopManager(logger=logger)
+    if rules is None:
+        rules = load_rules(logger=logger)
+
+    cache = WindowStateCache(
+        describe=lambda hwnd: describe_window(hwnd, desktops, rules),
+        read_rect=win32gui.GetWindowRect,
+        read_title=win32gui.GetWindowText,
+        desktops=desktops,
+        logger=logger
+    )
+    source = WinEventSource(cache).start()
+    # Seed after hooking so nothing created in between is missed
+    cache.seed(get_all_visible_windows(desktops, rules))
+    return cache, source
@@ -0,0 +1,238 @@
+# core/window_rules.py
+
+"""
+.windowignore rules engine.
+
+One rule per line; every condition on a line must hold (AND). Later lines
+win over earlier ones, and a leading "!" re-includes windows an earlier
+rule ignored — the same model as .gitignore.
+
+    # comment
+    exe:VoiceAccess.exe             glob, case-insensitive
+    class:Shell_TrayWnd
+    title:"*Chrome Workspace Toolkit*"   quote values that contain spaces
+    title:re:^Picture-in-picture$   regex instead of glob (any field)
+    size:<120x80                    ignore windows narrower OR shorter than this
+    desktop:3 exe:Spotify.exe       scope a rule to a desktop (number or name glob)
+    !exe:explorer.exe class:CabinetWClass
+
+Rules are compiled once into a RuleSet. Enumeration checks them in stages —
+title/class/size (free: already read), then exe (process lookup), then
+desktop (virtual-desktop COM call) — so a window ignored by an early stage
+is never queried for the expensive fields.
+"""
+
+import fnmatch
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from cwt.utils.paths import get_windowignore_path
+
+# Fields in the order enumeration can provide them; cheaper stages first
+STAGE_BASIC = 0     # title, class, size
+STAGE_EXE = 1
+STAGE_DESKTOP = 2
+FIELD_STAGES = {"title": STAGE_BASIC, "class": STAGE_BASIC, "size": STAGE_BASIC,
+                "exe": STAGE_EXE, "desktop": STAGE_DESKTOP}
+
+CONDITION_REGEX = re.compile(r'(\w+):("[^"]*"|\S+)')
+RULE_REGEX = re.compile(r'\s*\w+:("[^"]*"|\S+)(\s+\w+:("[^"]*"|\S+))*\s*')
+SIZE_REGEX = re.compile(r"^([<>])\s*(\d+)\s*[x×]\s*(\d+)$")
+
+DEFAULT_RULES = """
+# Built-in defaults (formerly restore.IGNORED_PROCESSES)
+exe:VoiceAccess.exe
+# explorer.exe's shell surfaces (taskbar, desktop, flyouts) — folder windows stay
+exe:explorer.exe
+!exe:explorer.exe class:CabinetWClass
+# CWT's own window
+title:"Chrome Workspace Toolkit"
+"""
+
+
+class RuleError(ValueError):
+    """Raised for a malformed .windowignore line."""
+
+
+def _compile_text(pattern):
+    if pattern.startswith("re:"):
+        return re.compile(pattern[3:], re.IGNORECASE)
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class Rule:
+    negate: bool
+    conditions: tuple     # ((field, compiled), ...)
+    stage: int
+    source: str
+
+    def matches(self, fields):
+        for name, test in self.conditions:
+            if name == "size":
+                op, w, h = test
+                width, height = fields["width"], fields["height"]
+                hit = (width < w or height < h) if op == "<" else (width > w and height > h)
+            elif name == "desktop":
+                number, label = fields.get("desktop_number"), fields.get("desktop_name") or ""
+                hit = bool(test.match(str(number)) or test.match(label))
+            else:
+                hit = bool(test.match(fields.get(name) or ""))
+            if not hit:
+                return False
+        return True
+
+
+def parse_rule(line):
+    """Parses one non-comment line into a Rule. Raises RuleError on bad syntax."""
+    source = line.strip()
+    text, negate = source, False
+    if text.startswith("!"):
+        text, negate = text[1:].strip(), True
+
+    if not RULE_REGEX.fullmatch(text):
+        raise RuleError(f"Unparseable rule: {source}")
+
+    conditions, stage = [], STAGE_BASIC
+    for token in CONDITION_REGEX.findall(text):
+        name, value = token[0].lower(), token[1].strip('"')
+        if name not in FIELD_STAGES:
+            raise RuleError(f"Unknown field '{name}' in rule: {source}")
+        if name == "size":
+            m = SIZE_REGEX.match(value)
+            if not m:
+                raise RuleError(f"Bad size '{value}' (expected <WxH or >WxH) in rule: {source}")
+            compiled = (m.group(1), int(m.group(2)), int(m.group(3)))
+        else:
+            try:
+                compiled = _compile_text(value)
+            except re.error as e:
+                raise RuleError(f"Bad regex in rule '{source}': {e}")
+        conditions.append((name, compiled))
+        stage = max(stage, FIELD_STAGES[name])
+
+    return Rule(negate, tuple(conditions), stage, source)
+
+
+class RuleSet:
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self._has_negation = any(r.negate for r in self.rules)
+        self._upto = {s: [r for r in self.rules if r.stage <= s] for s in (STAGE_BASIC, STAGE_EXE, STAGE_DESKTOP)}
+        self._later_negation = {s: any(r.negate and r.stage > s for r in self.rules)
+                                for s in (STAGE_BASIC, STAGE_EXE, STAGE_DESKTOP)}
+
+        # Without negations order doesn't matter: single-condition text rules for the
+        # same field collapse into one alternation regex per stage.
+        self._combined = {s: [] for s in (STAGE_BASIC, STAGE_EXE, STAGE_DESKTOP)}
+        self._compound = {s: [] for s in (STAGE_BASIC, STAGE_EXE, STAGE_DESKTOP)}
+        if not self._has_negation:
+            by_field = {}
+            for rule in self.rules:
+                name, test = rule.conditions[0]
+                if len(rule.conditions) == 1 and name in ("title", "class", "exe"):
+                    by_field.setdefault(name, []).append(test.pattern)
+                else:
+                    self._compound[rule.stage].append(rule)
+            for name, patterns in by_field.items():
+                combined = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+                self._combined[FIELD_STAGES[name]].append((name, combined))
+
+    @classmethod
+    def from_lines(cls, lines):
+        rules = []
+        for lineno, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                rules.append(parse_rule(line))
+            except RuleError as e:
+                raise RuleError(f"line {lineno}: {e}")
+        return cls(rules)
+
+    @classmethod
+    def from_text(cls, text):
+        return cls.from_lines(text.splitlines())
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __add__(self, other):
+        return RuleSet(self.rules + other.rules)
+
+    def needs(self, stage):
+        """True if any rule looks at this stage's fields."""
+        return any(r.stage == stage for r in self.rules)
+
+    def check(self, stage, fields, ignored=False):
+        """
+        Verdict using every rule answerable with the fields known at `stage`.
+
+        Args:
+            stage (int): STAGE_BASIC / STAGE_EXE / STAGE_DESKTOP.
+            fields (dict): title, class, width, height (+ exe, + desktop_number/desktop_name).
+            ignored (bool): Verdict from the previous stage (used when there are no negations).
+
+        Returns:
+            tuple: (ignored, final) — final is True when no later-stage rule can
+            change the verdict, so the caller may stop querying this window.
+        """
+        if not self._has_negation:
+            if not ignored:
+                ignored = any(test.match(fields.get(name) or "") for name, test in self._combined[stage]) \
+                    or any(rule.matches(fields) for rule in self._compound[stage])
+            return ignored, ignored
+
+        # Negations make order significant: replay rules in file order (last match wins)
+        ignored = False
+        for rule in self._upto[stage]:
+            if rule.negate == ignored and rule.matches(fields):
+                ignored = not rule.negate
+        return ignored, ignored and not self._later_negation[stage]
+
+    def ignores(self, fields):
+        """Full verdict for a complete record (dict or WindowRecord)."""
+        if not isinstance(fields, dict):
+            fields = {"exe": fields.exe, "title": fields.title, "class": fields.class_name,
+                      "width": fields.width, "height": fields.height,
+                      "desktop_number": fields.desktop_number, "desktop_name": fields.desktop_name}
+        ignored = False
+        for stage in (STAGE_BASIC, STAGE_EXE, STAGE_DESKTOP):
+            ignored, final = self.check(stage, fields, ignored)
+            if final:
+                break
+        return ignored
+
+
+def load_rules(path=None, extra_lines=(), logger=print):
+    """
+    Compiles any extra rule lines, the built-in defaults
+    and the .windowignore file (if present) into one RuleSet — in that order, so
+    the file has the last word. A malformed file is reported and skipped,
+    leaving the defaults in force.
+    """
+    path = Path(path) if path else get_windowignore_path()
+    lines = DEFAULT_RULES.splitlines()
+    try:
+        file_rules = RuleSet.from_text(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        file_rules = RuleSet()
+    except (OSError, RuleError) as e:
+        logger(f"[!] Ignoring {path}: {e}")
+        file_rules = RuleSet()
+    return RuleSet.from_lines(extra_lines) + RuleSet.from_lines(lines) + file_rules
+
+
+def capture_filter_lines(chrome_only=False, app_only=False):
+    """
+    The capture tab's Chrome-only / Apps-only checkboxes, expressed as rules.
+    Ignore-only (no "!" lines), so appending them after the user's rules can
+    narrow the capture but never re-include a window the user ignored.
+    """
+    if chrome_only:
+        return ["exe:re:^(?!.*chrome)"]
+    if app_only:
+        return ["exe:*chrome*"]
+    return []
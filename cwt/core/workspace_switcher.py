@@ -0,0 +1,248 @@
+# core/workspace_switcher.py
+
+"""
+Workspace switching: bring the incoming window set back, park the outgoing one.
+
+restore_windows() re-matches and repositions every window of a snapshot.
+Switching between contexts that are already open doesn't need that: the
+switcher remembers which live windows each workspace (a collection) owns
+and where they were, so a switch is
+
+    1. un-park the incoming set from its cached positions   (one scheduler run, no matching)
+    2. read the outgoing windows' current rects / desktops   (where the user left them)
+    3. park them in one batch — minimize, or move to a holding desktop
+
+Only the first switch to a workspace goes through restore_windows(); the
+RestoreOps it executes become that workspace's window set. Windows shared
+by both workspaces stay where they are. Each set remembers how it was
+parked, so it is un-parked the same way whatever mode the next switch asks
+for. Sets persist in storage/switcher_state.json; a window only counts as part of a set while
+its hwnd is alive with the same window class (Windows reuses hwnds).
+
+The Win32 / pyvda side is a backend object (Win32SwitchBackend), so the
+switching logic runs without a Windows session.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from cwt.core.restore_scheduler import RestoreOp
+from cwt.core.snapshot_model import WindowRecord, _write_json_atomic
+from cwt.utils.paths import SWITCHER_STATE, get_latest_snapshot
+
+PARK_MODES = ("minimize", "desktop")
+HOLDING_DESKTOP = "CWT Parking"
+
+
+def _entry(op) -> dict:
+    s, w = op.snap_win, op.live_win
+    return {"hwnd": w.hwnd, "title": w.title, "exe": w.exe, "class_name": w.class_name,
+            "x": s.x, "y": s.y, "width": s.width, "height": s.height, "z_order": s.z_order,
+            "desktop_id": op.desktop_guid, "desktop_number": op.desktop_number}
+
+
+def _op(entry) -> RestoreOp:
+    record = WindowRecord.from_dict(entry)
+    return RestoreOp(record, record.copy(desktop_number=None), 100,
+                     entry.get("desktop_id"), entry.get("desktop_number"))
+
+
+class WorkspaceSwitcher:
+    def __init__(self, backend, state_path=SWITCHER_STATE, park=PARK_MODES[0], logger=print):
+        """
+        Args:
+            backend (Win32SwitchBackend): alive / read_layout / park / unpark / restore.
+            state_path (Path): JSON file the window sets persist to.
+            park (str): "minimize" or "desktop" (move to the holding desktop).
+            logger (Callable): Logging function for status messages.
+        """
+        if park not in PARK_MODES:
+            raise ValueError(f"Unknown park mode {park!r} (expected one of {', '.join(PARK_MODES)})")
+        self.backend = backend
+        self.state_path = Path(state_path)
+        self.park_mode = park
+        self.logger = logger
+        self.active = None
+        self.sets = {}          # workspace → {"snapshot": str | None, "ops": [RestoreOp], "parked": mode | None}
+        self._load()
+
+    def _load(self):
+        try:
+            raw = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.active = raw.get("active")
+        self.sets = {name: {"snapshot": s.get("snapshot"), "ops": [_op(e) for e in s.get("windows", ())],
+                            "parked": s.get("parked")}
+                     for name, s in raw.get("sets", {}).items()}
+
+    def save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.state_path, {
+            "active": self.active,
+            "sets": {name: {"snapshot": s["snapshot"], "windows": [_entry(op) for op in s["ops"]],
+                            "parked": s.get("parked")}
+                     for name, s in self.sets.items()},
+        }, compact=True)
+
+    def record(self, name, ops, snapshot=None):
+        """Makes ops (as executed by a restore) the window set of workspace name."""
+        self.sets[name] = {"snapshot": str(snapshot) if snapshot else None, "ops": list(ops), "parked": None}
+
+    def forget(self, name):
+        self.sets.pop(name, None)
+        if self.active == name:
+            self.active = None
+
+    def _live_ops(self, name):
+        entry = self.sets.get(name)
+        if not entry:
+            return []
+        entry["ops"] = [op for op in entry["ops"] if self.backend.alive(op.live_win)]
+        return entry["ops"]
+
+    def _refresh(self, ops):
+        """Re-reads where the user left each window, so un-parking puts it back there."""
+        layout = self.backend.read_layout([op.hwnd for op in ops])
+        refreshed = []
+        for op in ops:
+            if op.hwnd not in layout:
+                continue
+            x, y, width, height, z_order, guid, number, _ = layout[op.hwnd]
+            snap_win = op.snap_win.copy(x=x, y=y, width=width, height=height, z_order=z_order)
+            refreshed.append(RestoreOp(snap_win, op.live_win, op.score, guid or op.desktop_guid,
+                                       number or op.desktop_number))
+        return refreshed
+
+    def switch(self, name, snapshot_path=None):
+        """
+        Makes workspace name the visible one.
+
+        Args:
+            name (str): Workspace (collection) to switch to.
+            snapshot_path (str): Snapshot for a first switch; defaults to the
+                set's recorded snapshot, then the collection's newest one.
+
+        Returns:
+            dict: {"workspace", "from", "mode": "unpark" | "restore", "parked",
+            "restored", "elapsed_ms"}.
+        """
+        start = time.perf_counter()
+        outgoing = self.active if self.active != name else None
+        report = {"workspace": name, "from": self.active, "mode": None, "parked": 0, "restored": 0}
+
+        incoming = self._live_ops(name)
+        if incoming:
+            report["mode"] = "unpark"
+            # Un-park the way the set was parked, not the way this switch parks
+            parked_with = self.sets[name].get("parked") or self.park_mode
+            report["restored"] = self.backend.unpark(incoming, parked_with).get("restored", 0)
+            self.sets[name]["parked"] = None
+        else:
+            snapshot_path = snapshot_path or (self.sets.get(name) or {}).get("snapshot") \
+                or get_latest_snapshot(name)
+            if snapshot_path is None:
+                raise FileNotFoundError(f"No snapshot found for workspace '{name}'")
+            report["mode"] = "restore"
+            summary = self.backend.restore(snapshot_path, lambda ops: self.record(name, ops, snapshot_path))
+            report["restored"] = summary.get("restored", 0)
+
+        if outgoing is not None:
+            keep = {op.hwnd for op in self.sets.get(name, {}).get("ops", ())}
+            leaving = self._refresh(self._live_ops(outgoing))
+            self.sets[outgoing]["ops"] = leaving
+            report["parked"] = self.backend.park([op for op in leaving if op.hwnd not in keep], self.park_mode)
+            self.sets[outgoing]["parked"] = self.park_mode
+
+        self.active = name
+        try:
+            self.save()
+        except OSError as e:
+            self.logger(f"[⚠️] Switcher state not saved: {e}")
+        report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.logger(f"[✓] Switched to '{name}' ({report['mode']}): {report['restored']} window(s) shown, "
+                    f"{report['parked']} parked in {report['elapsed_ms']} ms")
+        return report
+
+
+class Win32SwitchBackend:
+    def __init__(self, desktops=None, window_cache=None, holding_desktop=HOLDING_DESKTOP, logger=print,
+                 **restore_kwargs):
+        """
+        Args:
+            desktops (DesktopManager): Shared desktop map.
+            window_cache (WindowStateCache): Live cache; read for desktops instead of pyvda.
+            holding_desktop (str): Name of the desktop parked windows move to.
+            logger (Callable): Logging function for status messages.
+            **restore_kwargs: Passed on to restore_windows() for first switches.
+        """
+        from cwt.utils.vda_utils import DesktopManager
+        self.desktops = desktops or DesktopManager(logger=logger)
+        self.window_cache = window_cache
+        self.holding_desktop = holding_desktop
+        self.logger = logger
+        self.restore_kwargs = restore_kwargs
+
+    def alive(self, window):
+        from cwt.core.restore import window_alive
+        return window_alive(window)
+
+    def read_layout(self, hwnds):
+        """Returns {hwnd: (x, y, width, height, z_order, desktop_guid, desktop_number, iconic)}."""
+        from cwt.core.restore import read_window_layout
+        return read_window_layout(hwnds, self.desktops, self.window_cache)
+
+    def park(self, ops, mode):
+        if not ops:
+            return 0
+        import win32con
+        import win32gui
+        parked = 0
+        if mode == "desktop":
+            from pyvda import AppView
+            holding = self.desktops.ensure_named(self.holding_desktop)
+            if holding is None:
+                mode = "minimize"
+            else:
+                for op in ops:
+                    try:
+                        AppView(op.hwnd).move(holding)
+                        parked += 1
+                    except Exception as e:
+                        self.logger(f"[!] Failed to park hwnd {op.hwnd}: {e}")
+                return parked
+        for op in ops:
+            try:
+                # Async: a hung app can't stall the switch
+                win32gui.ShowWindowAsync(op.hwnd, win32con.SW_SHOWMINNOACTIVE)
+                parked += 1
+            except Exception as e:
+                self.logger(f"[!] Failed to park hwnd {op.hwnd}: {e}")
+        return parked
+
+    def unpark(self, ops, mode):
+        from cwt.core.restore import execute_restore_plan
+        # Minimized windows are still on their desktop; parked ones always move back
+        ops = [RestoreOp(op.snap_win, op.live_win.copy(desktop_number=op.desktop_number if mode == "minimize"
+                                                       else None), op.score, op.desktop_guid, op.desktop_number)
+               for op in ops]
+        return execute_restore_plan(ops, self.logger, self.desktops)
+
+    def restore(self, snapshot_path, on_plan):
+        from cwt.core.restore import restore_windows
+        return restore_windows(str(snapshot_path), logger=self.logger, desktops=self.desktops,
+                               window_cache=self.window_cache, on_plan=on_plan, **self.restore_kwargs)
+
+
+_switcher = None
+
+
+def get_workspace_switcher(desktops=None, window_cache=None, park=PARK_MODES[0], logger=print):
+    """Returns the process-wide switcher (the daemon keeps it, and its window sets, warm)."""
+    global _switcher
+    if _switcher is None:
+        _switcher = WorkspaceSwitcher(Win32SwitchBackend(desktops, window_cache, logger=logger),
+                                      park=park, logger=logger)
+    _switcher.park_mode = park
+    return _switcher
@@ -15,8 +15,7 @@ import tkinter as tk
 from tkinter import ttk
 import subprocess
 import os
-from pathlib import Path
-import json
+from cwt.core.preferences import RESTORE_ON_STARTUP, patch_profiles
 
 class ProfileTab(ttk.Frame):
     def __init__(self, master, advanced_mode):
@@ -85,36 +84,11 @@ class ProfileTab(ttk.Frame):
                 print(f"Error launching {profile}: {e}")
 
     def enable_restore_tabs(self):
-        profile_root = os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\User Data")
         selected_indices = self.listbox.curselection()
         selected_profiles = [self.listbox.get(i) for i in selected_indices]
-        patched = []
-
-        for profile in selected_profiles:
-            prefs_path = Path(profile_root) / profile / "Preferences"
-            if not prefs_path.exists():
-                continue
-
-            try:
-                # Backup
-                backup_path = prefs_path.with_suffix(".bak")
-                prefs_path.replace(backup_path)
-
-                with backup_path.open("r", encoding="utf-8") as f:
-                    prefs = json.load(f)
-
-                prefs.setdefault("session", {})
-                prefs["session"]["restore_on_startup"] = 1
-
-                with prefs_path.open("w", encoding="utf-8") as f:
-                    json.dump(prefs, f, indent=2)
-
-                patched.append(profile)
-
-            except Exception as e:
-                print(f"[!] Failed to patch {profile}: {e}")
+        result = patch_profiles(selected_profiles, [RESTORE_ON_STARTUP])
 
-        msg = f"[✓] Patched {len(patched)} profiles:\n" + ", ".join(patched)
+        msg = f"[✓] Patched {len(result['patched'])} profiles:\n" + ", ".join(result["patched"])
         print(msg)
 
     def _build_ui(self):
@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import subprocess
 
+from cwt.core.shortcuts import chrome_shortcut_spec, generate_shortcuts
 from cwt.utils.tooltip import ToolTip
 
 
@@ -80,25 +80,15 @@ class ShortcutTab(ttk.Frame):
             messagebox.showerror("Invalid Folder", f"Target folder does not exist:\n{target}")
             return
 
-        for profile in selections:
-            shortcut_name = f"Chrome - {profile}.lnk"
-            shortcut_path = os.path.join(target, shortcut_name)
-
-            cmd = [
-                "powershell", "-Command",
-                f"$s=(New-Object -COM WScript.Shell).CreateShortcut('{shortcut_path}');"
-                f"$s.TargetPath='{self.chrome_path}';"
-                f"$s.Arguments='--profile-directory=\"{profile}\"';"
-                f"$s.IconLocation='{self.chrome_path},0';"
-                "$s.Save()"
-            ]
+        specs = [chrome_shortcut_spec(self.chrome_path, profile, target) for profile in selections]
+        logger = print if self.advanced_mode.get() else (lambda msg: None)
+        result = generate_shortcuts(specs, logger=logger)
 
-            try:
-                subprocess.run(cmd, check=True)
-                if self.advanced_mode.get():
-                    print(f"[✓] Shortcut created: {shortcut_path}")
-            except subprocess.CalledProcessError:
-                print(f"[!] Failed to create shortcut for {profile}")
-                messagebox.showerror("Error", f"Failed to create shortcut for: {profile}")
+        if result["failed"]:
+            print(f"[!] Failed to create {len(result['failed'])} shortcut(s)")
+            messagebox.showerror("Error", "Failed to create shortcut(s):\n" + "\n".join(result["failed"]))
 
-        self.status_label.config(text=f"[✓] {len(selections)} shortcut(s) created in {target}")
+        self.status_label.config(
+            text=f"[✓] {len(result['created'])} shortcut(s) created, "
+                 f"{len(result['skipped'])} already up to date in {target}"
+        )
@@ -4,11 +4,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
 from datetime import datetime
-import json
 from cwt.utils.tooltip import ToolTip
-from cwt.utils.paths import get_snapshots_dir
+from cwt.utils.paths import get_snapshots_dir, list_collections, list_snapshots
 from cwt.core.snapshot_capture import capture_snapshot
-from cwt.core.restore import restore_windows
+from cwt.core.restore import restore_windows, undo_restore
+from cwt.core.snapshot_model import Snapshot, load_snapshot
+from cwt.core.snapshot_diff import diff_snapshots, format_diff
+from cwt.core.search_index import get_search_index
+from cwt.core.window_rules import load_rules
+from cwt.utils.get_all_visible_windows import get_all_visible_windows
 
 
 class SnapshotTab(ttk.Frame):
@@ -88,9 +92,32 @@ class SnapshotTab(ttk.Frame):
         restore_btn.pack(side="left")
         ToolTip(restore_btn, "Restore windows from the selected snapshot collection")
 
+        undo_btn = ttk.Button(restore_row, text="↩ Undo", command=self._handle_undo)
+        undo_btn.pack(side="left", padx=(5, 0))
+        ToolTip(undo_btn, "Put the windows the last restore moved back where they were")
+
+        compare_btn = ttk.Button(restore_row, text="🔍 Compare", command=self._handle_compare)
+        compare_btn.pack(side="left", padx=(5, 0))
+        ToolTip(compare_btn, "Show what changed between the selected collection's newest snapshot and the live desktop")
+
         ttk.Label(restore_frame, text="[ Select a Snapshot Collection ]", font=("Segoe UI", 8)).pack(
             anchor="w", padx=(153, 5), pady=(0, 10))
 
+        # --- Search Section ---
+        search_row = ttk.Frame(restore_frame)
+        search_row.pack(fill="x", padx=10, pady=(0, 10))
+
+        ttk.Label(search_row, text="Find Window:", style="Header.TLabel").pack(side="left", padx=(12, 33))
+        self.search_var = tk.StringVar(master=self)
+        search_entry = ttk.Entry(search_row, textvariable=self.search_var, width=33)
+        search_entry.pack(side="left", padx=(0, 10))
+        search_entry.bind("<Return>", lambda _e: self._handle_search())
+        ToolTip(search_entry, 'Search every snapshot, e.g.  obsidian desktop:5   or   "Clear Trend" exe:chrome')
+
+        search_btn = ttk.Button(search_row, text="🔎 Search", command=self._handle_search)
+        search_btn.pack(side="left")
+        ToolTip(search_btn, "Find the collections containing a window title, app, desktop or tab URL")
+
         # --- Metadata Section (always visible) ---
         self.meta_frame = ttk.LabelFrame(self, text="Snapshot Metadata", style="Bold.TLabelframe")
         self.meta_frame.pack(fill="x", padx=20, pady=(0, 5))
@@ -108,7 +135,7 @@ class SnapshotTab(ttk.Frame):
         self.debug_output.pack(fill="x", padx=20, pady=(0, 10))
 
     def _get_collections(self):
-        return sorted([f.name for f in self.snapshot_dir.iterdir() if f.is_dir()])
+        return list_collections()
 
     def _refresh_dropdowns(self):
         collections = self._get_collections()
@@ -148,26 +175,105 @@ class SnapshotTab(ttk.Frame):
             messagebox.showerror("Not Found", f"Snapshot folder '{name}' not found")
             return
 
-        snapshots = sorted(snap_dir.glob("snapshot_*.json"), reverse=True)
+        snapshots = list_snapshots(name)
         if not snapshots:
             messagebox.showwarning("No Snapshots", f"No snapshots found in '{name}'")
             return
 
         snapshot_path = snapshots[0]
-        restore_windows(str(snapshot_path), logger=self._log)
-
-        with open(snapshot_path, "r", encoding="utf-8") as f:
-            snapshot = json.load(f)
+        # Current desktop is restored before this returns; other desktops finish in the background
+        post_log = lambda msg: self.after(0, self._log, msg)
+        restore_windows(str(snapshot_path), logger=post_log, progress=self._on_restore_progress, background=True)
 
+        snapshot = load_snapshot(snapshot_path)
         self._show_metadata({
-            "collection_name": snapshot.get("collection_name") or snapshot.get("workspace", name),
-            "collection_id":   snapshot.get("collection_id"),
-            "captured_at":     snapshot.get("captured_at"),
-            "desktop_count":   len(snapshot.get("desktops", {})),
-            "desktop_names":   list(snapshot.get("desktops", {}).values()),
+            "collection_name": snapshot.collection_name,
+            "collection_id":   snapshot.collection_id,
+            "captured_at":     snapshot.captured_at_display,
+            "desktop_count":   len(snapshot.desktops),
+            "desktop_names":   list(snapshot.desktops.values()),
             "snapshot_file":   snapshot_path.name
         })
 
+    def _handle_undo(self):
+        result = undo_restore(logger=self._log)
+        if not result.get("undone"):
+            messagebox.showinfo("Nothing to Undo", "No restore has been recorded yet")
+
+    def _on_restore_progress(self, event):
+        if event.get("stage") == "complete":
+            msg = f"[✓] Restore complete — {event['restored']} window(s) across {event['desktops_done']} desktop(s)"
+        else:
+            msg = f"[…] Desktop {event['desktop']} restored ({event['desktops_done']}/{event['desktops_total']})"
+        self.after(0, self._log, msg)
+
+    def _handle_compare(self):
+        name = self.restore_var.get().strip()
+        if not name:
+            messagebox.showwarning("No Selection", "Please select a collection to compare")
+            return
+
+        snapshots = list_snapshots(name)
+        if not snapshots:
+            messagebox.showwarning("No Snapshots", f"No snapshots found in '{name}'")
+            return
+
+        snapshot = load_snapshot(snapshots[0])
+        live = Snapshot(snapshot.collection_name, "live", None, desktops=snapshot.desktops,
+                        windows=get_all_visible_windows(rules=load_rules(logger=self._log)))
+        result = diff_snapshots(snapshot, live)
+
+        for line in format_diff(result):
+            self._log(line)
+        s = result["summary"]
+        messagebox.showinfo(
+            "Snapshot vs Live",
+            f"{snapshots[0].name} → live desktop\n\n"
+            f"Added: {s['added']}   Removed: {s['removed']}\n"
+            f"Moved: {s['moved']}   Retitled: {s['retitled']}\n"
+            f"Desktop changes: {s['desktop_changes']}   Unchanged: {s['unchanged']}"
+        )
+
+    def _handle_search(self):
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        index = get_search_index(logger=self._log)
+        index.refresh()
+        try:
+            hits = index.search(query, limit=200)
+        except ValueError as e:
+            messagebox.showwarning("Search", str(e))
+            return
+        if not hits:
+            messagebox.showinfo("Search", f"No snapshots match '{query}'")
+            return
+
+        results = tk.Toplevel(self)
+        results.title(f"Search: {query}")
+        columns = ("collection", "captured_at", "desktop", "exe", "title")
+        tree = ttk.Treeview(results, columns=columns, show="headings", height=15)
+        for col, width in zip(columns, (140, 130, 120, 110, 320)):
+            tree.heading(col, text=col.replace("_", " ").title())
+            tree.column(col, width=width, anchor="w")
+        for hit in hits:
+            tree.insert("", tk.END, values=tuple(hit[c] or "" for c in columns))
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+        ttk.Label(results, text="Double-click a row to select its collection for restore",
+                  font=("Segoe UI", 8)).pack(anchor="w", padx=10, pady=(0, 10))
+
+        def select(_event):
+            item = tree.focus()
+            if not item:
+                return
+            collection = tree.item(item, "values")[0]
+            if collection in self._get_collections():
+                self.restore_var.set(collection)
+                results.destroy()
+
+        tree.bind("<Double-1>", select)
+        self._log(f"[✓] {len(hits)} match(es) for '{query}'")
+
     def _log(self, msg):
         if not self.advanced_mode.get():
             return
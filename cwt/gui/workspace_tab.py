@@ -4,10 +4,11 @@ import uuid
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
-import json
 from cwt.utils.tooltip import ToolTip
 from cwt.utils.paths import get_workspaces_dir
-from cwt.utils.vda_utils import get_virtual_desktop_id_map
+from cwt.core.snapshot_model import Workspace, load_workspace, save_workspace
+from cwt.core.search_index import index_quietly
+from cwt.utils.vda_utils import DesktopManager, get_virtual_desktop_id_map
 from datetime import datetime
 
 class WorkspaceTab(ttk.Frame):
@@ -109,30 +110,23 @@ class WorkspaceTab(ttk.Frame):
                 return
 
         # Capture live desktop layout
-        desktop_map = get_virtual_desktop_id_map()
-        workspace_id = str(uuid.uuid4())
-        created_at = datetime.now().strftime("%d-%b-%Y %H:%M")
-
-        data = {
-            "format_version": "1.0",
-            "workspace_name": name,
-            "workspace_id": workspace_id,
-            "created_at": created_at,
-            "desktops": {str(k): v for k, v in desktop_map.items()},
-            "collections": []
-        }
-
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        workspace = Workspace(
+            workspace_name=name,
+            workspace_id=str(uuid.uuid4()),
+            created_at=datetime.now().replace(second=0, microsecond=0),
+            desktops=get_virtual_desktop_id_map()
+        )
 
         if not self.capture_only.get():
             # Also trigger a snapshot collection under the same name
             from cwt.core.snapshot_capture import capture_snapshot
             capture_snapshot(collection_name=name)
-            data["collections"].append(name)
+            workspace.collections.append(name)
 
+        save_workspace(workspace, path)
+        index_quietly("workspace", path, workspace)
         self._refresh_workspace_list()
-        self._show_metadata(data)
+        self._show_metadata(workspace.to_dict())
         messagebox.showinfo("Workspace Created", f"Workspace '{name}' has been saved.")
 
     def _load_workspace(self, event):
@@ -142,9 +136,7 @@ class WorkspaceTab(ttk.Frame):
         path = self.workspace_dir / f"{selected}.json"
         if not path.exists():
             return
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        self._show_metadata(data)
+        self._show_metadata(load_workspace(path).to_dict())
 
     def _show_metadata(self, data: dict):
         desktops = data.get("desktops", {})
@@ -170,6 +162,10 @@ class WorkspaceTab(ttk.Frame):
         # Restore wiring — to be implemented when Workspace orchestration is built
         print(f"[DEBUG] Restoring '{selected}' → Apps: {restore_apps}, Schema: {restore_schema}")
 
+        if restore_schema:
+            workspace = load_workspace(self.workspace_dir / f"{selected}.json")
+            DesktopManager().provision(workspace.desktops)
+
     def _refresh_workspace_list(self):
         files = sorted(self.workspace_dir.glob("*.json"))
         names = [f.stem for f in files]
@@ -0,0 +1,148 @@
+# plugins/chromium.py
+
+"""
+Chromium capture enricher (Chrome, Edge, Brave, Vivaldi): the profile each
+window belongs to and, when the browser exposes it, the active tab's URL.
+
+All windows of a browser share one process, so the --profile-directory on
+its command line is only the profile it was launched with ("launch_profile").
+A window's own profile comes from its AppUserModelID, which Chromium sets
+per profile; its display name from the user data dir's "Local State". When
+the ID can't be read (no pywin32) the window gets no "profile".
+
+Tab URLs need the browser to have been started with --remote-debugging-port:
+the DevTools target list is read once per browser and the tab whose title
+the window shows is the active one.
+"""
+
+import json
+import os
+import urllib.request
+from pathlib import Path, PureWindowsPath
+
+from cwt.core.capture_enrichers import Enricher
+from cwt.utils.process_inventory import CHROMIUM_EXES, chromium_profile
+
+USER_DATA = {
+    "chrome.exe": r"%LOCALAPPDATA%\Google\Chrome\User Data",
+    "msedge.exe": r"%LOCALAPPDATA%\Microsoft\Edge\User Data",
+    "brave.exe": r"%LOCALAPPDATA%\BraveSoftware\Brave-Browser\User Data",
+    "vivaldi.exe": r"%LOCALAPPDATA%\Vivaldi\User Data",
+    "chromium.exe": r"%LOCALAPPDATA%\Chromium\User Data",
+}
+SUFFIXES = (" - Google Chrome", " - Microsoft​ Edge", " - Microsoft Edge", " - Brave", " - Vivaldi", " - Chromium")
+DEVTOOLS_TIMEOUT = 0.3
+
+
+def _flag(cmdline, name) -> str:
+    prefix = f"--{name}="
+    return next((arg[len(prefix):].strip('"') for arg in cmdline if arg.startswith(prefix)), "")
+
+
+def tab_title(window_title) -> str:
+    """The active tab's title: the window title without the browser suffix."""
+    for suffix in SUFFIXES:
+        head, sep, _ = window_title.rpartition(suffix)
+        if sep:
+            return head
+    return window_title
+
+
+def window_app_id(hwnd) -> str:
+    """The window's AppUserModelID, or "" when it has none or pywin32 is missing."""
+    try:
+        from win32com.propsys import propsys, pscon
+        store = propsys.SHGetPropertyStoreForWindow(hwnd, propsys.IID_IPropertyStore)
+        return store.GetValue(pscon.PKEY_AppUserModel_ID).GetValue() or ""
+    except Exception:
+        return ""
+
+
+def _id_part(text) -> str:
+    return "".join(c for c in text if c == "." or (c.isascii() and c.isalnum()))
+
+
+def profile_from_app_id(app_id, user_data, profiles) -> str:
+    """
+    The profile directory an AppUserModelID names. Chromium uses the bare app
+    name ("Chrome") for the default profile of the default user data dir, and
+    "<app>.<user data dir name>.<profile dir>" — keeping only ASCII letters,
+    digits and dots — for every other profile.
+    """
+    if not app_id:
+        return ""
+    if "." not in app_id:
+        return "Default"
+    for directory in profiles:
+        if app_id.endswith("." + _id_part(f"{PureWindowsPath(user_data).name}.{directory}")):
+            return directory
+    return ""
+
+
+def profile_names(user_data) -> dict:
+    """{profile directory: display name} from Local State."""
+    try:
+        state = json.loads((Path(user_data) / "Local State").read_text(encoding="utf-8"))
+        return {d: info.get("name", d) for d, info in state["profile"]["info_cache"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def devtools_tabs(port) -> list:
+    """[(title, url)] of the page targets a browser with --remote-debugging-port=port has open."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=DEVTOOLS_TIMEOUT) as response:
+            targets = json.load(response)
+    except (OSError, ValueError):
+        return []
+    return [(t.get("title", ""), t.get("url", "")) for t in targets if t.get("type") == "page"]
+
+
+class ChromiumEnricher(Enricher):
+    name = "chromium"
+    exes = set(CHROMIUM_EXES)
+
+    def enrich(self, windows):
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()        # worker thread: the property store is a COM object
+        except ImportError:
+            pythoncom = None
+        try:
+            return self._enrich(windows)
+        finally:
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def _enrich(self, windows):
+        names, tabs = {}, {}
+        results = {}
+        for window in windows:
+            user_data = _flag(window.cmdline, "user-data-dir") or os.path.expandvars(
+                USER_DATA.get(window.exe.lower(), USER_DATA["chrome.exe"]))
+            if user_data not in names:
+                names[user_data] = profile_names(user_data)
+            data = {"user_data_dir": user_data,
+                    "launch_profile": chromium_profile(window.exe, window.cmdline) or "Default"}
+            profile = profile_from_app_id(window_app_id(window.hwnd), user_data, names[user_data])
+            if profile:
+                data["profile"] = profile
+                if profile in names[user_data]:
+                    data["profile_name"] = names[user_data][profile]
+
+            port = _flag(window.cmdline, "remote-debugging-port")
+            if port:
+                if port not in tabs:
+                    tabs[port] = devtools_tabs(port)
+                active = tab_title(window.title)
+                # Edge and Brave put the profile name before the browser name ("Tab - Work - Microsoft Edge")
+                url = next((url for title, url in tabs[port]
+                            if title and (active == title or active.startswith(f"{title} - "))), "")
+                if url:
+                    data["active_url"] = url
+                    data["urls"] = [url]
+            results[window.hwnd] = data
+        return results
+
+
+ENRICHERS = [ChromiumEnricher]
@@ -0,0 +1,56 @@
+# plugins/explorer.py
+
+"""
+File Explorer capture enricher: the folder each Explorer window shows.
+
+Shell.Application's window list has one entry per Explorer tab with the
+top-level hwnd it lives in, so a single COM walk covers every window.
+Windows 11 tabbed windows report all their folders under "tabs".
+Needs pywin32; without it (or outside Windows) nothing is added.
+"""
+
+from cwt.core.capture_enrichers import Enricher
+
+EXPLORER_CLASSES = {"CabinetWClass", "ExploreWClass"}
+
+
+def shell_folders() -> dict:
+    """{hwnd: [folder path, ...]} for every open Explorer window."""
+    try:
+        import pythoncom
+        import win32com.client
+    except ImportError:
+        return {}
+    pythoncom.CoInitialize()        # worker thread: COM isn't initialized here yet
+    try:
+        folders = {}
+        for item in win32com.client.Dispatch("Shell.Application").Windows():
+            try:
+                path = item.Document.Folder.Self.Path
+                folders.setdefault(int(item.HWND), []).append(path)
+            except Exception:
+                continue            # Internet Explorer windows, or a tab closing mid-walk
+        return folders
+    finally:
+        pythoncom.CoUninitialize()
+
+
+class ExplorerEnricher(Enricher):
+    name = "explorer"
+    exes = {"explorer.exe"}
+
+    def handles(self, window):
+        # explorer.exe also owns the taskbar and desktop; only folder windows have a path
+        return super().handles(window) and (not window.class_name or window.class_name in EXPLORER_CLASSES)
+
+    def enrich(self, windows):
+        folders = shell_folders()
+        results = {}
+        for window in windows:
+            paths = folders.get(window.hwnd)
+            if paths:
+                results[window.hwnd] = {"path": paths[0], **({"tabs": paths} if len(paths) > 1 else {})}
+        return results
+
+
+ENRICHERS = [ExplorerEnricher]
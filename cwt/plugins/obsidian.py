@@ -0,0 +1,60 @@
+# plugins/obsidian.py
+
+"""
+Obsidian capture enricher: the vault (and note) each window shows.
+
+Titles read "Note - Vault - Obsidian v1.5.3"; the vault's path comes from
+Obsidian's vault list in %APPDATA%/obsidian/obsidian.json. The obsidian://
+URI opens the same vault again on restore.
+"""
+
+import json
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from cwt.core.capture_enrichers import Enricher
+
+
+def parse_title(title) -> tuple:
+    """(note, vault) from an Obsidian window title, or ("", "") when it isn't one."""
+    parts = [p.strip() for p in title.split(" - ")]
+    if len(parts) < 2 or not parts[-1].startswith("Obsidian"):
+        return "", ""
+    return " - ".join(parts[:-2]), parts[-2]
+
+
+def vault_paths() -> dict:
+    """{vault folder name: path} from obsidian.json."""
+    config = Path(os.environ.get("APPDATA", "")) / "obsidian" / "obsidian.json"
+    try:
+        vaults = json.loads(config.read_text(encoding="utf-8")).get("vaults", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return {Path(v["path"]).name: v["path"] for v in vaults.values() if isinstance(v, dict) and v.get("path")}
+
+
+class ObsidianEnricher(Enricher):
+    name = "obsidian"
+    exes = {"obsidian.exe"}
+
+    def enrich(self, windows):
+        paths = None
+        results = {}
+        for window in windows:
+            note, vault = parse_title(window.title)
+            if not vault:
+                continue
+            if paths is None:
+                paths = vault_paths()
+            data = {"vault": vault, "uri": f"obsidian://open?vault={quote(vault)}"}
+            if note:
+                data["note"] = note
+                data["uri"] += f"&file={quote(note)}"
+            if vault in paths:
+                data["vault_path"] = paths[vault]
+            results[window.hwnd] = data
+        return results
+
+
+ENRICHERS = [ObsidianEnricher]
@@ -0,0 +1,88 @@
+# plugins/vscode.py
+
+"""
+VS Code capture enricher: the folder (or .code-workspace) each window has open.
+
+The window title carries the folder's name ("file.py - my-project - Visual
+Studio Code"); the full path comes from VS Code's own record of open and
+recent folders — globalStorage/storage.json (windowsState) and the
+history.recentlyOpenedPathsList entry of globalStorage/state.vscdb.
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from cwt.core.capture_enrichers import Enricher
+
+USER_DIRS = {"code.exe": "Code", "code - insiders.exe": "Code - Insiders", "vscodium.exe": "VSCodium"}
+
+
+def _uri_to_path(uri) -> str:
+    parsed = urlparse(uri or "")
+    if parsed.scheme != "file":
+        return ""
+    path = unquote(parsed.path)
+    if len(path) > 2 and path[0] == "/" and path[2] == ":":     # /c:/Users/... → c:/Users/...
+        path = path[1:]
+    return str(Path(path))
+
+
+def root_name(title) -> str:
+    """The folder/workspace part of a VS Code title, or ""."""
+    parts = [p.strip() for p in title.split(" - ")]
+    if len(parts) < 2 or not (parts[-1].startswith("Visual Studio Code") or parts[-1] == "VSCodium"):
+        return ""
+    root = parts[-2]
+    return root.removesuffix(" (Workspace)")
+
+
+def known_folders(user_dir) -> list:
+    """Folder and workspace paths VS Code has open or opened recently, open windows first."""
+    storage = Path(user_dir) / "User" / "globalStorage"
+    uris = []
+    try:
+        state = json.loads((storage / "storage.json").read_text(encoding="utf-8")).get("windowsState", {})
+        for window in [state.get("lastActiveWindow") or {}, *state.get("openedWindows", [])]:
+            uris.append(window.get("folder") or (window.get("workspaceIdentifier") or {}).get("configURIPath"))
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        conn = sqlite3.connect(f"file:{storage / 'state.vscdb'}?mode=ro", uri=True, timeout=0.2)
+        try:
+            row = conn.execute("SELECT value FROM ItemTable WHERE key = 'history.recentlyOpenedPathsList'").fetchone()
+        finally:
+            conn.close()
+        for entry in json.loads(row[0]).get("entries", []) if row else ():
+            uris.append(entry.get("folderUri") or (entry.get("workspace") or {}).get("configPath"))
+    except (sqlite3.Error, ValueError, AttributeError):
+        pass
+    return list(dict.fromkeys(p for p in map(_uri_to_path, uris) if p))
+
+
+class VSCodeEnricher(Enricher):
+    name = "vscode"
+    exes = set(USER_DIRS)
+
+    def enrich(self, windows):
+        folders = {}
+        results = {}
+        for window in windows:
+            root = root_name(window.title)
+            if not root:
+                continue
+            user_dir = USER_DIRS.get(window.exe.lower(), "Code")
+            if user_dir not in folders:
+                folders[user_dir] = known_folders(Path(os.environ.get("APPDATA", "")) / user_dir)
+            path = next((p for p in folders[user_dir]
+                         if Path(p).name == root or Path(p).stem == root), "")
+            data = {"root_name": root}
+            if path:
+                data["workspace" if path.endswith(".code-workspace") else "folder"] = path
+            results[window.hwnd] = data
+        return results
+
+
+ENRICHERS = [VSCodeEnricher]
@@ -1,43 +1,23 @@
-import os
-import json
-from pathlib import Path
+from cwt.core.preferences import RESTORE_ON_STARTUP, get_preferences_path, patch_preferences_file
 
 def patch_restore_on_startup(profile_name):
-    user_data = os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\User Data")
-    prefs_path = Path(user_data) / profile_name / "Preferences"
+    prefs_path = get_preferences_path(profile_name)
 
     if not prefs_path.exists():
         print(f"[!] Preferences not found for profile: {profile_name}")
         return
 
-    # Backup before modifying
-    backup_path = prefs_path.with_suffix(".bak")
-    prefs_path.replace(backup_path)
-    print(f"[+] Backup created: {backup_path}")
+    print(f"[DEBUG] Patching: {prefs_path}")
 
-    # Read original (ugly, one-liner JSON)
+    # Backup, parse, patch and atomic replace — the original is untouched on failure
     try:
-        with backup_path.open("r", encoding="utf-8") as f:
-            prefs = json.load(f)
+        status = patch_preferences_file(prefs_path, [RESTORE_ON_STARTUP])
     except Exception as e:
-        print(f"[!] Failed to parse JSON: {e}")
+        print(f"[!] Failed to patch prefs: {e}")
         return
 
-    # Inject or update the setting
-    prefs.setdefault("session", {})
-    prefs["session"]["restore_on_startup"] = 1
-
-    # Write back with pretty formatting
-    print(f"[DEBUG] Patching: {prefs_path}")
-    print(f"[DEBUG] Current session settings: {prefs.get('session', {})}")
-
-    try:
-        with prefs_path.open("w", encoding="utf-8") as f:
-            json.dump(prefs, f, indent=2)
-
-        print(f"[DEBUG] New session settings: {prefs['session']}")
-        print("[DEBUG] Write complete.")
+    if status == "unchanged":
+        print(f"[✓] Profile '{profile_name}' already restores tabs on startup.")
+    else:
+        print(f"[+] Backup created: {prefs_path.with_suffix('.bak')}")
         print(f"[✓] Patched profile '{profile_name}' to restore tabs on startup.")
-
-    except Exception as e:
-        print(f"[!] Failed to write modified prefs: {e}")
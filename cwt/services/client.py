@@ -0,0 +1,45 @@
+# services/client.py
+
+"""
+Thin client for the local CWT service (see services/daemon.py).
+
+Only the standard library is imported, so a hotkey or script that calls
+send_request() pays no pywin32/pyvda start-up cost.
+"""
+
+import json
+import socket
+
+from cwt.services.daemon import DEFAULT_HOST, DEFAULT_PORT
+
+
+class ServiceUnavailable(ConnectionError):
+    """Raised when no CWT service is listening."""
+
+
+def send_request(cmd, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30.0, **args):
+    """
+    Sends one request to the CWT service and returns its decoded response.
+
+    Args:
+        cmd (str): Command name — ping, list, capture, restore, undo, switch, invalidate or shutdown.
+        host (str): Service host (localhost only).
+        port (int): Service port.
+        timeout (float): Socket timeout in seconds.
+        **args: Command arguments, e.g. collection="Morning".
+
+    Returns:
+        dict: {"ok": bool, "result" | "error": ..., "elapsed_ms": float}
+    """
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError as e:
+        raise ServiceUnavailable(f"CWT service not reachable on {host}:{port}: {e}")
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps({"cmd": cmd, "args": args}) + "\n").encode("utf-8"))
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise ServiceUnavailable("CWT service closed the connection without replying")
+    return json.loads(line)
@@ -0,0 +1,326 @@
+# services/daemon.py
+
+"""
+Module: daemon.py
+Part of: Chrome Workspace Toolkit (CWT)
+
+Description:
+    Long-lived local CWT service. Keeps the pywin32/pyvda backend imported,
+    holds a warm desktop map and window list, and answers capture / restore /
+    undo / switch / list requests from thin clients (hotkeys, scripts, `cwt --daemon ...`)
+    over a localhost TCP socket, so a "switch to workspace X" request skips
+    interpreter start-up, imports and desktop enumeration.
+
+    Protocol: one JSON object per line in each direction.
+        → {"cmd": "restore", "args": {"collection": "Morning"}}
+        ← {"ok": true, "result": {...}, "elapsed_ms": 18.4}
+
+    The socket is bound to 127.0.0.1 only.
+
+    python -m cwt.services.daemon [--port N] [--simulate]
+"""
+
+import argparse
+import json
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47615
+
+
+class LocalBackend:
+    """
+    Windows backend kept warm between requests.
+
+    Window state comes from a live WindowStateCache fed by WinEvent hooks.
+    If the hook can't be installed, the desktop map and enumerated window
+    list are instead cached for `cache_ttl` seconds and dropped after any
+    operation that moves windows.
+
+    Snapshot maintenance (core.snapshot_gc) runs on a background thread
+    every `gc_interval` seconds once the user has configured a retention
+    policy (storage/retention.json); pass None to disable it.
+    """
+
+    def __init__(self, logger=print, cache_ttl=5.0, live_cache=True, gc_interval=3600.0, submit=None):
+        from cwt.core import restore, snapshot_capture
+        from cwt.utils import paths
+        from cwt.utils.vda_utils import DesktopManager
+        from cwt.core.window_rules import load_rules
+
+        self._restore = restore
+        self._capture = snapshot_capture
+        self._paths = paths
+        self._DesktopManager = DesktopManager
+        self.logger = logger
+        self.submit = submit        # the COM worker's submit; lazy restores run their later desktops on it
+        self.rules = load_rules(logger=logger)
+        self.cache_ttl = cache_ttl
+        self._desktops = None
+        self._windows = None
+        self._cached_at = 0.0
+        self.window_cache = None
+        self._event_source = None
+        if live_cache:
+            try:
+                from cwt.core.window_cache import start_live_cache
+                self.window_cache, self._event_source = start_live_cache(rules=self.rules, logger=logger)
+            except Exception as e:
+                logger(f"[!] Live window cache unavailable, falling back to TTL cache: {e}")
+        self.gc = None
+        if gc_interval:
+            from cwt.core.snapshot_gc import POLICY_FILE, SnapshotGC
+            if POLICY_FILE.is_file():
+                self.gc = SnapshotGC(logger=logger).start_background(interval=gc_interval)
+            else:
+                logger(f"[🧹] Background snapshot GC off — no retention policy at {POLICY_FILE}")
+
+    def invalidate(self, plans=False):
+        self._desktops = None
+        self._windows = None
+        if self.window_cache is not None:
+            self.window_cache.desktops.refresh()
+        if plans:
+            from cwt.core.restore_plan_cache import get_plan_cache
+            get_plan_cache().invalidate()
+
+    def _warm_state(self):
+        if self.window_cache is not None:
+            return self.window_cache.desktops, self.window_cache.windows()
+        stale = time.monotonic() - self._cached_at > self.cache_ttl
+        if self._desktops is None or stale:
+            self._desktops = self._DesktopManager(logger=self.logger)
+            self._windows = None
+        if self._windows is None:
+            self._windows = self._restore.get_all_visible_windows(self._desktops, self.rules)
+            self._cached_at = time.monotonic()
+        return self._desktops, self._windows
+
+    # Names and paths below come off the socket: every one is confined to the snapshots folder
+
+    def resolve_snapshot(self, ref):
+        return self._paths.resolve_snapshot_ref(ref)
+
+    def list(self, collection=None):
+        if collection:
+            folder = self._paths.collection_dir(collection)
+            files = self._paths.find_snapshot_files(folder) if folder.is_dir() else []
+            return {"collection": collection, "snapshots": [str(p) for p in files]}
+        return {"collections": self._paths.list_collections()}
+
+    def capture(self, collection_name="Unnamed Collection", chrome_only=False, app_only=False):
+        self._paths.collection_dir(collection_name)
+        meta = {}
+        path = self._capture.capture_snapshot(
+            collection_name=collection_name,
+            logger=self.logger,
+            gui_callback=meta.update,
+            chrome_only=chrome_only,
+            app_only=app_only,
+            window_cache=self.window_cache
+        )
+        meta["snapshot_file"] = path
+        return meta
+
+    def restore(self, snapshot_path, threshold=None, return_to_origin=True, matcher="fuzzy", lazy=False,
+                relaunch=False):
+        desktops, windows = self._warm_state()
+        try:
+            return self._restore.restore_windows(
+                str(snapshot_path),
+                threshold=threshold,
+                return_to_origin=return_to_origin,
+                logger=self.logger,
+                desktops=desktops,
+                current_windows=windows,
+                window_cache=self.window_cache,
+                rules=self.rules,
+                matcher=matcher,
+                lazy=lazy,
+                relaunch=relaunch,
+                submit=self.submit
+            )
+        finally:
+            # Windows have moved between desktops — the next request re-reads them
+            self.invalidate()
+
+
+    def undo(self):
+        desktops, _ = self._warm_state()
+        try:
+            return self._restore.undo_restore(logger=self.logger, desktops=desktops)
+        finally:
+            self.invalidate()
+
+    def switch(self, name, snapshot_path=None, park="minimize"):
+        from cwt.core.workspace_switcher import get_workspace_switcher
+        self._paths.collection_dir(name)
+        if snapshot_path is not None:
+            snapshot_path = self._paths.snapshot_in_root(snapshot_path)
+        desktops, _ = self._warm_state()
+        switcher = get_workspace_switcher(desktops, self.window_cache, park=park, logger=self.logger)
+        switcher.backend.desktops = desktops
+        switcher.backend.restore_kwargs["rules"] = self.rules
+        try:
+            return switcher.switch(name, snapshot_path)
+        finally:
+            self.invalidate()
+
+
+def _co_initialize():
+    try:
+        import comtypes         # pyvda's COM calls need an initialized apartment per thread
+        comtypes.CoInitialize()
+    except Exception:
+        pass
+
+
+def com_worker():
+    """The single COM-initialized thread every backend call runs on."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="cwt-backend", initializer=_co_initialize)
+
+
+class CWTService:
+    """
+    Dispatches decoded requests to a backend, one window operation at a time.
+
+    Request threads never touch the backend themselves: every handler runs on
+    one COM-initialized worker thread, which also serializes them.
+    """
+
+    def __init__(self, backend, logger=print, worker=None):
+        self.backend = backend
+        self.logger = logger
+        self.worker = worker or com_worker()
+        self.handlers = {
+            "ping": self._ping,
+            "list": self._list,
+            "capture": self._capture,
+            "restore": self._restore,
+            "undo": self._undo,
+            "switch": self._switch,
+            "invalidate": self._invalidate,
+        }
+
+    def dispatch(self, request):
+        start = time.perf_counter()
+        cmd = request.get("cmd")
+        handler = self.handlers.get(cmd)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {cmd}"}
+        try:
+            result = self.worker.submit(handler, **(request.get("args") or {})).result()
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            self.logger(f"[!] {cmd} failed: {e}")
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return response
+
+    def _ping(self):
+        return {"pong": True, "backend": type(self.backend).__name__}
+
+    def _list(self, collection=None):
+        return self.backend.list(collection)
+
+    def _capture(self, collection_name="Unnamed Collection", chrome_only=False, app_only=False):
+        result = self.backend.capture(collection_name, chrome_only=chrome_only, app_only=app_only)
+        self.backend.invalidate()
+        return result
+
+    def _restore(self, collection=None, snapshot=None, threshold=None, return_to_origin=True, matcher="fuzzy",
+                 lazy=False, relaunch=False):
+        path = self.backend.resolve_snapshot(snapshot or collection or "")
+        if path is None:
+            raise FileNotFoundError(f"No snapshot found for '{snapshot or collection}'")
+        return self.backend.restore(path, threshold=threshold, return_to_origin=return_to_origin, matcher=matcher,
+                                    lazy=lazy, relaunch=relaunch)
+
+    def _undo(self):
+        return self.backend.undo()
+
+    def _switch(self, collection, snapshot=None, park="minimize"):
+        return self.backend.switch(collection, snapshot, park=park)
+
+    def _invalidate(self):
+        # An explicit request also drops compiled restore plans; the implicit
+        # invalidation after capture / restore keeps them (their keys already
+        # change when the live layout does).
+        self.backend.invalidate(plans=True)
+        return {"invalidated": True}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"ok": False, "error": f"Bad request: {e}"}
+            else:
+                if request.get("cmd") == "shutdown":
+                    self._send({"ok": True, "result": {"shutdown": True}})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                response = self.server.service.dispatch(request)
+            self._send(response)
+
+    def _send(self, response):
+        self.wfile.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class CWTServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        super().__init__((host, port), _RequestHandler)
+        self.service = service
+
+
+def serve(backend=None, host=DEFAULT_HOST, port=DEFAULT_PORT, logger=print):
+    """
+    Starts the service and blocks until a client sends `shutdown`.
+
+    `backend` is a backend instance, or a backend class (default LocalBackend)
+    to build on the COM worker — so its desktop and window-cache COM objects
+    live in the apartment every later call runs in. A built backend also gets
+    the worker's submit, for work it schedules later (lazy desktops).
+    """
+    worker = com_worker()
+    if backend is None or isinstance(backend, type):
+        backend = worker.submit(backend or LocalBackend, logger=logger, submit=worker.submit).result()
+    service = CWTService(backend, logger=logger, worker=worker)
+    try:
+        with CWTServer(service, host, port) as server:
+            logger(f"[🛰️] CWT service listening on {host}:{server.server_address[1]} "
+                   f"({type(service.backend).__name__})")
+            server.serve_forever()
+    finally:
+        worker.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cwt-daemon", description="Run the local CWT restore service")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--simulate", metavar="DIR", help="Serve the in-memory simulator, storing snapshots in DIR")
+    args = parser.parse_args(argv)
+
+    logger = lambda msg: print(msg, file=sys.stderr)
+    backend = None
+    if args.simulate:
+        from cwt.services.simulator import SimulatedBackend
+        backend = SimulatedBackend(args.simulate, logger=logger)
+    serve(backend, port=args.port, logger=logger)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
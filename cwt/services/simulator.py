@@ -0,0 +1,231 @@
+# services/simulator.py
+
+"""
+In-memory stand-in for the Windows backend.
+
+SimulatedBackend answers the same capture/restore/undo/switch/list calls as
+the daemon's LocalBackend, but keeps its windows and desktops in plain Python
+objects. It lets the service, client and CLI be exercised on Linux (or in CI)
+with no pywin32/pyvda installed.
+
+Undo and switching run the real logic — restore checkpoints
+(core/restore_checkpoint.py) and WorkspaceSwitcher — over the simulated
+window list; their state files live in the snapshots folder.
+"""
+
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from cwt.core.restore_checkpoint import CheckpointStack, take_checkpoint, undo_ops
+from cwt.core.restore_scheduler import RestoreOp
+from cwt.core.snapshot_model import Snapshot, WindowRecord, load_snapshot, save_snapshot
+from cwt.core.workspace_switcher import HOLDING_DESKTOP, WorkspaceSwitcher
+from cwt.utils.paths import collection_dir, find_snapshot_files, resolve_snapshot_ref, snapshot_in_root
+
+
+class SimulatedBackend:
+    def __init__(self, snapshots_dir, windows=None, desktops=None, logger=print):
+        """
+        Args:
+            snapshots_dir (Path): Root folder for simulated snapshot collections.
+            windows (list): Initial window dicts (same keys as get_all_visible_windows()).
+            desktops (dict): Initial {desktop_number: name} table.
+            logger (Callable): Logging function for status messages.
+        """
+        self.snapshots_dir = Path(snapshots_dir)
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        self.windows = [dict(w) for w in (windows or [])]
+        self.desktops = {int(k): v for k, v in (desktops or {1: "Desktop #1"}).items()}
+        self.current_desktop = 1
+        self.logger = logger
+        self._next_hwnd = max((w.get("hwnd", 0) for w in self.windows), default=1000) + 1
+        self._lock = threading.RLock()
+        self.checkpoints = CheckpointStack(self.snapshots_dir / ".restore_checkpoints.json", logger=logger)
+        self._switcher = None
+
+    # ── Simulated desktop manipulation ──────────────────────────────────────
+
+    def open_window(self, title, exe, x=0, y=0, width=800, height=600, desktop_number=1):
+        with self._lock:
+            hwnd = self._next_hwnd
+            self._next_hwnd += 1
+            self.windows.append({
+                "hwnd": hwnd, "title": title, "exe": exe,
+                "x": x, "y": y, "width": width, "height": height,
+                "desktop_number": desktop_number,
+                "desktop_name": self.desktops.get(desktop_number, "Unknown"),
+            })
+            return hwnd
+
+    def close_window(self, hwnd):
+        with self._lock:
+            self.windows = [w for w in self.windows if w["hwnd"] != hwnd]
+
+    def enumerate(self):
+        with self._lock:
+            return [dict(w) for w in self.windows]
+
+    def _window(self, hwnd):
+        return next((w for w in self.windows if w["hwnd"] == hwnd), None)
+
+    def alive(self, window):
+        """True while window.hwnd is open and still belongs to the same exe (the simulator's window class)."""
+        with self._lock:
+            live = self._window(window.hwnd)
+            return live is not None and live["exe"].lower() == window.exe.lower()
+
+    def read_layout(self, hwnds):
+        """Same shape as restore.read_window_layout(); simulated desktops have no GUIDs."""
+        with self._lock:
+            return {w["hwnd"]: (w["x"], w["y"], w["width"], w["height"], z, None, w.get("desktop_number"),
+                                bool(w.get("minimized")))
+                    for z, w in enumerate(self.windows) if w["hwnd"] in set(hwnds)}
+
+    def apply(self, ops, minimize=False):
+        """Places ops' windows (rect and desktop); returns how many were still open."""
+        placed = 0
+        with self._lock:
+            for op in ops:
+                live = self._window(op.hwnd)
+                if live is None:
+                    continue
+                live.update(zip(("x", "y", "width", "height"), op.rect))
+                if op.desktop_number is not None:
+                    live["desktop_number"] = op.desktop_number
+                    live["desktop_name"] = self.desktops.get(op.desktop_number, "Unknown")
+                live["minimized"] = minimize
+                placed += 1
+        return placed
+
+    # ── Backend API ──────────────────────────────────────────────────────────
+
+    def list(self, collection=None):
+        if collection:
+            snap_dir = collection_dir(collection, self.snapshots_dir)
+            files = find_snapshot_files(snap_dir) if snap_dir.is_dir() else []
+            return {"collection": collection, "snapshots": [str(p) for p in files]}
+        return {"collections": sorted(p.name for p in self.snapshots_dir.iterdir() if p.is_dir() and not p.name.startswith("."))}
+
+    def resolve_snapshot(self, ref):
+        return resolve_snapshot_ref(ref, self.snapshots_dir)
+
+    def capture(self, collection_name="Unnamed Collection", chrome_only=False, app_only=False):
+        windows = self.enumerate()
+        if chrome_only:
+            windows = [w for w in windows if "chrome" in w["exe"].lower()]
+        elif app_only:
+            windows = [w for w in windows if "chrome" not in w["exe"].lower()]
+
+        snap_dir = collection_dir(collection_name, self.snapshots_dir)
+        snap_dir.mkdir(parents=True, exist_ok=True)
+        path = snap_dir / f"snapshot_{datetime.now().strftime('%d-%b-%Y_%H%M%S%f')}.json"
+        snapshot = Snapshot(
+            collection_name=collection_name,
+            collection_id=str(uuid.uuid4()),
+            captured_at=datetime.now().replace(microsecond=0),
+            desktops=dict(self.desktops),
+            windows=[WindowRecord.from_dict(dict(w, z_order=i)) for i, w in enumerate(windows)],
+        )
+        save_snapshot(snapshot, path)
+        self.logger(f"[📸] Simulated capture: {path}")
+        return {"snapshot_file": str(path), "collection_name": collection_name, "window_count": len(windows)}
+
+    def restore(self, snapshot_path, threshold=None, return_to_origin=True, matcher="fuzzy", lazy=False,
+                relaunch=False, on_plan=None):
+        snapshot = load_snapshot(snapshot_path)
+        summary = {"restored": 0, "skipped": 0, "unmatched": 0}
+        with self._lock:
+            self.desktops.update(snapshot.desktops)
+
+            ops, claimed = [], set()
+            for snap_win in snapshot.windows:
+                live = next((
+                    w for w in self.windows
+                    if w["hwnd"] not in claimed
+                    and w["exe"].lower() == snap_win.exe.lower()
+                    and (snap_win.title in w["title"] or w["title"] in snap_win.title)
+                ), None)
+                if live is None:
+                    summary["unmatched"] += 1
+                    continue
+                claimed.add(live["hwnd"])
+                ops.append(RestoreOp(snap_win, WindowRecord.from_dict(live), 100, None, snap_win.desktop_number))
+
+            if on_plan is not None:
+                on_plan(ops)
+            if ops:
+                self.checkpoints.push(take_checkpoint(ops, self.read_layout([op.hwnd for op in ops]), snapshot_path))
+            summary["restored"] = self.apply(ops)
+
+        summary.update({"snapshot": str(snapshot_path), "windows": len(snapshot.windows)})
+        return summary
+
+    def undo(self):
+        checkpoint = self.checkpoints.peek()
+        if checkpoint is None:
+            self.logger("[!] Nothing to undo")
+            return {"undone": False}
+        ops, minimized = undo_ops(checkpoint, self.alive)
+        closed = len(checkpoint["windows"]) - len(ops) - len(minimized)
+        restored = self.apply(ops)
+        self.apply(minimized, minimize=True)
+        self.checkpoints.pop()
+        self.logger(f"[↩] Simulated undo of {checkpoint['snapshot']}: {restored + len(minimized)} window(s) put back, "
+                    f"{closed} already closed")
+        return {"restored": restored, "undone": True, "snapshot": checkpoint["snapshot"],
+                "windows": len(checkpoint["windows"]), "minimized": len(minimized), "closed": closed}
+
+    def switch(self, name, snapshot_path=None, park="minimize"):
+        collection_dir(name, self.snapshots_dir)
+        if snapshot_path is not None:
+            snapshot_path = snapshot_in_root(snapshot_path, self.snapshots_dir)
+        if self._switcher is None:
+            self._switcher = WorkspaceSwitcher(SimulatedSwitchBackend(self),
+                                               state_path=self.snapshots_dir / ".switcher_state.json",
+                                               park=park, logger=self.logger)
+        self._switcher.park_mode = park
+        if snapshot_path is None and not (self._switcher.sets.get(name) or {}).get("snapshot"):
+            snapshot_path = self.resolve_snapshot(name)     # the switcher's fallback looks in the app's folder
+        return self._switcher.switch(name, snapshot_path)
+
+    def invalidate(self, plans=False):
+        pass
+
+
+class SimulatedSwitchBackend:
+    """WorkspaceSwitcher backend over a SimulatedBackend's window list."""
+
+    def __init__(self, sim, holding_desktop=HOLDING_DESKTOP):
+        self.sim = sim
+        self.holding_desktop = holding_desktop
+
+    def alive(self, window):
+        return self.sim.alive(window)
+
+    def read_layout(self, hwnds):
+        return self.sim.read_layout(hwnds)
+
+    def _holding_number(self):
+        with self.sim._lock:
+            for number, name in self.sim.desktops.items():
+                if name == self.holding_desktop:
+                    return number
+            number = max(self.sim.desktops, default=0) + 1
+            self.sim.desktops[number] = self.holding_desktop
+            return number
+
+    def park(self, ops, mode):
+        if not ops:
+            return 0
+        if mode == "desktop":
+            holding = self._holding_number()
+            return self.sim.apply([RestoreOp(op.snap_win, op.live_win, op.score, None, holding) for op in ops])
+        return self.sim.apply([RestoreOp(op.snap_win, op.live_win, op.score) for op in ops], minimize=True)
+
+    def unpark(self, ops, mode):
+        return {"restored": self.sim.apply(ops)}
+
+    def restore(self, snapshot_path, on_plan):
+        return self.sim.restore(snapshot_path, on_plan=on_plan)
@@ -0,0 +1,112 @@
+# tools/bench_matchers.py
+
+"""
+Compares the fuzzy (partial_ratio) and tfidf title matchers on synthetic
+snapshot/live window sets: latency, and accuracy against known pairings.
+
+Usage:
+    python -m cwt.tools.bench_matchers [--sizes 100 1000 10000] [--skip-fuzzy-above N]
+
+Live titles are drifted copies of the saved ones (unread counters, changed
+suffixes, truncation, typos) plus ~20% unrelated windows. "correct" counts
+saved windows paired with their own live window at or above the matcher's
+default threshold; "wrong" counts pairings with another window above it.
+"""
+
+import argparse
+import random
+import time
+
+from cwt.core.snapshot_model import WindowRecord
+from cwt.core.title_matcher import DEFAULT_THRESHOLDS, MATCHERS, match_titles
+
+TEMPLATES = {
+    "chrome.exe": ["{w} ({n}) - {m}@gmail.com - Gmail - Google Chrome", "{w}/{v}: {w} {x} · GitHub - Google Chrome",
+                   "{W} {X} Dashboard - Grafana - Google Chrome", "({n}) {W} {X} - YouTube - Google Chrome"],
+    "Code.exe": ["{x}_{w}.py - {v} - Visual Studio Code", "{W}{X}.ts - {v} [WSL] - Visual Studio Code"],
+    "Obsidian.exe": ["{W} {X} - {v} - Obsidian v1.{n}.0"],
+    "explorer.exe": ["{d}:\\{W}\\{X}\\{v} - File Explorer", "{W} {X} and {n} more tabs - File Explorer"],
+    "WindowsTerminal.exe": ["{m}@{v}: ~/{w}/{x}", "Administrator: PowerShell {n}"],
+}
+_SYLLABLES = ("al ba cle tre va in le or pi qua re si te um ve wi yo ze ha me co em fa gla "
+              "dor kin lum mar nex pol rin sto tu vex").split()
+_rng = random.Random(3)
+WORDS = sorted({"".join(_rng.choice(_SYLLABLES) for _ in range(2 + i % 3)) for i in range(3000)})
+
+
+def _title(rng, template):
+    w, x, v, m = (rng.choice(WORDS) for _ in range(4))
+    return template.format(w=w, x=x, v=v, m=m, W=w.title(), X=x.title(), n=rng.randint(1, 99),
+                           d=rng.choice("CDK"))
+
+
+def _drift(rng, title):
+    roll = rng.random()
+    if roll < 0.25:                                    # unread counter / version changed
+        return "".join(str(rng.randint(0, 9)) if c.isdigit() else c for c in title)
+    if roll < 0.40:                                    # trailing app suffix dropped or changed
+        return title.rsplit(" - ", 1)[0] if " - " in title else title + " - Preview"
+    if roll < 0.50:                                    # truncated by the app
+        return title[:max(8, int(len(title) * 0.7))] + "…"
+    if roll < 0.60:                                    # one-character typo
+        i = rng.randrange(len(title))
+        return title[:i] + rng.choice("abcdefghij") + title[i + 1:]
+    return title
+
+
+def make_windows(count, seed=11):
+    """Returns (saved WindowRecords, live WindowRecords, {saved index: live hwnd})."""
+    rng = random.Random(seed)
+    saved, live, truth = [], [], {}
+    exes = list(TEMPLATES)
+    for i in range(count):
+        exe = rng.choice(exes)
+        title = _title(rng, rng.choice(TEMPLATES[exe]))
+        saved.append(WindowRecord(hwnd=i, title=title, exe=exe, x=0, y=0, width=800, height=600))
+        hwnd = 1_000_000 + i
+        live.append(WindowRecord(hwnd=hwnd, title=_drift(rng, title), exe=exe, x=0, y=0, width=800, height=600))
+        truth[i] = hwnd
+    for j in range(count // 5):                        # windows opened since the capture
+        exe = rng.choice(exes)
+        live.append(WindowRecord(hwnd=2_000_000 + j, title=_title(rng, rng.choice(TEMPLATES[exe])), exe=exe,
+                                 x=0, y=0, width=800, height=600))
+    rng.shuffle(live)
+    return saved, live, truth
+
+
+def run(matcher, saved, live, truth):
+    threshold = DEFAULT_THRESHOLDS[matcher]
+    start = time.perf_counter()
+    matches = match_titles(saved, live, matcher, logger=lambda msg: None)
+    elapsed = (time.perf_counter() - start) * 1000
+    correct = wrong = 0
+    for snap_win, live_win, score in matches:
+        if live_win is None or score < threshold:
+            continue
+        if live_win.hwnd == truth[snap_win.hwnd]:
+            correct += 1
+        else:
+            wrong += 1
+    return elapsed, correct, wrong
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--skip-fuzzy-above", type=int, default=None,
+                        help="Don't time partial_ratio on sets larger than this (it is quadratic per exe)")
+    args = parser.parse_args(argv)
+
+    print(f"{'windows':>8}  {'matcher':<7}  {'ms':>10}  {'correct':>8}  {'wrong':>6}")
+    for size in args.sizes:
+        saved, live, truth = make_windows(size)
+        for matcher in MATCHERS:
+            if matcher == "fuzzy" and args.skip_fuzzy_above and size > args.skip_fuzzy_above:
+                print(f"{size:>8}  {matcher:<7}  {'skipped':>10}")
+                continue
+            elapsed, correct, wrong = run(matcher, saved, live, truth)
+            print(f"{size:>8}  {matcher:<7}  {elapsed:>10.1f}  {correct / size:>7.1%}  {wrong / size:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
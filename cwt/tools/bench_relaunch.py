@@ -0,0 +1,111 @@
+# tools/bench_relaunch.py
+
+"""
+Runs the relaunch stage against stub executables and reports per-app
+launch-to-window latency.
+
+Each stub is a real child process (this Python interpreter) that sleeps for
+its app's startup time and prints "ready"; a watcher then opens the app's
+window in a SimulatedEventSource world, the way the app's first window
+would raise EVENT_OBJECT_CREATE. Nothing is placed — this measures the
+pool, the event-driven wait and window claiming, not Win32.
+
+Usage:
+    python -m cwt.tools.bench_relaunch [--apps 12] [--workers 4] [--startup 0.2-1.5] [--timeout 5]
+
+--hang N makes N of the stubs never open a window, to check that a stuck
+app costs one timeout on one worker rather than stalling the rest.
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from cwt.core.relaunch import Relauncher, relaunch_summary
+from cwt.core.snapshot_model import WindowRecord
+from cwt.core.window_cache import SimulatedEventSource
+
+STUB = "import sys, time; time.sleep(float(sys.argv[1])); print('ready', flush=True); time.sleep(float(sys.argv[2]))"
+HANG = "-1"
+
+
+def _snapshot_windows(count, startup, hang, seed=7):
+    rng = random.Random(seed)
+    low, high = startup
+    windows = []
+    for i in range(count):
+        delay = HANG if i < hang else str(round(rng.uniform(low, high), 3))
+        exe = f"stub{i}.exe"
+        windows.append(WindowRecord.from_dict({
+            "hwnd": 0, "title": f"Stub {i}", "exe": exe, "exe_path": sys.executable,
+            # argv: startup seconds, seconds to stay alive after the window, the exe it stands in for
+            "cmdline": [sys.executable, "-c", STUB, delay, "2", exe],
+        }))
+    return windows
+
+
+def _stub_launcher(source):
+    """A Relauncher launch function: starts the stub and opens its window once it prints "ready"."""
+    lock = threading.Lock()
+    procs = []
+
+    def watch(proc, exe):
+        if proc.stdout.readline().strip() == b"ready":
+            with lock:
+                source.create_window(f"{exe} window", exe)
+
+    def launch(command, cwd=None):
+        *argv, exe = command
+        if argv[3] == HANG:
+            argv[3:5] = ["30", "0"]                     # alive, but never shows a window
+        proc = subprocess.Popen(argv, cwd=cwd or None, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        procs.append(proc)
+        if argv[3] != "30":
+            threading.Thread(target=watch, args=(proc, exe), daemon=True).start()
+        return proc
+
+    return launch, procs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--startup", default="0.2-1.5", help="Stub startup range in seconds (LOW-HIGH)")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--hang", type=int, default=0)
+    args = parser.parse_args(argv)
+    low, high = (float(v) for v in args.startup.split("-"))
+
+    source = SimulatedEventSource()
+    source.create_window("Already open", "stub0.exe")     # pre-existing window: must not be claimed
+    cache = source.make_cache(logger=lambda *_: None)
+    windows = _snapshot_windows(args.apps, (low, high), args.hang)
+    launch, procs = _stub_launcher(source)
+
+    relauncher = Relauncher(cache.wait_for, existing_hwnds={w.hwnd for w in cache.windows()}, launch=launch,
+                            max_workers=args.workers, timeout=args.timeout, logger=lambda *_: None)
+    start = time.perf_counter()
+    results = relauncher.relaunch(windows)
+    wall_ms = round((time.perf_counter() - start) * 1000, 2)
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+    summary = relaunch_summary(results)
+    ready = sorted(r.ready_ms for r in results if r.ready_ms is not None)
+    print(json.dumps({
+        "apps": args.apps, "workers": args.workers, "wall_ms": wall_ms,
+        "windows": summary["windows"], "failed": summary["failed"],
+        "ready_ms_p50": ready[len(ready) // 2] if ready else None,
+        "ready_ms_max": ready[-1] if ready else None,
+        "launches": summary["launches"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
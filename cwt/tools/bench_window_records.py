@@ -0,0 +1,70 @@
+# tools/bench_window_records.py
+
+"""
+Measures the memory held by a window table as plain dicts (the old
+json.load / enumeration shape) versus WindowRecord rows.
+
+Usage:
+    python -m cwt.tools.bench_window_records [--windows 10000] [--snapshots 1]
+
+--snapshots N loads the same table N times, the way history/autosave keeps
+many snapshots of one collection in memory; interning is what pays off there.
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from cwt.core.snapshot_model import WindowRecord
+
+EXES = ["chrome.exe", "Code.exe", "explorer.exe", "WindowsTerminal.exe", "Obsidian.exe", "Spotify.exe"]
+DESKTOPS = ["Personal & Comms", "Code", "AI Stuff", "Obsidian", "YT Channel"]
+
+
+def _sample_json(count, seed=7):
+    rng = random.Random(seed)
+    windows = []
+    for i in range(count):
+        exe = rng.choice(EXES)
+        number = rng.randrange(len(DESKTOPS))
+        windows.append({
+            "hwnd": 100000 + i, "title": f"Tab {i % 400} - {exe[:-4]}", "exe": exe,
+            "x": rng.randrange(-8, 2560), "y": rng.randrange(0, 1400),
+            "width": rng.randrange(400, 2560), "height": rng.randrange(300, 1440),
+            "desktop_number": number + 1, "desktop_name": DESKTOPS[number], "z_order": i,
+        })
+    return json.dumps(windows)
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--windows", type=int, default=10_000)
+    parser.add_argument("--snapshots", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    raw = _sample_json(args.windows)
+    as_dicts = _measure(lambda: [json.loads(raw) for _ in range(args.snapshots)])
+    as_records = _measure(lambda: [[WindowRecord.from_dict(w) for w in json.loads(raw)]
+                                   for _ in range(args.snapshots)])
+
+    total = args.windows * args.snapshots
+    print(f"{args.snapshots} snapshot(s) × {args.windows} windows")
+    print(f"  dicts:         {as_dicts / 1024:>10.0f} KiB  ({as_dicts / total:.0f} B/window)")
+    print(f"  WindowRecord:  {as_records / 1024:>10.0f} KiB  ({as_records / total:.0f} B/window)")
+    print(f"  saved:         {(1 - as_records / as_dicts) * 100:>9.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# utils/compression.py
+
+"""
+Transparent compression for stored snapshots.
+
+Snapshots may sit on disk as plain .json, .json.gz or .json.zst. zstd is
+used for new archives when the `zstandard` package is installed; gzip
+(stdlib) otherwise. Readers never need to know which one a file uses.
+"""
+
+import gzip
+from pathlib import Path
+
+try:
+    import zstandard
+
+    def _zstd_compress(data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+
+    def _zstd_decompress(data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+    DEFAULT_CODEC = ".zst"
+except ImportError:
+    _zstd_compress = _zstd_decompress = None
+    DEFAULT_CODEC = ".gz"
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def is_compressed(path) -> bool:
+    return Path(path).suffix in COMPRESSED_SUFFIXES
+
+
+def read_bytes(path) -> bytes:
+    """Reads a file, decompressing .gz / .zst transparently."""
+    path = Path(path)
+    data = path.read_bytes()
+    if path.suffix == ".gz":
+        return gzip.decompress(data)
+    if path.suffix == ".zst":
+        if _zstd_decompress is None:
+            raise OSError(f"{path.name} is zstd-compressed but the 'zstandard' package is not installed")
+        return _zstd_decompress(data)
+    return data
+
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    if codec == ".zst" and _zstd_compress is not None:
+        return _zstd_compress(data)
+    if codec == ".gz":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    raise ValueError(f"Unsupported codec: {codec}")
@@ -2,73 +2,220 @@
 
 import win32gui
 import win32process
-import psutil
-from pyvda import AppView, get_virtual_desktops
+from time import perf_counter
 from cwt.utils.debug_logger import log_debug, log_info, log_error
+from cwt.utils.vda_utils import DesktopManager
+from cwt.utils.process_inventory import ProcessInventory
+from cwt.core.snapshot_model import WindowRecord
+from cwt.core.window_rules import STAGE_BASIC, STAGE_EXE, STAGE_DESKTOP
 
-def get_all_visible_windows():
-    log_info("Starting window enumeration and desktop mapping.")
+def is_real_window(hwnd):
+    if not win32gui.IsWindowVisible(hwnd):
+        return False
+    if win32gui.GetParent(hwnd) != 0:
+        return False
+    title = win32gui.GetWindowText(hwnd)
+    if not title:
+        return False
+    return True
 
-    def is_real_window(hwnd):
-        if not win32gui.IsWindowVisible(hwnd):
-            return False
-        if win32gui.GetParent(hwnd) != 0:
-            return False
-        title = win32gui.GetWindowText(hwnd)
-        if not title:
-            return False
-        return True
-
-    def get_exe(hwnd):
-        try:
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            return psutil.Process(pid).name()
-        except Exception:
-            return ""
+def get_process(hwnd, inventory=None):
+    """Returns the ProcessInfo of the process owning hwnd, or None if it can't be read."""
+    try:
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+    except Exception:
+        return None
+    return (inventory if inventory is not None else ProcessInventory()).get(pid)
+
+class EnumerationStats:
+    """
+    Per-stage counters and timings for one enumeration pass. Each stage only
+    sees the windows that survived the previous one:
+
+        visibility  IsWindowVisible / GetParent / title        (every hwnd)
+        basic       class + rect, title/class/size rules
+        exe         process lookup (one psutil oneshot per pid), exe rules
+        desktop     virtual-desktop lookup (pyvda COM), desktop rules
+    """
+    STAGES = ("visibility", "basic", "exe", "desktop")
+
+    def __init__(self):
+        self.entered = dict.fromkeys(self.STAGES, 0)
+        self.dropped = dict.fromkeys(self.STAGES, 0)
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.enumerated = 0
+        self.kept = 0
+        self.processes = 0
+
+    def report(self) -> dict:
+        return {
+            "enumerated": self.enumerated,
+            "kept": self.kept,
+            "processes": self.processes,
+            "stages": {
+                stage: {
+                    "windows": self.entered[stage],
+                    "dropped": self.dropped[stage],
+                    "ms": round(self.seconds[stage] * 1000, 2),
+                }
+                for stage in self.STAGES
+            },
+        }
+
+    def summary_line(self) -> str:
+        parts = [f"{s} {self.entered[s]}→{self.entered[s] - self.dropped[s]} ({self.seconds[s] * 1000:.1f} ms)"
+                 for s in self.STAGES]
+        return f"{self.enumerated} hwnds → {self.kept} kept | " + " | ".join(parts)
+
+
+def _stage(stats, name, started, dropped):
+    if stats is not None:
+        stats.entered[name] += 1
+        stats.seconds[name] += perf_counter() - started
+        if dropped:
+            stats.dropped[name] += 1
+    return perf_counter()
+
+
+def describe_window(hwnd, desktops, rules=None, stats=None, inventory=None):
+    """
+    Queries a single top-level window in stages — visibility and title, then
+    class and rect, then exe, then desktop. With a RuleSet, ignore rules are
+    checked after each stage so an ignored window is never queried for its
+    exe or desktop.
+
+    Args:
+        hwnd (int): Top-level window handle.
+        desktops (DesktopManager): Shared desktop map.
+        rules (RuleSet): Compiled ignore rules.
+        stats (EnumerationStats): Collects per-stage counts and timings.
+        inventory (ProcessInventory): Per-pass process lookups, shared by every
+            window of the pass so each process is queried once.
+
+    Returns:
+        WindowRecord: Window record, or None if hwnd is not a real visible window
+        or is ignored by the rules.
+    """
+    t = perf_counter()
+    try:
+        win_title = win32gui.GetWindowText(hwnd) if win32gui.IsWindowVisible(hwnd) \
+            and win32gui.GetParent(hwnd) == 0 else ""
+    except Exception:
+        win_title = ""  # Window vanished mid-query
+    t = _stage(stats, "visibility", t, not win_title)
+    if not win_title:
+        return None
+
+    try:
+        class_name = win32gui.GetClassName(hwnd)
+        rect = win32gui.GetWindowRect(hwnd)
+    except Exception:
+        _stage(stats, "basic", t, True)
+        return None
 
-    desktops = get_virtual_desktops()
-    desktop_guid_to_number = {
-        str(vd.id): i + 1 for i, vd in enumerate(desktops)
-    }
-    desktop_guid_to_name = {
-        str(vd.id): vd.name or f"Desktop #{i + 1}"
-        for i, vd in enumerate(desktops)
-    }
+    fields = {"title": win_title, "class": class_name,
+              "width": rect[2] - rect[0], "height": rect[3] - rect[1]}
+    ignored = final = False
+    if rules:
+        ignored, final = rules.check(STAGE_BASIC, fields)
+    t = _stage(stats, "basic", t, final)
+    if final:
+        return None
 
+    process = get_process(hwnd, inventory)
+    exe = process.name if process else ""
+    if rules:
+        fields["exe"] = exe
+        ignored, final = rules.check(STAGE_EXE, fields, ignored)
+    t = _stage(stats, "exe", t, final)
+    if final:
+        return None
+
+    desktop_number = None
+    desktop_name = "Unknown"
+    guid = desktops.desktop_of_window(hwnd)
+    if guid and desktops.number_of(guid):
+        desktop_number = desktops.number_of(guid)
+        desktop_name = desktops.name_of(guid)
+    else:
+        log_debug(f"[SKIP] '{win_title}' ({exe}) — not assignable to virtual desktop, skipping.")
+
+    if rules:
+        fields.update(desktop_number=desktop_number, desktop_name=desktop_name)
+        ignored, _ = rules.check(STAGE_DESKTOP, fields, ignored)
+    _stage(stats, "desktop", t, ignored)
+    if ignored:
+        return None
+
+    return WindowRecord(
+        hwnd=hwnd,
+        title=win_title,
+        exe=exe,
+        x=rect[0],
+        y=rect[1],
+        width=rect[2] - rect[0],
+        height=rect[3] - rect[1],
+        desktop_number=desktop_number,
+        desktop_name=desktop_name,
+        class_name=class_name,
+        pid=process.pid if process else None,
+        exe_path=process.exe_path if process else "",
+        cmdline=process.cmdline if process else (),
+        cwd=process.cwd if process else "",
+        create_time=process.create_time if process else None
+    )
+
+def enumerate_hwnds():
+    """Returns all top-level hwnds, front to back (EnumWindows walks the z-order)."""
     hwnds = []
     win32gui.EnumWindows(lambda hwnd, param: param.append(hwnd), hwnds)
-    visible_hwnds = [hwnd for hwnd in hwnds if is_real_window(hwnd)]
+    return hwnds
+
+def visible_titles():
+    """Returns (hwnd, title) for every real top-level window — no exe, rect or desktop lookups."""
+    titles = []
+    for hwnd in enumerate_hwnds():
+        try:
+            if is_real_window(hwnd):
+                titles.append((hwnd, win32gui.GetWindowText(hwnd)))
+        except Exception:
+            continue            # window closed mid-enumeration
+    return titles
+
+def get_all_visible_windows(desktops=None, rules=None, stats=None):
+    """
+    Enumerates visible top-level windows with their rect, exe and desktop.
+
+    Each returned record's z_order is its rank among the surviving windows
+    (0 = topmost), taken from the EnumWindows order — no separate z-order walk.
+
+    Args:
+        desktops (DesktopManager): Shared desktop map for the current operation.
+            A fresh one is built when omitted.
+        rules (RuleSet): Compiled ignore rules; ignored windows are dropped during
+            enumeration.
+        stats (EnumerationStats): Collects per-stage counts and timings.
+    """
+    log_info("Starting window enumeration and desktop mapping.")
+
+    if desktops is None:
+        desktops = DesktopManager(logger=log_debug)
+
+    hwnds = enumerate_hwnds()
+    if stats is not None:
+        stats.enumerated += len(hwnds)
 
     windows = []
-    for hwnd in visible_hwnds:
-        win_title = win32gui.GetWindowText(hwnd)
-        rect = win32gui.GetWindowRect(hwnd)
-        exe = get_exe(hwnd)
+    inventory = ProcessInventory()
+    for hwnd in hwnds:
+        record = describe_window(hwnd, desktops, rules, stats, inventory)
+        if record:
+            record.z_order = len(windows)
+            windows.append(record)
 
-        desktop_number = None
-        desktop_name = "Unknown"
-        try:
-            app = AppView(hwnd)
-            for vd in desktops:
-                if app.is_on_desktop(vd):
-                    guid = str(vd.id)
-                    desktop_number = desktop_guid_to_number.get(guid)
-                    desktop_name = desktop_guid_to_name.get(guid, f"Desktop {guid}")
-                    break
-        except Exception as e:
-            log_debug(f"[SKIP] '{win_title}' ({exe}) — not assignable to virtual desktop, skipping.")
-
-        windows.append({
-            "hwnd": hwnd,
-            "title": win_title,
-            "exe": exe,
-            "x": rect[0],
-            "y": rect[1],
-            "width": rect[2] - rect[0],
-            "height": rect[3] - rect[1],
-            "desktop_number": desktop_number,
-            "desktop_name": desktop_name
-        })
-
-    log_info(f"Enumerated {len(windows)} visible windows.")
-    return windows
\ No newline at end of file
+    if stats is not None:
+        stats.kept += len(windows)
+        stats.processes += inventory.lookups
+        log_info(f"Enumeration stages: {stats.summary_line()}")
+    log_info(f"Enumerated {len(windows)} visible windows ({inventory.lookups} process lookups).")
+    return windows
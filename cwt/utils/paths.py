@@ -7,14 +7,24 @@ correctly regardless of the working directory the app is launched from.
 """
 
 import os
+import re
+from datetime import datetime
 from pathlib import Path
 
+from cwt.utils.compression import is_compressed, read_bytes
+
 # Anchor: cwt/ package root — one level up from this file (cwt/utils/)
 CWT_ROOT = Path(__file__).resolve().parent.parent
 
 SNAPSHOTS_DIR  = CWT_ROOT / "snapshots"
 WORKSPACES_DIR = CWT_ROOT / "storage" / "workspaces"
 STORAGE_DIR    = CWT_ROOT / "storage"
+WINDOWIGNORE   = CWT_ROOT / ".windowignore"
+SEARCH_INDEX   = STORAGE_DIR / "search_index.sqlite"
+SWITCHER_STATE = STORAGE_DIR / "switcher_state.json"
+RESTORE_CHECKPOINTS = STORAGE_DIR / "restore_checkpoints.json"
+PLUGINS_DIR    = CWT_ROOT / "plugins"   # capture enrichers: built-ins plus user drop-ins
+OBJECTS_DIRNAME = ".objects"   # content-addressed window records, inside the snapshots root
 
 def get_snapshots_dir() -> Path:
     """Returns the canonical snapshots directory, creating it if needed."""
@@ -26,6 +36,121 @@ def get_workspaces_dir() -> Path:
     WORKSPACES_DIR.mkdir(parents=True, exist_ok=True)
     return WORKSPACES_DIR
 
+def get_windowignore_path() -> Path:
+    """Returns the path of the user's .windowignore rules file (may not exist)."""
+    return WINDOWIGNORE
+
+def list_collections() -> list:
+    """Returns the sorted names of all snapshot collections."""
+    return sorted(f.name for f in get_snapshots_dir().iterdir() if f.is_dir() and not f.name.startswith("."))
+
+SNAPSHOT_PATTERNS = ("snapshot_*.json", "snapshot_*.json.gz", "snapshot_*.json.zst")
+
+# "captured_at" sits in the header, before the window list, in every format written so far
+_CAPTURED_AT = re.compile(rb'"captured_at"\s*:\s*"([^"]+)"')
+HEADER_BYTES = 4096
+CAPTURED_AT_FORMATS = ("%d-%b-%Y %H:%M",)            # 1.0 files; the rest are ISO-8601
+FILENAME_FORMATS = ("%d-%b-%Y_%H%M", "%d-%b-%Y_%H%M%S%f", "%d-%b-%y_%H%M", "%b%d%y_%H%M")
+_snapshot_times = {}    # path → (mtime_ns, size, captured time)
+
+def _parse_time(text, formats):
+    try:
+        ts = datetime.fromisoformat(text)
+        return ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts
+    except ValueError:
+        pass
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+def _header_time(path: Path):
+    try:
+        if is_compressed(path):
+            head = read_bytes(path)[:HEADER_BYTES]
+        else:
+            with open(path, "rb") as f:
+                head = f.read(HEADER_BYTES)
+    except (OSError, ValueError):
+        return None
+    m = _CAPTURED_AT.search(head)
+    return _parse_time(m.group(1).decode("utf-8", "replace"), CAPTURED_AT_FORMATS) if m else None
+
+def snapshot_time(path: Path) -> datetime:
+    """
+    When a snapshot was captured: its "captured_at", else the timestamp in its
+    file name, else (last resort) its modification time — which copies,
+    checkouts and backups rewrite. Cached per file until it changes.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return datetime.min
+    cached = _snapshot_times.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    stamp = path.name.split(".", 1)[0].removeprefix("snapshot_")
+    when = _header_time(path) or _parse_time(stamp, FILENAME_FORMATS) or datetime.fromtimestamp(st.st_mtime)
+    _snapshot_times[path] = (st.st_mtime_ns, st.st_size, when)
+    return when
+
+def find_snapshot_files(folder: Path) -> list:
+    """Returns the snapshot files (plain or compressed) in a folder, newest first (by capture time)."""
+    files = [p for pattern in SNAPSHOT_PATTERNS for p in folder.glob(pattern)]
+    return sorted(files, key=lambda p: (snapshot_time(p), p.name), reverse=True)
+
+def list_snapshots(collection_name: str) -> list:
+    """Returns a collection's snapshot files, newest first (by capture time)."""
+    snap_dir = get_snapshots_dir() / collection_name
+    if not snap_dir.is_dir():
+        return []
+    return find_snapshot_files(snap_dir)
+
+def get_latest_snapshot(collection_name: str):
+    """Returns the newest snapshot file in a collection, or None."""
+    snapshots = list_snapshots(collection_name)
+    return snapshots[0] if snapshots else None
+
+def collection_dir(name: str, root: Path = None) -> Path:
+    """
+    Resolves a collection name from an untrusted caller (the service socket)
+    to its folder under the snapshots root. Raises ValueError for names that
+    are empty, hidden, contain a path separator or drive, or would leave the root.
+    """
+    root = Path(root or get_snapshots_dir()).resolve()
+    if not name or name.startswith(".") or any(c in name for c in "/\\:"):
+        raise ValueError(f"Invalid collection name: {name!r}")
+    path = (root / name).resolve()
+    if path.parent != root:
+        raise ValueError(f"Invalid collection name: {name!r}")
+    return path
+
+def snapshot_in_root(path, root: Path = None) -> Path:
+    """
+    Resolves a snapshot path from an untrusted caller (relative paths are taken
+    from the snapshots root). Raises ValueError unless it lies under the root.
+    """
+    root = Path(root or get_snapshots_dir()).resolve()
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root):
+        raise ValueError(f"Snapshot path is outside the snapshots folder: {path}")
+    return resolved
+
+def resolve_snapshot_ref(ref: str, root: Path = None):
+    """
+    A collection name (its newest snapshot) or a snapshot file path, confined
+    to the snapshots root. Returns None if nothing is found; raises ValueError
+    for refs that point outside the root.
+    """
+    if Path(ref).name == ref:
+        folder = collection_dir(ref, root)
+        files = find_snapshot_files(folder) if folder.is_dir() else []
+        return files[0] if files else None
+    path = snapshot_in_root(ref, root)
+    return path if path.is_file() else None
+
 def get_desktop_path() -> Path:
     """Returns the true local Desktop path, ignoring OneDrive redirection."""
     return Path(os.environ["USERPROFILE"]) / "Desktop"
\ No newline at end of file
@@ -0,0 +1,100 @@
+# utils/process_inventory.py
+
+"""
+One process lookup per pid per capture.
+
+Windows of the same app share a process (every Chrome window belongs to one
+browser process), so enumeration asks a ProcessInventory instead of building
+a psutil.Process per window. The first lookup of a pid reads everything a
+relaunch needs in one psutil oneshot() — name, exe path, command line,
+working directory, create time — and later windows of that pid are a dict
+hit. Cost grows with the number of distinct processes, not windows.
+
+Chromium browsers get their --profile-directory tagged from the same
+command line. That is the profile the browser process was launched with:
+every window of the process shares it, whichever profile the window shows,
+so it is a process attribute — a window's own profile comes from its
+AppUserModelID (see plugins/chromium.py).
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+import psutil
+
+PROCESS_ATTRS = ["name", "exe", "cmdline", "cwd", "create_time"]
+CHROMIUM_EXES = {"chrome.exe", "msedge.exe", "brave.exe", "vivaldi.exe", "chromium.exe"}
+_PROFILE_ARG = re.compile(r"^--profile-directory=(.+)$", re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class ProcessInfo:
+    pid: int
+    name: str = ""
+    exe_path: str = ""
+    cmdline: tuple = field(default_factory=tuple)
+    cwd: str = ""
+    create_time: Optional[float] = None
+    profile: str = ""           # launch profile of a Chromium browser process, not of its windows
+
+
+def chromium_profile(name, cmdline) -> str:
+    """The --profile-directory of a Chromium browser command line ("" when absent or not a browser)."""
+    if name.lower() not in CHROMIUM_EXES:
+        return ""
+    args = iter(cmdline)
+    for arg in args:
+        m = _PROFILE_ARG.match(arg)
+        if m:
+            return m.group(1).strip('"')
+        if arg.lower() == "--profile-directory":
+            return next(args, "").strip('"')
+    return ""
+
+
+def with_chromium_profile(cmdline, profile) -> tuple:
+    """cmdline with its --profile-directory replaced by profile."""
+    args, skip = [], False
+    for arg in cmdline:
+        if skip:
+            skip = False
+            continue
+        if arg.lower() == "--profile-directory":
+            skip = True
+            continue
+        if not _PROFILE_ARG.match(arg):
+            args.append(arg)
+    return tuple(args[:1]) + (f"--profile-directory={profile}",) + tuple(args[1:])
+
+
+class ProcessInventory:
+    def __init__(self):
+        self._by_pid = {}
+        self.lookups = 0
+
+    def get(self, pid) -> Optional[ProcessInfo]:
+        """ProcessInfo for pid (fetched once), or None if the process is gone."""
+        if pid in self._by_pid:
+            return self._by_pid[pid]
+        self.lookups += 1
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                d = proc.as_dict(attrs=PROCESS_ATTRS, ad_value=None)   # AccessDenied → None (elevated apps)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, ValueError):
+            self._by_pid[pid] = None
+            return None
+        name = d["name"] or ""
+        cmdline = tuple(d["cmdline"] or ())
+        info = ProcessInfo(pid=pid, name=name, exe_path=d["exe"] or "", cmdline=cmdline, cwd=d["cwd"] or "",
+                           create_time=d["create_time"], profile=chromium_profile(name, cmdline))
+        self._by_pid[pid] = info
+        return info
+
+    def collect(self, pids):
+        """Fetches every pid in one pass; returns {pid: ProcessInfo} for the ones still running."""
+        return {pid: info for pid in set(pids) if (info := self.get(pid)) is not None}
+
+    def __len__(self):
+        return len(self._by_pid)
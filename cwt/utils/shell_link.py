@@ -0,0 +1,192 @@
+# utils/shell_link.py
+
+"""
+Native Windows shortcut (.lnk) reader/writer.
+
+Serializes the Shell Link Binary File Format ([MS-SHLLINK]) directly, so
+shortcuts can be created without spawning PowerShell/WScript.Shell. Links are
+written with a LinkInfo block (local base path) instead of a shell item ID
+list — Explorer resolves these exactly like WScript-created shortcuts. Pure
+Python, so the output is byte-for-byte reproducible on any platform.
+"""
+
+import struct
+from pathlib import Path, PureWindowsPath
+
+HEADER_SIZE = 0x4C
+LINK_CLSID = bytes.fromhex("0114020000000000C000000000000046")
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x0001
+HAS_LINK_INFO = 0x0002
+HAS_NAME = 0x0004
+HAS_RELATIVE_PATH = 0x0008
+HAS_WORKING_DIR = 0x0010
+HAS_ARGUMENTS = 0x0020
+HAS_ICON_LOCATION = 0x0040
+IS_UNICODE = 0x0080
+
+FILE_ATTRIBUTE_NORMAL = 0x80
+SW_SHOWNORMAL = 1
+DRIVE_FIXED = 3
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x1
+LINK_INFO_HEADER_SIZE = 0x24  # includes the Unicode path offsets
+
+
+def _counted_string(value: str) -> bytes:
+    data = value.encode("utf-16-le")
+    return struct.pack("<H", len(data) // 2) + data
+
+
+def _link_info(target: str) -> bytes:
+    volume_id = struct.pack("<IIII", 0x11, DRIVE_FIXED, 0, 0x10) + b"\x00"
+    base_ansi = target.encode("cp1252", errors="replace") + b"\x00"
+    suffix_ansi = b"\x00"
+    base_unicode = target.encode("utf-16-le") + b"\x00\x00"
+    suffix_unicode = b"\x00\x00"
+
+    volume_offset = LINK_INFO_HEADER_SIZE
+    base_offset = volume_offset + len(volume_id)
+    suffix_offset = base_offset + len(base_ansi)
+    base_unicode_offset = suffix_offset + len(suffix_ansi)
+    suffix_unicode_offset = base_unicode_offset + len(base_unicode)
+    total = suffix_unicode_offset + len(suffix_unicode)
+
+    header = struct.pack(
+        "<IIIIIIIII",
+        total, LINK_INFO_HEADER_SIZE, VOLUME_ID_AND_LOCAL_BASE_PATH,
+        volume_offset, base_offset, 0, suffix_offset,
+        base_unicode_offset, suffix_unicode_offset
+    )
+    return header + volume_id + base_ansi + suffix_ansi + base_unicode + suffix_unicode
+
+
+def build_shell_link(target, arguments="", working_dir=None, icon_location=None, icon_index=0, description=None) -> bytes:
+    """
+    Renders a .lnk file pointing at `target`.
+
+    Args:
+        target (str): Absolute path of the program/file the shortcut launches.
+        arguments (str): Command-line arguments.
+        working_dir (str): Start-in folder (defaults to the target's folder).
+        icon_location (str): Icon file path (defaults to none — Explorer uses the target's icon).
+        icon_index (int): Icon index within icon_location.
+        description (str): Comment/tooltip text.
+
+    Returns:
+        bytes: Complete .lnk file contents.
+    """
+    target = str(target)
+    if working_dir is None:
+        parent = str(PureWindowsPath(target).parent)
+        working_dir = "" if parent == "." else parent
+
+    flags = HAS_LINK_INFO | IS_UNICODE
+    strings = b""
+    if description:
+        flags |= HAS_NAME
+        strings += _counted_string(description)
+    if working_dir:
+        flags |= HAS_WORKING_DIR
+        strings += _counted_string(working_dir)
+    if arguments:
+        flags |= HAS_ARGUMENTS
+        strings += _counted_string(arguments)
+    if icon_location:
+        flags |= HAS_ICON_LOCATION
+        strings += _counted_string(icon_location)
+
+    header = struct.pack(
+        "<I16sII8s8s8sIiIHHII",
+        HEADER_SIZE, LINK_CLSID, flags, FILE_ATTRIBUTE_NORMAL,
+        b"\x00" * 8, b"\x00" * 8, b"\x00" * 8,
+        0, icon_index, SW_SHOWNORMAL, 0, 0, 0, 0
+    )
+    terminal_block = struct.pack("<I", 0)
+    return header + _link_info(target) + strings + terminal_block
+
+
+def read_shell_link(data: bytes) -> dict:
+    """
+    Extracts target, arguments, working dir and icon from .lnk contents
+    (ours or WScript.Shell's). Raises ValueError for non-shortcut, truncated
+    or corrupt data.
+    """
+    try:
+        return _parse_shell_link(data)
+    except struct.error as e:
+        raise ValueError(f"Truncated shell link: {e}") from None
+
+
+def _parse_shell_link(data: bytes) -> dict:
+    if len(data) < HEADER_SIZE or data[4:20] != LINK_CLSID:
+        raise ValueError("Not a shell link")
+    flags = struct.unpack_from("<I", data, 20)[0]
+    icon_index = struct.unpack_from("<i", data, 56)[0]
+    pos = HEADER_SIZE
+
+    if flags & HAS_LINK_TARGET_ID_LIST:
+        pos += 2 + struct.unpack_from("<H", data, pos)[0]
+
+    target = ""
+    if flags & HAS_LINK_INFO:
+        info_size, info_header_size, info_flags = struct.unpack_from("<III", data, pos)
+        if pos + info_size > len(data):
+            raise ValueError("Truncated LinkInfo block")
+        if info_flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+            if info_header_size >= 0x24:
+                start = pos + struct.unpack_from("<I", data, pos + 28)[0]
+                end = start
+                while end + 2 <= len(data) and data[end:end + 2] != b"\x00\x00":
+                    end += 2
+                if end + 2 > len(data):
+                    raise ValueError("Unterminated LocalBasePathUnicode")
+                target = data[start:end].decode("utf-16-le", errors="replace")
+            else:
+                start = pos + struct.unpack_from("<I", data, pos + 16)[0]
+                end = data.find(b"\x00", start)
+                if start >= len(data) or end < 0:
+                    raise ValueError("Unterminated LocalBasePath")
+                target = data[start:end].decode("cp1252", errors="replace")
+        pos += info_size
+
+    fields = {}
+    encoding, width = ("utf-16-le", 2) if flags & IS_UNICODE else ("cp1252", 1)
+    for flag, key in ((HAS_NAME, "description"), (HAS_RELATIVE_PATH, "relative_path"),
+                      (HAS_WORKING_DIR, "working_dir"), (HAS_ARGUMENTS, "arguments"),
+                      (HAS_ICON_LOCATION, "icon_location")):
+        if flags & flag:
+            count = struct.unpack_from("<H", data, pos)[0]
+            pos += 2
+            if pos + count * width > len(data):
+                raise ValueError(f"Truncated {key} string")
+            fields[key] = data[pos:pos + count * width].decode(encoding, errors="replace")
+            pos += count * width
+
+    return {
+        "target": target,
+        "arguments": fields.get("arguments", ""),
+        "working_dir": fields.get("working_dir", ""),
+        "icon_location": fields.get("icon_location", ""),
+        "icon_index": icon_index,
+        "description": fields.get("description", ""),
+    }
+
+
+def write_shell_link(path, target, arguments="", working_dir=None, icon_location=None, icon_index=0,
+                     description=None) -> bool:
+    """
+    Writes a .lnk file, skipping the write when the existing file is byte-identical.
+
+    Returns:
+        bool: True if the file was (re)written, False if it was already current.
+    """
+    path = Path(path)
+    data = build_shell_link(target, arguments, working_dir, icon_location, icon_index, description)
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
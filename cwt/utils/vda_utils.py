@@ -1,4 +1,7 @@
-from pyvda import VirtualDesktop, get_virtual_desktops
+import re
+from pyvda import AppView, VirtualDesktop, get_virtual_desktops
+
+GUID_NAME_REGEX = re.compile(r'^\{?[0-9A-Fa-f]{8}(-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}\}?$')
 
 def get_current_virtual_desktop_id():
     current = VirtualDesktop.current()
@@ -11,15 +14,168 @@ def get_current_virtual_desktop_index():
 
 def get_virtual_desktop_id_map():
     """Returns a dict of {desktop_number: friendly_name} for all current desktops"""
-    return {i + 1: (d.name or f"Desktop #{i + 1}") for i, d in enumerate(get_virtual_desktops())}
+    return DesktopManager().name_map()
 
 def get_virtual_desktop_guid_map():
     """Returns a dict of {desktop_number: guid_string} for restore matching"""
-    return {i + 1: str(d.id) for i, d in enumerate(get_virtual_desktops())}
+    return DesktopManager().guid_map()
 
 def get_virtual_desktop_by_id(desktop_id):
     """Find and return a VirtualDesktop object by its ID"""
-    for d in get_virtual_desktops():
-        if str(d.id) == str(desktop_id):
-            return d
-    return None
\ No newline at end of file
+    return DesktopManager().by_guid(desktop_id)
+
+
+class DesktopManager:
+    """
+    Holds a single cached GUID ↔ index ↔ name map of the live virtual desktops.
+
+    One manager is created per capture/restore operation and handed to every
+    step, so pyvda is enumerated once instead of once per helper or per window.
+    Call refresh() after anything that changes the desktop set.
+    """
+
+    def __init__(self, logger=print):
+        self.logger = logger
+        self.refresh()
+
+    def refresh(self):
+        self.desktops = get_virtual_desktops()
+        self._by_guid = {}
+        self._number_by_guid = {}
+        self._name_by_guid = {}
+        for i, d in enumerate(self.desktops):
+            guid = str(d.id)
+            self._by_guid[guid] = d
+            self._number_by_guid[guid] = i + 1
+            self._name_by_guid[guid] = self._safe_name(d) or f"Desktop #{i + 1}"
+
+    @staticmethod
+    def _safe_name(desktop):
+        try:
+            return desktop.name
+        except Exception:
+            return ""  # Desktop names are not exposed on older Windows 10 builds
+
+    def __len__(self):
+        return len(self.desktops)
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+
+    def by_guid(self, guid):
+        return self._by_guid.get(str(guid)) if guid else None
+
+    def by_number(self, number):
+        if isinstance(number, int) and 0 < number <= len(self.desktops):
+            return self.desktops[number - 1]
+        return None
+
+    def number_of(self, guid):
+        return self._number_by_guid.get(str(guid))
+
+    def name_of(self, guid):
+        return self._name_by_guid.get(str(guid), f"Desktop {guid}")
+
+    def name_map(self):
+        """Returns {desktop_number: friendly_name}, same shape as get_virtual_desktop_id_map()."""
+        return {self._number_by_guid[g]: name for g, name in self._name_by_guid.items()}
+
+    def guid_map(self):
+        """Returns {desktop_number: guid_string}, same shape as get_virtual_desktop_guid_map()."""
+        return {n: g for g, n in self._number_by_guid.items()}
+
+    def current_id(self):
+        return str(VirtualDesktop.current().id)
+
+    def desktop_of_window(self, hwnd):
+        """Returns the GUID string of the desktop hosting hwnd, or None if it isn't assignable."""
+        try:
+            return str(AppView(hwnd).desktop_id)
+        except Exception:
+            return None
+
+    def resolve(self, snap_win):
+        """Resolves a snapshot window to a live desktop — by GUID first, then by desktop number."""
+        return self.by_guid(snap_win.desktop_id) or self.by_number(snap_win.desktop_number)
+
+    # ── Provisioning ─────────────────────────────────────────────────────────
+
+    def diff(self, snapshot_desktops):
+        """
+        Compares a snapshot's {number: name} desktop table against the live set.
+
+        Returns:
+            dict: {"create": int, "rename": [(number, live_name, wanted_name)]}
+        """
+        wanted = {}
+        for key, name in (snapshot_desktops or {}).items():
+            try:
+                wanted[int(key)] = name
+            except (TypeError, ValueError):
+                continue
+
+        live = self.name_map()
+        create = max(0, max(wanted, default=0) - len(self.desktops))
+        rename = []
+        for number, name in sorted(wanted.items()):
+            # Very old captures stored GUIDs in place of names — never push those onto a desktop
+            if not name or GUID_NAME_REGEX.match(name):
+                continue
+            if live.get(number) != name:
+                rename.append((number, live.get(number), name))
+        return {"create": create, "rename": rename}
+
+    def ensure_named(self, name):
+        """Returns the desktop called name, creating it (as the last desktop) if there is none."""
+        for guid, existing in self._name_by_guid.items():
+            if existing == name:
+                return self._by_guid[guid]
+        try:
+            desktop = VirtualDesktop.create()
+            desktop.rename(name)
+        except Exception as e:
+            self.logger(f"[!] Failed to create desktop '{name}': {e}")
+            return None
+        self.refresh()
+        return self.by_guid(str(desktop.id))
+
+    def provision(self, snapshot_desktops, rename=True):
+        """
+        Creates missing desktops and applies the snapshot's desktop names in one
+        batch, then refreshes the cached map once.
+
+        Args:
+            snapshot_desktops (dict): The snapshot's {number: name} desktop table.
+            rename (bool): Whether to rename live desktops to the snapshot's names.
+
+        Returns:
+            dict: {"created": int, "renamed": int}
+        """
+        plan = self.diff(snapshot_desktops)
+        created = renamed = 0
+
+        for _ in range(plan["create"]):
+            try:
+                VirtualDesktop.create()
+                created += 1
+            except Exception as e:
+                self.logger(f"[!] Failed to create virtual desktop: {e}")
+                break
+
+        if created:
+            self.refresh()
+
+        if rename:
+            for number, old, new in plan["rename"]:
+                desktop = self.by_number(number)
+                if not desktop:
+                    continue
+                try:
+                    desktop.rename(new)
+                    self._name_by_guid[str(desktop.id)] = new
+                    renamed += 1
+                except Exception as e:
+                    self.logger(f"[!] Failed to rename desktop {number} ('{old}' → '{new}'): {e}")
+
+        if created or renamed:
+            self.logger(f"[🖥️] Provisioned desktops — created: {created}, renamed: {renamed}")
+        return {"created": created, "renamed": renamed}
@@ -0,0 +1,31 @@
+import sys
+
+from cwt.core.capture_enrichers import EnricherRegistry, run_enrichers
+from cwt.core.snapshot_model import WindowRecord
+from cwt.core.window_rules import load_rules
+from cwt.utils.paths import PLUGINS_DIR
+
+
+def _record(hwnd, class_name, title):
+    return WindowRecord(hwnd=hwnd, title=title, exe="explorer.exe", x=0, y=0, width=1200, height=800,
+                        desktop_number=1, desktop_name="Desktop 1", class_name=class_name)
+
+
+def test_explorer_enricher_sees_folder_windows_under_default_rules(tmp_path, monkeypatch):
+    rules = load_rules(tmp_path / ".windowignore", logger=lambda msg: None)
+    live = [_record(1, "CabinetWClass", "Documents - File Explorer"),
+            _record(2, "Shell_TrayWnd", "Taskbar"),
+            _record(3, "Progman", "Program Manager")]
+    kept = [w for w in live if not rules.ignores(w)]       # as capture filters the live window cache
+    assert [w.hwnd for w in kept] == [1]
+
+    registry = EnricherRegistry(PLUGINS_DIR, entry_point_group=None, logger=lambda msg: None)
+    explorer = [e for e in registry.enrichers() if e.name == "explorer"]
+    monkeypatch.setattr(sys.modules["cwt_plugin_explorer"], "shell_folders",
+                        lambda: {1: [r"C:\Users\me\Documents", r"C:\Users\me\Downloads"]})
+
+    report = run_enrichers(kept, explorer, logger=lambda msg: None)
+    assert report["explorer"]["status"] == "ok"
+    assert report["explorer"]["enriched"] == 1
+    assert kept[0].context["explorer"] == {"path": r"C:\Users\me\Documents",
+                                           "tabs": [r"C:\Users\me\Documents", r"C:\Users\me\Downloads"]}
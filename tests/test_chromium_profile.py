@@ -0,0 +1,32 @@
+from cwt.core.relaunch import launch_command
+from cwt.core.snapshot_model import WindowRecord
+from cwt.plugins.chromium import profile_from_app_id
+from cwt.utils.process_inventory import chromium_profile, with_chromium_profile
+
+CHROME = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+USER_DATA = r"C:\Users\me\AppData\Local\Google\Chrome\User Data"
+PROFILES = ["Default", "Profile 1", "Profile 2"]
+
+
+def test_profile_from_app_id():
+    assert profile_from_app_id("Chrome", USER_DATA, PROFILES) == "Default"
+    assert profile_from_app_id("Chrome.UserData.Profile2", USER_DATA, PROFILES) == "Profile 2"
+    assert profile_from_app_id("Chrome.UserData.Profile9", USER_DATA, PROFILES) == ""
+    assert profile_from_app_id("", USER_DATA, PROFILES) == ""
+
+
+def test_with_chromium_profile_replaces_the_launch_profile():
+    for cmdline in ([CHROME, "--profile-directory=Profile 1", "--flag"],
+                    [CHROME, "--profile-directory", "Profile 1", "--flag"],
+                    [CHROME, "--flag"]):
+        command = with_chromium_profile(cmdline, "Profile 2")
+        assert command == (CHROME, "--profile-directory=Profile 2", "--flag")
+        assert chromium_profile("chrome.exe", command) == "Profile 2"
+
+
+def test_relaunch_opens_the_window_profile_not_the_process_one():
+    window = WindowRecord(hwnd=1, title="Inbox - Google Chrome", exe="chrome.exe", x=0, y=0, width=800,
+                          height=600, cmdline=(CHROME, "--profile-directory=Profile 1"),
+                          context={"chromium": {"launch_profile": "Profile 1", "profile": "Profile 2"}})
+    assert launch_command(window) == (CHROME, "--profile-directory=Profile 2")
+    assert launch_command(window.copy(context={})) == (CHROME, "--profile-directory=Profile 1")
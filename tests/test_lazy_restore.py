@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cwt.core.lazy_restore import LazyDesktopRestore
+from cwt.core.restore_scheduler import RestoreOp
+from cwt.core.snapshot_model import WindowRecord
+
+
+def _op(hwnd, guid, number):
+    live = WindowRecord(hwnd=hwnd, title="Notes", exe="notepad.exe", x=0, y=0, width=800, height=600,
+                        desktop_number=1)
+    snap = live.copy(x=100, y=100, desktop_number=number)
+    return RestoreOp(snap, live, 100, guid, number)
+
+
+def test_visit_runs_on_the_submit_thread_with_the_live_desktop():
+    current = {"guid": "desk-1"}
+    ran = []
+
+    def execute(ops):
+        ran.append((threading.current_thread().name, [op.live_win.desktop_number for op in ops]))
+        return {"restored": len(ops)}
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="com-worker") as worker:
+        lazy = LazyDesktopRestore(execute, current_desktop=lambda: current["guid"],
+                                  lookup=lambda hwnd: _op(hwnd, "desk-2", 2).live_win,
+                                  logger=lambda msg: None, submit=worker.submit,
+                                  live_desktop=lambda hwnd: 3)      # the user moved it to desktop 3
+        lazy.register([_op(10, "desk-2", 2)])
+
+        assert lazy.poll_once() is None             # still on desktop 1
+        current["guid"] = "desk-2"
+        assert lazy.poll_once() == {"restored": 1}
+
+    assert ran == [("com-worker_0", [3])]
+    assert lazy.pending == {}
+
+
+def test_queued_visit_is_skipped_if_the_user_left_the_desktop():
+    guids = iter(["desk-2", "desk-1"])              # seen on desktop 2, gone by the time the worker runs
+    lazy = LazyDesktopRestore(lambda ops: {"restored": len(ops)}, current_desktop=lambda: next(guids),
+                              logger=lambda msg: None, submit=lambda fn, *args: _Done(fn(*args)))
+    lazy.register([_op(10, "desk-2", 2)])
+    assert lazy.poll_once() is None
+    assert list(lazy.pending) == ["desk-2"]
+
+
+class _Done:
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
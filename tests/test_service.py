@@ -0,0 +1,124 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from cwt.services.client import send_request
+from cwt.services.daemon import CWTServer, CWTService
+from cwt.services.simulator import SimulatedBackend
+
+
+def _quiet(msg):
+    pass
+
+
+@pytest.fixture
+def sim(tmp_path):
+    return SimulatedBackend(tmp_path / "snapshots", logger=_quiet)
+
+
+@pytest.fixture
+def request_(sim):
+    """send_request bound to a CWTServer serving `sim` on a free port."""
+    service = CWTService(sim, logger=_quiet)
+    server = CWTServer(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    send = lambda cmd, **args: send_request(cmd, port=port, timeout=5.0, **args)
+    send.port = port
+    yield send
+    server.shutdown()
+    server.server_close()
+    service.worker.shutdown(wait=True)
+
+
+@pytest.mark.parametrize("name", ["../../escape", "..", "a/b", "a\\b", ".objects", "C:escape", ""])
+def test_capture_rejects_names_outside_the_snapshots_folder(sim, request_, tmp_path, name):
+    response = request_("capture", collection_name=name)
+    assert response["ok"] is False
+    assert response["error"].startswith("ValueError")
+    assert not (tmp_path / "escape").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["snapshots"]
+
+
+def test_restore_rejects_paths_outside_the_snapshots_folder(sim, request_, tmp_path):
+    outside = tmp_path / "snapshot_outside.json"
+    outside.write_text("{}", encoding="utf-8")
+    for ref in (str(outside), "../snapshot_outside.json"):
+        response = request_("restore", snapshot=ref)
+        assert response["ok"] is False
+        assert response["error"].startswith("ValueError")
+    assert request_("list", collection="../..")["ok"] is False
+    assert request_("switch", collection="..")["ok"] is False
+
+
+def _open_workspace(sim):
+    sim.desktops.update({1: "Comms", 2: "Code"})
+    mail = sim.open_window("Inbox - Mail", "mail.exe", x=0, y=0)
+    code = sim.open_window("main.py - Code", "code.exe", x=100, y=100, desktop_number=2)
+    return mail, code
+
+
+def test_ping_and_errors(request_):
+    assert request_("ping")["result"] == {"pong": True, "backend": "SimulatedBackend"}
+    assert request_("frobnicate") == {"ok": False, "error": "Unknown command: frobnicate"}
+    response = request_("restore", collection="Nope")
+    assert response["ok"] is False and response["error"].startswith("FileNotFoundError")
+    assert request_("undo")["result"] == {"undone": False}
+    assert request_("invalidate")["result"] == {"invalidated": True}
+
+
+def test_capture_list_restore_and_undo(sim, request_):
+    mail, code = _open_workspace(sim)
+    captured = request_("capture", collection_name="Morning")["result"]
+    assert captured["window_count"] == 2
+    assert request_("list")["result"] == {"collections": ["Morning"]}
+    assert request_("list", collection="Morning")["result"]["snapshots"] == [captured["snapshot_file"]]
+
+    sim._window(mail).update(x=500, y=500)
+    sim._window(code).update(desktop_number=1)
+    restored = request_("restore", collection="Morning")["result"]
+    assert restored["restored"] == 2 and restored["unmatched"] == 0
+    assert (sim._window(mail)["x"], sim._window(code)["desktop_number"]) == (0, 2)
+
+    undone = request_("undo")["result"]
+    assert undone["undone"] is True and undone["restored"] == 2
+    assert (sim._window(mail)["x"], sim._window(code)["desktop_number"]) == (500, 1)
+
+
+def test_switch_restores_first_then_parks_and_unparks(sim, request_):
+    sim.desktops.update({1: "Comms", 2: "Code"})
+    mail = sim.open_window("Inbox - Mail", "mail.exe")
+    request_("capture", collection_name="Mail")
+    sim.close_window(mail)
+    code = sim.open_window("main.py - Code", "code.exe", x=100, y=100, desktop_number=2)
+    request_("capture", collection_name="Code")
+    mail = sim.open_window("Inbox - Mail", "mail.exe")
+
+    first = request_("switch", collection="Mail")["result"]
+    assert first["mode"] == "restore" and first["from"] is None
+
+    to_code = request_("switch", collection="Code", park="desktop")["result"]
+    assert to_code["from"] == "Mail" and to_code["parked"] == 1
+    parking = next(n for n, name in sim.desktops.items() if name == "CWT Parking")
+    assert sim._window(mail)["desktop_number"] == parking
+
+    back = request_("switch", collection="Mail")["result"]
+    assert back["mode"] == "unpark" and back["restored"] == 1
+    assert sim._window(mail)["desktop_number"] == 1
+    assert sim._window(code).get("minimized") is True
+
+
+def test_bad_json_gets_an_error_line(request_):
+    with socket.create_connection(("127.0.0.1", request_.port), timeout=5.0) as sock, \
+            sock.makefile("rwb") as stream:
+        stream.write(b"not json\n")
+        stream.flush()
+        response = json.loads(stream.readline())
+    assert response["ok"] is False and response["error"].startswith("Bad request")
+
+
+def test_shutdown_replies_then_stops(request_):
+    assert request_("shutdown") == {"ok": True, "result": {"shutdown": True}}
@@ -0,0 +1,58 @@
+import pytest
+
+from cwt.core.shortcuts import is_up_to_date
+from cwt.utils.shell_link import build_shell_link, read_shell_link, write_shell_link
+
+CHROME = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+
+
+def _link(**kwargs):
+    return build_shell_link(CHROME, arguments='--profile-directory="Profile 1"', icon_location=CHROME,
+                            description="Chrome - Work", **kwargs)
+
+
+def test_round_trip():
+    parsed = read_shell_link(_link(icon_index=2))
+    assert parsed == {
+        "target": CHROME,
+        "arguments": '--profile-directory="Profile 1"',
+        "working_dir": r"C:\Program Files\Google\Chrome\Application",
+        "icon_location": CHROME,
+        "icon_index": 2,
+        "description": "Chrome - Work",
+    }
+
+
+def test_build_is_deterministic():
+    assert _link() == _link()
+
+
+def test_write_skips_identical_file(tmp_path):
+    path = tmp_path / "Chrome - Work.lnk"
+    assert write_shell_link(path, CHROME, arguments="--new-window") is True
+    assert write_shell_link(path, CHROME, arguments="--new-window") is False
+    assert read_shell_link(path.read_bytes())["arguments"] == "--new-window"
+
+
+@pytest.mark.parametrize("cut", [0, 20, 76, 80, 120, 200, -10, -5])
+def test_truncated_link_raises(cut):
+    data = _link()
+    with pytest.raises(ValueError):
+        read_shell_link(data[:cut] if cut else b"")
+
+
+def test_corrupt_unicode_path_offset_raises():
+    data = bytearray(_link())
+    data[0x4C + 28:0x4C + 32] = (0xFFFF).to_bytes(4, "little")     # LocalBasePathOffsetUnicode past the end
+    with pytest.raises(ValueError):
+        read_shell_link(bytes(data))
+
+
+def test_truncated_shortcut_is_not_up_to_date(tmp_path):
+    path = tmp_path / "Chrome - Work.lnk"
+    path.write_bytes(_link()[:120])
+    spec = {"path": str(path), "target": CHROME, "arguments": '--profile-directory="Profile 1"',
+            "icon_location": CHROME, "icon_index": 0}
+    assert is_up_to_date(spec) is False
+    path.write_bytes(_link())
+    assert is_up_to_date(spec) is True
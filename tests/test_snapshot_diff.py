@@ -0,0 +1,27 @@
+from cwt.core.snapshot_diff import diff_windows
+from cwt.core.snapshot_model import WindowRecord
+
+
+def _window(hwnd, title, class_name="Chrome_WidgetWin_1", create_time=100.0, x=0):
+    return WindowRecord(hwnd=hwnd, title=title, exe="chrome.exe", x=x, y=0, width=800, height=600,
+                        desktop_number=1, class_name=class_name, create_time=create_time)
+
+
+def test_same_session_pairs_by_hwnd():
+    result = diff_windows([_window(10, "Inbox")], [_window(10, "Calendar", x=50)])
+    assert len(result["retitled"]) == 1 and len(result["moved"]) == 1
+    assert result["added"] == [] and result["removed"] == []
+
+
+def test_reused_hwnd_from_another_session_is_not_the_same_window():
+    old = [_window(10, "Inbox", create_time=100.0)]
+    new = [_window(10, "Calendar", create_time=900.0, x=50)]     # browser restarted, hwnd reused
+    result = diff_windows(old, new)
+    assert result["retitled"] == [] and result["moved"] == []
+    assert [w["title"] for w in result["removed"]] == ["Inbox"]
+    assert [w["title"] for w in result["added"]] == ["Calendar"]
+
+
+def test_records_without_a_class_are_not_paired_by_hwnd():
+    result = diff_windows([_window(10, "Inbox", class_name="")], [_window(10, "Calendar", class_name="", x=50)])
+    assert len(result["removed"]) == 1 and len(result["added"]) == 1
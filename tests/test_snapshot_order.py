@@ -0,0 +1,28 @@
+import gzip
+import json
+import os
+
+from cwt.utils.paths import find_snapshot_files
+
+
+def _write(path, captured_at, mtime):
+    data = json.dumps({"format_version": "1.1", "collection_name": "c", "captured_at": captured_at,
+                       "desktops": {}, "windows": []}).encode("utf-8")
+    path.write_bytes(gzip.compress(data) if path.suffix == ".gz" else data)
+    os.utime(path, (mtime, mtime))
+
+
+def test_snapshots_are_ordered_by_capture_time_not_mtime(tmp_path):
+    # Copied back from a backup: modification times are the reverse of capture order
+    _write(tmp_path / "snapshot_a.json", "2026-01-01T09:00:00", mtime=3_000_000)
+    _write(tmp_path / "snapshot_b.json.gz", "2026-01-02T09:00:00", mtime=2_000_000)
+    _write(tmp_path / "snapshot_c.json", "03-Jan-2026 09:00", mtime=1_000_000)
+    assert [p.name for p in find_snapshot_files(tmp_path)] == \
+        ["snapshot_c.json", "snapshot_b.json.gz", "snapshot_a.json"]
+
+
+def test_filename_timestamp_is_the_fallback(tmp_path):
+    _write(tmp_path / "snapshot_Apr0325_0726.json", None, mtime=2_000_000)
+    _write(tmp_path / "snapshot_24-Feb-2026_2351.json", None, mtime=1_000_000)
+    assert [p.name for p in find_snapshot_files(tmp_path)] == \
+        ["snapshot_24-Feb-2026_2351.json", "snapshot_Apr0325_0726.json"]
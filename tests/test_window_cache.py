@@ -0,0 +1,94 @@
+import threading
+
+from cwt.core.window_cache import EVENT_MOVE, EVENT_SHOW, SimulatedEventSource, WindowStateCache
+
+
+def _quiet(msg):
+    pass
+
+
+def _world():
+    source = SimulatedEventSource()
+    cache = source.make_cache(logger=_quiet)
+    return source, cache
+
+
+def test_create_move_retitle_destroy_update_the_cache():
+    source, cache = _world()
+    hwnd = source.create_window("Notes", "notepad.exe", x=10, y=20)
+    assert cache.get(hwnd).title == "Notes"
+
+    source.move_window(hwnd, 300, 400, width=640, height=480)
+    record = cache.get(hwnd)
+    assert (record.x, record.y, record.width, record.height) == (300, 400, 640, 480)
+
+    source.retitle_window(hwnd, "Notes - edited")
+    assert cache.get(hwnd).title == "Notes - edited"
+
+    source.destroy_window(hwnd)
+    assert cache.get(hwnd) is None
+    assert len(cache) == 0
+    assert cache.event_count == 4
+
+
+def test_seed_and_reads_return_copies():
+    source = SimulatedEventSource()
+    source.create_window("Existing", "code.exe")         # before the cache exists: picked up by the seed
+    cache = source.make_cache(logger=_quiet)
+    [record] = cache.windows()
+    record.title = "mutated"
+    assert cache.windows()[0].title == "Existing"
+
+
+def test_move_of_an_untracked_window_describes_it():
+    source, cache = _world()
+    source.world[77] = {"hwnd": 77, "title": "Late", "exe": "app.exe", "x": 0, "y": 0,
+                        "width": 100, "height": 100}
+    cache.handle_event(EVENT_MOVE, 77)
+    assert cache.get(77).title == "Late"
+
+
+def test_windows_describe_rejects_are_not_tracked():
+    cache = WindowStateCache(describe=lambda hwnd: None, logger=_quiet)
+    cache.handle_event(EVENT_SHOW, 5)
+    assert cache.get(5) is None and len(cache) == 0
+
+
+def test_wait_for_wakes_on_a_new_window():
+    source, cache = _world()
+    found = {}
+
+    def waiter():
+        found["record"] = cache.wait_for(lambda w: w.exe == "obsidian.exe", timeout=5.0)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    source.create_window("Vault", "notepad.exe")
+    source.create_window("Vault", "obsidian.exe")
+    thread.join(5.0)
+    assert found["record"].exe == "obsidian.exe"
+    assert cache.wait_for(lambda w: w.exe == "missing.exe", timeout=0.05) is None
+
+
+class FakeDesktops:
+    def __init__(self, placement):
+        self.placement = placement          # hwnd → guid
+
+    def desktop_of_window(self, hwnd):
+        return self.placement.get(hwnd)
+
+    def number_of(self, guid):
+        return {"g1": 1, "g2": 2}.get(guid)
+
+    def name_of(self, guid):
+        return {"g1": "Comms", "g2": "Code"}[guid]
+
+
+def test_refresh_desktops_rereads_membership():
+    source, cache = _world()
+    a = source.create_window("A", "a.exe")
+    b = source.create_window("B", "b.exe")
+    cache.desktops = FakeDesktops({a: "g2"})
+    cache.refresh_desktops()
+    assert (cache.get(a).desktop_number, cache.get(a).desktop_name) == (2, "Code")
+    assert (cache.get(b).desktop_number, cache.get(b).desktop_name) == (None, "Unknown")
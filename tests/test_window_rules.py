@@ -0,0 +1,25 @@
+from cwt.core.window_rules import load_rules
+
+
+def _window(exe, class_name, title="Documents - File Explorer"):
+    return {"exe": exe, "class": class_name, "title": title, "width": 1200, "height": 800,
+            "desktop_number": 1, "desktop_name": "Desktop 1"}
+
+
+def test_default_rules_keep_explorer_folder_windows(tmp_path):
+    rules = load_rules(tmp_path / ".windowignore", logger=lambda msg: None)
+    assert not rules.ignores(_window("explorer.exe", "CabinetWClass"))
+
+
+def test_default_rules_drop_shell_surfaces(tmp_path):
+    rules = load_rules(tmp_path / ".windowignore", logger=lambda msg: None)
+    assert rules.ignores(_window("explorer.exe", "Shell_TrayWnd", title="Taskbar"))
+    assert rules.ignores(_window("explorer.exe", "Progman", title="Program Manager"))
+    assert rules.ignores(_window("VoiceAccess.exe", "VoiceAccess"))
+
+
+def test_user_file_can_still_drop_folder_windows(tmp_path):
+    path = tmp_path / ".windowignore"
+    path.write_text("exe:explorer.exe class:CabinetWClass\n", encoding="utf-8")
+    rules = load_rules(path, logger=lambda msg: None)
+    assert rules.ignores(_window("explorer.exe", "CabinetWClass"))
@@ -0,0 +1,65 @@
+from cwt.core.restore_scheduler import RestoreOp
+from cwt.core.snapshot_model import WindowRecord
+from cwt.core.workspace_switcher import WorkspaceSwitcher
+
+
+def _op(hwnd, number):
+    record = WindowRecord(hwnd=hwnd, title=f"Window {hwnd}", exe="app.exe", x=0, y=0, width=800, height=600,
+                          desktop_number=number)
+    return RestoreOp(record, record, 100, None, number)
+
+
+class FakeBackend:
+    def __init__(self):
+        self.ops = {"A": [_op(1, 1)], "B": [_op(2, 2)]}
+        self.calls = []
+
+    def alive(self, window):
+        return True
+
+    def read_layout(self, hwnds):
+        return {h: (0, 0, 800, 600, 0, None, None, False) for h in hwnds}
+
+    def park(self, ops, mode):
+        self.calls.append(("park", [op.hwnd for op in ops], mode))
+        return len(ops)
+
+    def unpark(self, ops, mode):
+        self.calls.append(("unpark", [op.hwnd for op in ops], mode))
+        return {"restored": len(ops)}
+
+    def restore(self, snapshot_path, on_plan):
+        ops = self.ops[snapshot_path]
+        on_plan(ops)
+        return {"restored": len(ops)}
+
+
+def _switcher(backend, tmp_path, park):
+    return WorkspaceSwitcher(backend, state_path=tmp_path / "switcher_state.json", park=park,
+                             logger=lambda msg: None)
+
+
+def test_set_is_unparked_with_the_mode_it_was_parked_with(tmp_path):
+    backend = FakeBackend()
+    switcher = _switcher(backend, tmp_path, "desktop")
+    switcher.switch("A", "A")
+    switcher.switch("B", "B")                       # A parked on the holding desktop
+
+    switcher.park_mode = "minimize"
+    switcher.switch("A")
+    assert ("park", [1], "desktop") in backend.calls
+    assert ("unpark", [1], "desktop") in backend.calls
+    assert ("park", [2], "minimize") in backend.calls
+
+
+def test_park_mode_survives_a_restart(tmp_path):
+    backend = FakeBackend()
+    switcher = _switcher(backend, tmp_path, "desktop")
+    switcher.switch("A", "A")
+    switcher.switch("B", "B")
+
+    reloaded = _switcher(backend, tmp_path, "minimize")
+    assert reloaded.sets["A"]["parked"] == "desktop"
+    assert reloaded.sets["B"]["parked"] is None
+    reloaded.switch("A")
+    assert backend.calls[-2] == ("unpark", [1], "desktop")